@@ -6,15 +6,26 @@ Point d'entrée principal
 """
 
 import argparse
+import signal
 import sys
 import os
 from datetime import datetime
 
-# Import des modules
-from modules.passive import whois_lookup, dns_lookup, brute_force_subdomains
-from modules.active import ping_sweep, port_scan, banner_grab
-from modules.export import export_to_json
-from modules.utils import log, validate_domain, print_colored
+# Import des modules légers uniquement : les modules passive/active/export
+# (whois, dnspython, asyncio...) sont chargés par la sous-commande qui en a besoin
+from modules.scheduler import PhaseScheduler
+from modules.retry import get_retry_stats
+from modules.utils import (log, validate_domain, print_colored, expand_targets, parse_port_range, get_fd_budget,
+                           setup_logging, get_config, get_cancel_token, parse_duration)
+
+# Commandes dont les moteurs respectent --max-time et l'interruption par Ctrl-C
+RECON_COMMANDS = ('passive', 'active', 'pipeline', 'batch')
+
+# Commandes dont le résultat est exporté par main() (les autres écrivent leurs propres sorties)
+EXPORT_COMMANDS = ('passive', 'active', 'pipeline')
+
+# Commandes dont les sondes suivent un parcours pseudo-aléatoire (--seed, --resume)
+PROBE_ORDER_COMMANDS = ('active', 'pipeline')
 
 def setup_args():
     """Configuration des arguments en ligne de commande"""
@@ -25,12 +36,39 @@ def setup_args():
 Exemples d'utilisation:
   Reconnaissance passive:
     python3 gaeksong.py passive --domain example.com --whois --dns --output results/example.json
-    
+  
   Reconnaissance active:
     python3 gaeksong.py active --target 192.168.1.1 --ports 22,80,443 --banner --output results/scan.json
+  
+  Pipeline découverte -> scan:
+    python3 gaeksong.py pipeline --domain example.com --dns-brute wordlists/subdomains.txt --ports 22,80,443 --banner
+  
+  Reconnaissance passive en batch:
+    python3 gaeksong.py batch --domains domains.txt --dns --dns-brute wordlists/subdomains.txt --output results/batch.ndjson
+  
+  Reconnaissance limitée à 10 minutes (résultats partiels exportés):
+    python3 gaeksong.py --max-time 10m active --target 192.168.1.0/24 --ports 1-1024 --udp
+  
+  Scan reproductible, repris là où il s'est arrêté:
+    python3 gaeksong.py --resume results/scan.state active --target 10.0.0.0/24 --udp
+  
+  Fusion de résultats:
+    python3 gaeksong.py --format ndjson,csv merge results/ --output results/merged
+  
+  Serveur de jobs:
+    python3 gaeksong.py serve --socket /tmp/gaeksong.sock --max-jobs 4
         """
     )
     
+    parser.add_argument('--format', metavar='FORMATS', help='Formats d\'export séparés par des virgules: json,ndjson,csv,html (défaut: export_formats de config.ini)')
+    parser.add_argument('--gzip', action='store_true', help='Compresse les fichiers exportés en gzip')
+    parser.add_argument('--profile', action='store_true', help='Profile l\'exécution (cProfile, durées par phase, threads et mémoire) dans une archive .profile.tar.gz à côté des résultats')
+    parser.add_argument('-T', '--timing', metavar='TEMPLATE', help='Profil de timing: paranoid, sneaky, polite, normal, aggressive, insane ou 0-5 (défaut: template de [TIMING] dans config.ini)')
+    parser.add_argument('--scope', metavar='FILE', help='Fichier de périmètre (une plage CIDR par ligne) : seules ces plages sont sondées')
+    parser.add_argument('--seed', type=int, help='Graine de l\'ordre pseudo-aléatoire des sondes (défaut: tirée au hasard et reportée dans les résultats)')
+    parser.add_argument('--resume', metavar='FILE', help='Fichier de reprise: graine et sondes abouties y sont enregistrées ; s\'il existe, seules les sondes restantes sont faites')
+    parser.add_argument('--max-time', metavar='DURATION', help='Durée maximale de la reconnaissance (ex: 600, 30s, 10m, 2h) : les sondes s\'arrêtent et les résultats partiels sont exportés')
+    
     subparsers = parser.add_subparsers(dest='command', help='Commandes disponibles')
     
     # Commande passive
@@ -38,21 +76,75 @@ Exemples d'utilisation:
     passive_parser.add_argument('--domain', required=True, help='Domaine cible à analyser')
     passive_parser.add_argument('--whois', action='store_true', help='Active la récupération WHOIS')
     passive_parser.add_argument('--dns', action='store_true', help='Active la récupération DNS')
-    passive_parser.add_argument('--dns-brute', metavar='WORDLIST', help='Lance un bruteforce des sous-domaines')
+    passive_parser.add_argument('--dns-brute', nargs='+', metavar='WORDLIST', help='Lance un bruteforce des sous-domaines (une ou plusieurs wordlists)')
+    passive_parser.add_argument('--dedup', choices=['exact', 'bloom'], default='exact', help='Déduplication des candidats entre wordlists: exacte ou filtre de Bloom (défaut: exact)')
+    passive_parser.add_argument('--bloom-error', type=float, default=0.001, metavar='RATE', help='Taux de faux positifs du filtre de Bloom (défaut: 0.001)')
+    passive_parser.add_argument('--no-axfr', action='store_true', help='Désactive la tentative de transfert de zone avant le bruteforce')
+    passive_parser.add_argument('--http-probe', action='store_true', help='Sonde en HTTP(S) chaque sous-domaine découvert')
+    passive_parser.add_argument('--tls', action='store_true', help='Récupère les certificats TLS des IPs découvertes et teste leurs SAN')
+    passive_parser.add_argument('--ptr-sweep', metavar='CIDR', help='Sweep de reverse DNS (PTR) sur une plage réseau')
     passive_parser.add_argument('--output', help='Fichier de sortie JSON')
     
     # Commande active
     active_parser = subparsers.add_parser('active', help='Reconnaissance active')
-    active_parser.add_argument('--target', required=True, help='Adresse IP cible')
+    active_parser.add_argument('--target', required=True, help='Adresse IP ou nom d\'hôte cible (plage CIDR pour --udp)')
     active_parser.add_argument('--ports', help='Liste des ports séparés par des virgules (ex: 22,80,443)')
     active_parser.add_argument('--ping-sweep', metavar='CIDR', help='Ping sweep sur une plage réseau')
     active_parser.add_argument('--banner', action='store_true', help='Active le banner grabbing')
+    active_parser.add_argument('--scan-alive', action='store_true', help='Scanne les --ports de chaque hôte dès qu\'il répond au ping sweep')
+    active_parser.add_argument('--udp', action='store_true', help='Active le scan UDP (la cible peut être une plage CIDR)')
+    active_parser.add_argument('--udp-ports', help='Ports UDP à scanner (défaut: top ports UDP)')
     active_parser.add_argument('--output', help='Fichier de sortie JSON')
     
+    # Commande pipeline
+    pipeline_parser = subparsers.add_parser('pipeline', help='Découverte de sous-domaines et scan des IPs au fil de l\'eau')
+    pipeline_parser.add_argument('--domain', required=True, help='Domaine cible à analyser')
+    pipeline_parser.add_argument('--dns-brute', required=True, nargs='+', metavar='WORDLIST', help='Wordlist(s) pour le bruteforce des sous-domaines')
+    pipeline_parser.add_argument('--dedup', choices=['exact', 'bloom'], default='exact', help='Déduplication des candidats entre wordlists: exacte ou filtre de Bloom (défaut: exact)')
+    pipeline_parser.add_argument('--bloom-error', type=float, default=0.001, metavar='RATE', help='Taux de faux positifs du filtre de Bloom (défaut: 0.001)')
+    pipeline_parser.add_argument('--no-axfr', action='store_true', help='Désactive la tentative de transfert de zone avant le bruteforce')
+    pipeline_parser.add_argument('--ports', required=True, help='Liste des ports à scanner sur chaque IP découverte')
+    pipeline_parser.add_argument('--banner', action='store_true', help='Active le banner grabbing')
+    pipeline_parser.add_argument('--http-probe', action='store_true', help='Sonde en HTTP(S) chaque sous-domaine découvert')
+    pipeline_parser.add_argument('--tls', action='store_true', help='Récupère les certificats TLS des IPs découvertes et teste leurs SAN')
+    pipeline_parser.add_argument('--parallel-hosts', type=int, default=10, help='Nombre d\'IPs scannées en parallèle (défaut: 10)')
+    pipeline_parser.add_argument('--output', help='Fichier de sortie JSON')
+    
+    # Commande batch
+    batch_parser = subparsers.add_parser('batch', help='Reconnaissance passive sur une liste de domaines')
+    batch_parser.add_argument('--domains', required=True, metavar='FILE', help='Fichier contenant un domaine par ligne')
+    batch_parser.add_argument('--whois', action='store_true', help='Active la récupération WHOIS')
+    batch_parser.add_argument('--dns', action='store_true', help='Active la récupération DNS')
+    batch_parser.add_argument('--dns-brute', nargs='+', metavar='WORDLIST', help='Lance un bruteforce des sous-domaines (une ou plusieurs wordlists)')
+    batch_parser.add_argument('--dedup', choices=['exact', 'bloom'], default='exact', help='Déduplication des candidats entre wordlists: exacte ou filtre de Bloom (défaut: exact)')
+    batch_parser.add_argument('--bloom-error', type=float, default=0.001, metavar='RATE', help='Taux de faux positifs du filtre de Bloom (défaut: 0.001)')
+    batch_parser.add_argument('--no-axfr', action='store_true', help='Désactive la tentative de transfert de zone avant le bruteforce')
+    batch_parser.add_argument('--parallel', type=int, default=10, help='Nombre de domaines traités en parallèle (défaut: 10)')
+    batch_parser.add_argument('--threads', type=int, help='Threads de bruteforce par domaine (défaut: dns_threads du profil de timing)')
+    batch_parser.add_argument('--output', help='Fichier de sortie NDJSON (un résultat par ligne)')
+    
+    # Commande merge
+    merge_parser = subparsers.add_parser('merge', help='Fusionne et déduplique des fichiers de résultats')
+    merge_parser.add_argument('inputs', nargs='+', metavar='INPUT', help='Fichiers, dossiers ou motifs (JSON, NDJSON, CSV, éventuellement .gz)')
+    merge_parser.add_argument('--subnet-prefix', type=int, default=24, metavar='BITS', help='Préfixe IPv4 pour le comptage des hôtes par sous-réseau (défaut: 24)')
+    merge_parser.add_argument('--run-size', type=int, default=200000, metavar='ROWS', help='Lignes triées en mémoire avant écriture sur disque (défaut: 200000)')
+    merge_parser.add_argument('--output', help='Chemin de sortie sans extension (un fichier par format, plus les agrégats _stats.json)')
+    
+    # Commande serve
+    serve_parser = subparsers.add_parser('serve', help='Serveur de jobs (API JSON sur socket Unix ou HTTP local)')
+    serve_parser.add_argument('--socket', metavar='PATH', help='Socket Unix d\'écoute (prioritaire sur --listen)')
+    serve_parser.add_argument('--listen', default='127.0.0.1:8765', metavar='HOST:PORT', help='Adresse HTTP d\'écoute (défaut: 127.0.0.1:8765)')
+    serve_parser.add_argument('--max-jobs', type=int, default=2, help='Nombre de jobs exécutés simultanément (défaut: 2)')
+    
     return parser
 
 def run_passive_recon(args):
     """Exécute la reconnaissance passive"""
+    from modules.passive import (whois_lookup, dns_lookup, brute_force_subdomains, ptr_sweep,
+                                 merge_subdomain_results, get_nameservers, zone_transfer,
+                                 SubdomainFrontier, get_resolver)
+    from modules.scope import get_scope
+    
     domain = args.domain
     results = {
         'type': 'passive',
@@ -68,31 +160,135 @@ def run_passive_recon(args):
     
     print_colored(f"[+] Démarrage de la reconnaissance passive pour: {domain}", "green")
     
+    # Les phases indépendantes (WHOIS, DNS, PTR) tournent en parallèle
+    scheduler = PhaseScheduler(observer=getattr(args, 'observer', None))
+    scope = get_scope()
+    
     # WHOIS
     if args.whois:
-        print_colored("[*] Récupération des données WHOIS...", "blue")
-        whois_data = whois_lookup(domain)
-        results['data']['whois'] = whois_data
-        log(f"WHOIS lookup effectué pour {domain}", "info")
+        def whois_phase(ctx):
+            print_colored("[*] Récupération des données WHOIS...", "blue")
+            whois_data = whois_lookup(domain)
+            log(f"WHOIS lookup effectué pour {domain}", "info")
+            return whois_data
+        
+        scheduler.add('whois', whois_phase)
     
     # DNS
     if args.dns:
-        print_colored("[*] Récupération des enregistrements DNS...", "blue")
-        dns_data = dns_lookup(domain)
-        results['data']['dns'] = dns_data
-        log(f"DNS lookup effectué pour {domain}", "info")
+        def dns_phase(ctx):
+            print_colored("[*] Récupération des enregistrements DNS...", "blue")
+            dns_data = dns_lookup(domain)
+            log(f"DNS lookup effectué pour {domain}", "info")
+            return dns_data
+        
+        scheduler.add('dns', dns_phase)
     
     # Bruteforce sous-domaines
     if args.dns_brute:
-        print_colored(f"[*] Bruteforce des sous-domaines avec {args.dns_brute}...", "blue")
-        subdomains = brute_force_subdomains(domain, args.dns_brute)
-        results['data']['subdomains'] = subdomains
-        log(f"Bruteforce sous-domaines effectué pour {domain}", "info")
+        # Fast path: un transfert de zone réussi rend le bruteforce inutile
+        if not args.no_axfr:
+            def axfr_phase(ctx):
+                print_colored("[*] Tentative de transfert de zone (AXFR)...", "blue")
+                dns_data = ctx.result('dns') if args.dns else None
+                if dns_data and dns_data.get('NS'):
+                    nameservers = [ns.rstrip('.') for ns in dns_data['NS']]
+                else:
+                    nameservers = get_nameservers(domain)
+                return zone_transfer(domain, nameservers)
+            
+            scheduler.add('axfr', axfr_phase, after=['dns'] if args.dns else [])
+        
+        frontier = SubdomainFrontier(domain)
+        
+        def brute_phase(ctx):
+            def on_found(entry):
+                # Réservation libérée par la phase TLS une fois les SAN injectés
+                if args.tls:
+                    frontier.hold()
+                ctx.emit(entry)
+            
+            if not args.no_axfr and ctx.result('axfr'):
+                print_colored("[*] Zone complète obtenue, bruteforce ignoré", "blue")
+                # Pas de bruteforce pour tester les SAN : ils restent dans les certificats exportés
+                frontier.close()
+                for entry in ctx.result('axfr')['subdomains']:
+                    # Seuls les noms pointant dans le périmètre sont sondés
+                    if scope.allows_any(entry.ips):
+                        on_found(entry)
+                return ctx.result('axfr')['subdomains']
+            
+            print_colored(f"[*] Bruteforce des sous-domaines avec {', '.join(args.dns_brute)}...", "blue")
+            subdomains = brute_force_subdomains(domain, args.dns_brute, on_found=on_found, frontier=frontier,
+                                                dedup=args.dedup, error_rate=args.bloom_error)
+            log(f"Bruteforce sous-domaines effectué pour {domain}", "info")
+            return subdomains
+        
+        scheduler.add('subdomains', brute_phase, after=[] if args.no_axfr else ['axfr'])
+        
+        # Certificats TLS : les SAN alimentent la frontière du bruteforce
+        if args.tls:
+            def tls_phase(ctx):
+                from modules.tls import harvest_certificates
+                
+                print_colored("[*] Récupération des certificats TLS des IPs découvertes...", "blue")
+                try:
+                    return harvest_certificates(ctx.stream('subdomains'), frontier=frontier)
+                finally:
+                    # Réservations des entrées non traitées (erreur, annulation)
+                    frontier.close()
+            
+            scheduler.add('certificates', tls_phase, streams=['subdomains'])
+        
+        # Sondage HTTP(S) de chaque sous-domaine dès sa découverte
+        if args.http_probe:
+            def http_phase(ctx):
+                from modules.web import http_probe_hosts, web_targets
+                
+                print_colored("[*] Sondage HTTP(S) des sous-domaines découverts...", "blue")
+                names = (entry.subdomain for entry in ctx.stream('subdomains'))
+                return http_probe_hosts(web_targets(names))
+            
+            scheduler.add('http', http_phase, streams=['subdomains'])
+    
+    # Sweep PTR (fusionné avec les sous-domaines)
+    if args.ptr_sweep:
+        def ptr_phase(ctx):
+            print_colored(f"[*] Sweep PTR sur {args.ptr_sweep}...", "blue")
+            ptr_names = ptr_sweep(args.ptr_sweep)
+            log(f"Sweep PTR effectué sur {args.ptr_sweep}", "info")
+            return ptr_names
+        
+        scheduler.add('ptr', ptr_phase)
+    
+    phases = scheduler.run()
+    
+    if args.dns_brute:
+        get_resolver().log_report()
+    
+    for key in ('whois', 'dns', 'subdomains', 'http', 'certificates'):
+        if key in phases:
+            results['data'][key] = phases[key]
+    
+    if phases.get('axfr'):
+        axfr = phases['axfr']
+        results['data']['axfr'] = {'nameserver': axfr['nameserver'], 'records': len(axfr['subdomains'])}
+    
+    if 'ptr' in phases:
+        results['data']['subdomains'] = merge_subdomain_results(
+            results['data'].get('subdomains'), phases['ptr']
+        )
     
     return results
 
 def run_active_recon(args):
     """Exécute la reconnaissance active"""
+    from modules.active import ping_sweep, port_scan, banner_grab_async, udp_scan
+    from modules.permutation import get_checkpoint
+    from modules.runtime import get_runtime
+    from modules.timing import get_timing
+    from modules.scope import get_scope, ScopeError
+    
     target = args.target
     results = {
         'type': 'active',
@@ -103,34 +299,360 @@ def run_active_recon(args):
     
     print_colored(f"[+] Démarrage de la reconnaissance active pour: {target}", "green")
     
+    # Les phases s'enchaînent au fil des résultats partiels :
+    # chaque port ouvert part en banner grabbing dès sa découverte
+    scheduler = PhaseScheduler(observer=getattr(args, 'observer', None))
+    ports = [int(p.strip()) for p in args.ports.split(',')] if args.ports else None
+    
+    # Une cible désignée par un nom est résolue une fois : toutes les sondes
+    # visent l'adresse vérifiée par le périmètre
+    address = target
+    if (ports or args.udp) and '/' not in target:
+        try:
+            address = get_scope().resolve(target)
+        except ScopeError as e:
+            print_colored(f"[-] Cible {target} refusée: {e}", "red")
+            return None
+        if address != target:
+            print_colored(f"[*] {target} -> {address}", "blue")
+            results['address'] = address
+    
     # Ping sweep
     if args.ping_sweep:
-        print_colored(f"[*] Ping sweep sur {args.ping_sweep}...", "blue")
-        alive_hosts = ping_sweep(args.ping_sweep)
-        results['data']['ping_sweep'] = alive_hosts
-        log(f"Ping sweep effectué sur {args.ping_sweep}", "info")
+        def sweep_phase(ctx):
+            print_colored(f"[*] Ping sweep sur {args.ping_sweep}...", "blue")
+            alive_hosts = ping_sweep(args.ping_sweep, on_alive=ctx.emit)
+            log(f"Ping sweep effectué sur {args.ping_sweep}", "info")
+            return alive_hosts
+        
+        scheduler.add('ping_sweep', sweep_phase)
+        
+        # Scan de ports de chaque hôte dès qu'il répond au ping
+        if ports and args.scan_alive:
+            def alive_scan_phase(ctx):
+                hosts = {}
+                for host in ctx.stream('ping_sweep'):
+                    hosts[host.ip] = port_scan(host.ip, ports)
+                log(f"Scan des hôtes actifs effectué: {len(hosts)} hôtes", "info")
+                return hosts
+            
+            scheduler.add('hosts', alive_scan_phase, streams=['ping_sweep'])
     
     # Port scan
-    if args.ports:
-        ports = [int(p.strip()) for p in args.ports.split(',')]
-        print_colored(f"[*] Scan des ports {args.ports} sur {target}...", "blue")
-        open_ports = port_scan(target, ports)
-        results['data']['port_scan'] = open_ports
-        log(f"Port scan effectué sur {target}", "info")
+    if ports:
+        def scan_phase(ctx):
+            print_colored(f"[*] Scan des ports {args.ports} sur {target}...", "blue")
+            open_ports = port_scan(address, ports, on_open=ctx.emit)
+            log(f"Port scan effectué sur {target}", "info")
+            return open_ports
+        
+        scheduler.add('port_scan', scan_phase)
         
         # Banner grabbing
-        if args.banner and open_ports:
-            print_colored("[*] Banner grabbing sur les ports ouverts...", "blue")
+        if args.banner:
+            def banner_phase(ctx):
+                banners = {}
+                runtime = get_runtime()
+                
+                # Un banner par port ouvert, en parallèle sur la boucle partagée
+                async def grab(entry):
+                    banner = await banner_grab_async(address, entry.port)
+                    if banner:
+                        banners[entry.port] = banner
+                
+                runtime.run(runtime.map(grab, ctx.stream('port_scan'), get_timing().max_threads,
+                                        rate_limiter=get_timing().rate_limiter, stream=True))
+                log(f"Banner grabbing effectué sur {target}", "info")
+                return banners
+            
+            scheduler.add('banners', banner_phase, streams=['port_scan'])
+    
+    # Scan UDP
+    if args.udp:
+        try:
+            get_scope().check_network(target)
+        except ScopeError as e:
+            print_colored(f"[-] {e}", "red")
+            return None
+        
+        targets = expand_targets(address)
+        udp_ports = parse_port_range(args.udp_ports) if args.udp_ports else None
+        if targets:
+            def udp_phase(ctx):
+                print_colored(f"[*] Scan UDP sur {target}...", "blue")
+                udp_results = udp_scan(targets, udp_ports)
+                log(f"Scan UDP effectué sur {target}", "info")
+                return udp_results
+            
+            scheduler.add('udp_scan', udp_phase)
+        else:
+            print_colored(f"[-] Cible invalide pour le scan UDP: {target}", "red")
+    
+    phases = scheduler.run()
+    
+    # Graine de l'ordre des sondes, pour rejouer le même parcours (--seed)
+    if get_checkpoint().randomize:
+        results['seed'] = get_checkpoint().seed
+    
+    for key in ('ping_sweep', 'hosts', 'port_scan', 'udp_scan'):
+        if key in phases:
+            results['data'][key] = phases[key]
+    
+    if phases.get('banners'):
+        results['data']['banners'] = phases['banners']
+    
+    return results
+
+def run_pipeline_recon(args):
+    """Exécute la découverte de sous-domaines et le scan des IPs trouvées en streaming"""
+    from modules.passive import brute_force_subdomains, get_nameservers, zone_transfer, SubdomainFrontier, get_resolver
+    from modules.active import port_scan_async, banner_grab_async
+    from modules.permutation import get_checkpoint
+    from modules.runtime import get_runtime
+    from modules.timing import get_timing
+    from modules.scope import get_scope
+    
+    domain = args.domain
+    results = {
+        'type': 'pipeline',
+        'target': domain,
+        'timestamp': datetime.now().isoformat(),
+        'data': {}
+    }
+    
+    if not validate_domain(domain):
+        print_colored(f"Erreur: Domaine invalide '{domain}'", "red")
+        return None
+    
+    ports = parse_port_range(args.ports)
+    if not ports:
+        print_colored(f"Erreur: Liste de ports invalide '{args.ports}'", "red")
+        return None
+    
+    print_colored(f"[+] Démarrage du pipeline pour: {domain}", "green")
+    
+    scheduler = PhaseScheduler(observer=getattr(args, 'observer', None))
+    scope = get_scope()
+    
+    frontier = SubdomainFrontier(domain)
+    
+    # Découverte : chaque sous-domaine résolu est émis immédiatement
+    def discovery_phase(ctx):
+        def on_found(entry):
+            # Réservation libérée par la phase TLS une fois les SAN injectés
+            if args.tls:
+                frontier.hold()
+            ctx.emit(entry)
+        
+        if not args.no_axfr:
+            axfr = zone_transfer(domain, get_nameservers(domain))
+            if axfr:
+                # Pas de bruteforce pour tester les SAN : ils restent dans les certificats exportés
+                frontier.close()
+                for entry in axfr['subdomains']:
+                    # Seuls les noms pointant dans le périmètre sont sondés
+                    if scope.allows_any(entry.ips):
+                        on_found(entry)
+                return axfr['subdomains']
+        
+        return brute_force_subdomains(domain, args.dns_brute, on_found=on_found, frontier=frontier,
+                                      dedup=args.dedup, error_rate=args.bloom_error)
+    
+    # Déduplication : une IP partagée par N noms n'est scannée qu'une fois
+    def dedup_phase(ctx):
+        names_by_ip = {}
+        for entry in ctx.stream('subdomains'):
+            for ip in entry.ips:
+                if not scope.allows(ip):
+                    continue
+                if ip not in names_by_ip:
+                    names_by_ip[ip] = []
+                    ctx.emit(ip)
+                names_by_ip[ip].append(entry.subdomain)
+        return names_by_ip
+    
+    runtime = get_runtime()
+    
+    # Scan : les IPs sont scannées dès leur première apparition, en tâches
+    # de la boucle partagée (args.parallel_hosts IPs à la fois)
+    def scan_phase(ctx):
+        hosts = {}
+        
+        async def scan_host(ip):
+            hosts[ip] = await port_scan_async(ip, ports, on_open=lambda entry: ctx.emit((ip, entry)))
+        
+        runtime.run(runtime.map(scan_host, ctx.stream('ips'), args.parallel_hosts, stream=True))
+        
+        log(f"Pipeline: {len(hosts)} IPs scannées pour {domain}", "info")
+        return hosts
+    
+    scheduler.add('subdomains', discovery_phase)
+    scheduler.add('ips', dedup_phase, streams=['subdomains'])
+    scheduler.add('hosts', scan_phase, streams=['ips'])
+    
+    # Certificats TLS : les SAN alimentent la frontière du bruteforce
+    if args.tls:
+        def tls_phase(ctx):
+            from modules.tls import harvest_certificates
+            
+            try:
+                return harvest_certificates(ctx.stream('subdomains'), frontier=frontier)
+            finally:
+                # Réservations des entrées non traitées (erreur, annulation)
+                frontier.close()
+        
+        scheduler.add('certificates', tls_phase, streams=['subdomains'])
+    
+    # Sondage HTTP(S) par nom (virtual hosts), en parallèle du scan
+    if args.http_probe:
+        def http_phase(ctx):
+            from modules.web import http_probe_hosts, web_targets
+            
+            names = (entry.subdomain for entry in ctx.stream('subdomains'))
+            return http_probe_hosts(web_targets(names))
+        
+        scheduler.add('http', http_phase, streams=['subdomains'])
+    
+    # Banner grabbing sur chaque port ouvert, au fil du scan
+    if args.banner:
+        def banner_phase(ctx):
             banners = {}
-            for port in open_ports:
-                banner = banner_grab(target, port)
+            
+            async def grab(item):
+                ip, entry = item
+                banner = await banner_grab_async(ip, entry.port)
                 if banner:
-                    banners[port] = banner
-            results['data']['banners'] = banners
-            log(f"Banner grabbing effectué sur {target}", "info")
+                    banners.setdefault(ip, {})[entry.port] = banner
+            
+            runtime.run(runtime.map(grab, ctx.stream('hosts'), get_timing().max_threads,
+                                    rate_limiter=get_timing().rate_limiter, stream=True))
+            return banners
+        
+        scheduler.add('host_banners', banner_phase, streams=['hosts'])
+    
+    phases = scheduler.run()
+    get_resolver().log_report()
+    
+    if get_checkpoint().randomize:
+        results['seed'] = get_checkpoint().seed
+    
+    results['data']['subdomains'] = phases.get('subdomains') or []
+    results['data']['hosts'] = phases.get('hosts') or {}
+    results['data']['ip_names'] = phases.get('ips') or {}
+    if args.banner:
+        results['data']['host_banners'] = phases.get('host_banners') or {}
+    if args.http_probe:
+        results['data']['http'] = phases.get('http') or []
+    if args.tls:
+        results['data']['certificates'] = phases.get('certificates') or []
     
     return results
 
+def run_batch_recon(args):
+    """Exécute la reconnaissance passive en batch (résultats écrits en streaming)"""
+    from modules.batch import run_batch
+    
+    if args.output:
+        output_path = args.output
+    else:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = f"results/batch_{timestamp}.ndjson"
+    if args.gzip and not output_path.endswith('.gz'):
+        output_path += '.gz'
+    
+    print_colored(f"[+] Démarrage de la reconnaissance batch depuis: {args.domains}", "green")
+    
+    summary = run_batch(
+        args.domains,
+        output_path,
+        whois_enabled=args.whois,
+        dns_enabled=args.dns,
+        wordlist_path=args.dns_brute,
+        parallel=args.parallel,
+        max_threads=args.threads,
+        dedup=args.dedup,
+        error_rate=args.bloom_error,
+        compress=args.gzip,
+        axfr_enabled=not args.no_axfr
+    )
+    
+    if summary:
+        print_colored(f"[+] Résultats sauvegardés dans: {output_path}", "green")
+        log(f"Batch effectué: {summary['domains']} domaines", "info")
+    
+    # Les résultats sont déjà exportés au fil de l'eau
+    return None
+
+def run_merge(args, formats):
+    """Fusionne des fichiers de résultats (sorties écrites en streaming)"""
+    from modules.merge import merge_results, MERGE_FORMATS
+    
+    # Sans --format, les formats de config.ini (json, html...) ne s'appliquent pas à la fusion
+    if not args.format:
+        formats = ['ndjson']
+    
+    merge_formats = [f for f in formats if f in MERGE_FORMATS]
+    if len(merge_formats) < len(formats):
+        log(f"Formats ignorés par la fusion: {', '.join(f for f in formats if f not in MERGE_FORMATS)}", "warning")
+    
+    if args.output:
+        base_path = args.output
+    else:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_path = f"results/merge_{timestamp}"
+    
+    summary = merge_results(
+        args.inputs,
+        base_path,
+        formats=merge_formats or ['ndjson'],
+        compress=args.gzip,
+        subnet_prefix=args.subnet_prefix,
+        run_size=args.run_size
+    )
+    
+    if summary:
+        print_colored(f"[+] Fusion: {summary['files']} fichiers, {summary['rows']} enregistrements "
+                      f"({summary['duplicates']} doublons retirés)", "green")
+        for port, services in list(summary['services_per_port'].items())[:10]:
+            print_colored(f"    {port}: " + ', '.join(f"{name} ({count})" for name, count in services.items()), "blue")
+        for output_path in summary['output']:
+            print_colored(f"[+] Résultats sauvegardés dans: {output_path}", "green")
+    
+    # Les résultats sont déjà exportés au fil de l'eau
+    return None
+
+def run_job_server(args, parser, formats):
+    """Démarre le serveur de jobs (jusqu'à interruption)"""
+    from modules.server import serve
+    
+    runners = {
+        'passive': run_passive_recon,
+        'active': run_active_recon,
+        'pipeline': run_pipeline_recon
+    }
+    
+    host, _, port = args.listen.rpartition(':')
+    serve(parser, runners, socket_path=args.socket, host=host.strip('[]') or '127.0.0.1', port=int(port),
+          max_jobs=args.max_jobs, formats=formats)
+    
+    return None
+
+def install_interrupt_handler():
+    """
+    Premier Ctrl-C : annule l'exécution (les moteurs rendent leurs résultats
+    partiels, qui sont exportés) ; second Ctrl-C : arrêt immédiat
+    """
+    token = get_cancel_token()
+    
+    def handler(signum, frame):
+        if token.cancel('interrupted'):
+            print_colored("[!] Interruption: fin des sondes en vol puis export des résultats partiels "
+                          "(Ctrl-C à nouveau pour quitter)", "yellow")
+            return
+        signal.default_int_handler(signum, frame)
+    
+    signal.signal(signal.SIGINT, handler)
+
 def main():
     """Fonction principale"""
     parser = setup_args()
@@ -141,9 +663,111 @@ def main():
     
     args = parser.parse_args()
     
+    if not 0 < getattr(args, 'bloom_error', 0.5) < 1:
+        parser.error("--bloom-error doit être compris entre 0 et 1")
+    if not 0 <= getattr(args, 'subnet_prefix', 24) <= 32:
+        parser.error("--subnet-prefix doit être compris entre 0 et 32")
+    if getattr(args, 'run_size', 1) < 1:
+        parser.error("--run-size doit être positif")
+    if getattr(args, 'max_jobs', 1) < 1:
+        parser.error("--max-jobs doit être positif")
+    max_time = None
+    if args.max_time:
+        if args.command not in RECON_COMMANDS:
+            parser.error(f"--max-time ne s'applique qu'aux commandes {', '.join(RECON_COMMANDS)}")
+        try:
+            max_time = parse_duration(args.max_time)
+        except ValueError:
+            parser.error(f"Durée invalide pour --max-time: {args.max_time} (ex: 600, 30s, 10m, 2h)")
+    if (args.seed is not None or args.resume) and args.command not in PROBE_ORDER_COMMANDS:
+        parser.error(f"--seed et --resume ne s'appliquent qu'aux commandes {', '.join(PROBE_ORDER_COMMANDS)}")
+    if args.command == 'serve' and not args.socket and not args.listen.rpartition(':')[2].isdigit():
+        parser.error(f"Adresse d'écoute invalide: {args.listen} (attendu HOST:PORT)")
+    
+    # Configuration du logging (aucune I/O à l'import des modules)
+    setup_logging()
+    
     # Création du dossier results s'il n'existe pas
     os.makedirs('results', exist_ok=True)
     
+    # Formats d'export : ligne de commande, sinon [EXPORT] export_formats
+    from modules.export import EXPORT_FORMATS
+    
+    formats = args.format or get_config().get('EXPORT', 'export_formats', fallback='json')
+    formats = [f.strip().lower() for f in formats.split(',') if f.strip()]
+    unknown = [f for f in formats if f not in EXPORT_FORMATS]
+    if unknown or not formats:
+        parser.error(f"Format d'export inconnu: {', '.join(unknown)} (disponibles: {', '.join(EXPORT_FORMATS)})")
+    
+    # Périmètre explicite : remplace la liste d'autorisation de config.ini
+    if args.scope:
+        from modules.scope import Scope, ScopeError, set_scope
+        
+        try:
+            set_scope(Scope.from_config(args.scope))
+        except ScopeError as e:
+            parser.error(str(e))
+    
+    # Profil de timing : à fixer avant la création du résolveur et des moteurs
+    from modules.timing import TimingTemplate, set_timing
+    
+    try:
+        timing = TimingTemplate.from_config(args.timing)
+    except ValueError as e:
+        parser.error(str(e))
+    set_timing(timing)
+    log(f"Profil de timing: {timing.name} ({timing.to_dict()})", "info")
+    
+    # Ordre des sondes : graine imposée, ou graine et avancement d'une exécution précédente
+    if args.seed is not None or args.resume:
+        from modules.permutation import get_checkpoint
+        
+        checkpoint = get_checkpoint()
+        if args.seed is not None:
+            checkpoint.seed = args.seed
+        if args.resume:
+            try:
+                checkpoint.load(args.resume)
+            except ValueError as e:
+                parser.error(str(e))
+    
+    # Augmente RLIMIT_NOFILE et fixe le budget de sockets avant tout scan
+    get_fd_budget()
+    
+    profiler = None
+    if args.profile:
+        from modules.profiling import start_profiler
+        profiler = start_profiler()
+    
+    # Annulation propre par Ctrl-C et échéance --max-time, vérifiées par tous les moteurs
+    token = get_cancel_token()
+    if args.command in RECON_COMMANDS:
+        install_interrupt_handler()
+        if max_time:
+            token.set_deadline(max_time)
+            log(f"Durée maximale de la reconnaissance: {max_time:g}s", "info")
+    
+    # Fichiers de sortie, un par format, ouverts avant l'exécution : les
+    # lignes des résultats partiels y sont écrites au fil des phases
+    target = getattr(args, 'domain', None) or getattr(args, 'target', None)
+    if getattr(args, 'output', None):
+        base_path = args.output
+    else:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_path = f"results/{args.command}_{target}_{timestamp}" if target else f"results/{args.command}_{timestamp}"
+    
+    export = None
+    if args.command in EXPORT_COMMANDS:
+        from modules.export import ExportStream
+        
+        try:
+            # Les lignes de ports sont complétées par leur banner à la fin
+            export = ExportStream(base_path, target, formats, compress=args.gzip,
+                                  defer=('port_scan', 'hosts') if getattr(args, 'banner', False) else ())
+        except OSError as e:
+            parser.error(f"Impossible de créer les fichiers de sortie ({base_path}): {str(e)}")
+        args.observer = export.observer
+    
     results = None
     
     # Exécution selon la commande
@@ -151,22 +775,48 @@ def main():
         results = run_passive_recon(args)
     elif args.command == 'active':
         results = run_active_recon(args)
+    elif args.command == 'pipeline':
+        results = run_pipeline_recon(args)
+    elif args.command == 'batch':
+        results = run_batch_recon(args)
+    elif args.command == 'merge':
+        results = run_merge(args, formats)
+    elif args.command == 'serve':
+        results = run_job_server(args, parser, formats)
     else:
         parser.print_help()
         sys.exit(1)
     
-    # Export des résultats
-    if results:
-        if args.output:
-            output_path = args.output
-        else:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = f"results/{args.command}_{results['target']}_{timestamp}.json"
-        
-        if export_to_json(results, output_path):
+    if results and token.cancelled:
+        results['interrupted'] = token.reason
+        print_colored(f"[!] Reconnaissance interrompue ({token.reason}): résultats partiels", "yellow")
+    
+    # Fin des exports : lignes non émises en cours de route, JSON et HTML
+    if export and results:
+        written = export.finish(results)
+        for output_path in written:
             print_colored(f"[+] Résultats sauvegardés dans: {output_path}", "green")
-        else:
+        if len(written) < len(formats):
             print_colored(f"[-] Erreur lors de la sauvegarde", "red")
+    elif export:
+        export.abort()
+    
+    # État de reprise écrit même après une interruption (sondes restantes)
+    if getattr(args, 'resume', None):
+        from modules.permutation import get_checkpoint
+        
+        if get_checkpoint().save():
+            print_colored(f"[+] État de reprise sauvegardé dans: {args.resume}", "green")
+    
+    get_retry_stats().log_report()
+    
+    if profiler:
+        from modules.profiling import profile_path_for
+        
+        profiler.stop()
+        profile_path = profile_path_for(base_path)
+        if profiler.save(profile_path):
+            print_colored(f"[+] Profil sauvegardé dans: {profile_path}", "green")
     
     print_colored("[+] Reconnaissance terminée!", "green")
 
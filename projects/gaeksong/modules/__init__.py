@@ -9,23 +9,69 @@ __version__ = "1.0.0"
 __author__ = "huoshi"
 __description__ = "Outil de reconnaissance active et passive pour la cybersécurité"
 
-# Import des modules principaux
-from .passive import whois_lookup, dns_lookup, brute_force_subdomains
-from .active import ping_sweep, port_scan, banner_grab
-from .export import export_to_json, export_to_html
-from .utils import log, validate_domain, print_colored, load_wordlist
+import importlib
+
+# Import paresseux des modules principaux (PEP 562) : importer le package
+# ne charge ni whois ni dnspython, chaque sous-module est chargé au premier
+# accès à l'un de ses attributs
+_LAZY_EXPORTS = {
+    'whois_lookup': 'passive',
+    'dns_lookup': 'passive',
+    'brute_force_subdomains': 'passive',
+    'ptr_sweep': 'passive',
+    'zone_transfer': 'passive',
+    'ping_sweep': 'active',
+    'port_scan': 'active',
+    'banner_grab': 'active',
+    'udp_scan': 'active',
+    'export_to_json': 'export',
+    'export_to_html': 'export',
+    'log': 'utils',
+    'validate_domain': 'utils',
+    'print_colored': 'utils',
+    'print_finding': 'utils',
+    'load_wordlist': 'utils',
+    'run_batch': 'batch',
+    'load_domains': 'batch',
+    'SubdomainRecord': 'records',
+    'HostRecord': 'records',
+    'PortRecord': 'records',
+    'BannerRecord': 'records',
+}
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
 
 __all__ = [
     'whois_lookup',
     'dns_lookup', 
     'brute_force_subdomains',
+    'ptr_sweep',
+    'zone_transfer',
     'ping_sweep',
     'port_scan',
     'banner_grab',
+    'udp_scan',
     'export_to_json',
     'export_to_html',
     'log',
     'validate_domain',
     'print_colored',
-    'load_wordlist'
+    'print_finding',
+    'load_wordlist',
+    'run_batch',
+    'load_domains',
+    'SubdomainRecord',
+    'HostRecord',
+    'PortRecord',
+    'BannerRecord'
 ]
\ No newline at end of file
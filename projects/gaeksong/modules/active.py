@@ -7,89 +7,255 @@ Fonctions pour ping sweep, port scan et banner grabbing
 
 import socket
 import threading
-import time
 import subprocess
 import ipaddress
-from modules.utils import log, print_colored
+import asyncio
+import errno
+from modules.utils import (log, print_colored, print_finding, get_fd_budget, is_fd_exhaustion, fd_backoff, RateLimiter,
+                           FD_EXHAUSTION_ERRORS, get_cancel_token)
+from modules.records import HostRecord, PortRecord, BannerRecord
+from modules.scope import get_scope, ScopeError
+from modules.timing import get_timing
+from modules.retry import RetryPolicy, get_retry_stats
+from modules.runtime import get_runtime
+from modules.permutation import get_checkpoint, space_digest
 
-def ping_host(ip, results, lock):
+# Nombre de tentatives quand les descripteurs sont épuisés (EMFILE/ENFILE)
+FD_MAX_ATTEMPTS = 6
+
+# Codes de connect_ex() d'une sonde restée sans réponse (port filtré)
+PROBE_TIMEOUT_ERRORS = (errno.EAGAIN, errno.ETIMEDOUT)
+
+# Ports UDP scannés par défaut
+TOP_UDP_PORTS = [53, 67, 69, 123, 137, 161, 162, 500, 514, 520, 1900, 4500, 5353]
+
+# Payloads spécifiques par port : un service UDP ne répond en général
+# qu'à une requête valide de son protocole
+UDP_PAYLOADS = {
+    # DNS : requête TXT CHAOS version.bind
+    53: b'\x12\x34\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00'
+        b'\x07version\x04bind\x00\x00\x10\x00\x03',
+    # TFTP : lecture d'un fichier quelconque (réponse = erreur ou données)
+    69: b'\x00\x01gaeksong\x00octet\x00',
+    # NTP : requête client v3
+    123: b'\x1b' + b'\x00' * 47,
+    # NetBIOS : requête NBSTAT
+    137: b'\x80\xf0\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00'
+         b'\x20CKAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA\x00\x00\x21\x00\x01',
+    # SNMP v1 : GetRequest sysDescr.0 avec la communauté "public"
+    161: bytes.fromhex('302902010004067075626c6963a01c020471b4b568020100'
+                       '020100300e300c06082b060102010101000500'),
+    # SSDP : découverte UPnP
+    1900: b'M-SEARCH * HTTP/1.1\r\nHOST: 239.255.255.250:1900\r\n'
+          b'MAN: "ssdp:discover"\r\nMX: 1\r\nST: ssdp:all\r\n\r\n',
+    # mDNS : requête PTR _services._dns-sd._udp.local
+    5353: b'\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\x00\x00'
+          b'\x09_services\x07_dns-sd\x04_udp\x05local\x00\x00\x0c\x00\x01',
+}
+
+def ping_host(ip, results, lock, on_alive=None, timeout=None, retries=None):
     """
     Ping un hôte spécifique
     
+    Une absence de réponse est retentée (politique de retransmission du
+    profil de timing) ; un hôte injoignable signalé par ICMP ne l'est pas.
+    
     Args:
         ip (str): Adresse IP à pinger
         results (list): Liste partagée pour stocker les résultats
         lock: Verrou pour l'accès concurrent
+        on_alive (callable): Appelé avec le HostRecord dès que l'hôte répond
+        timeout (float): Attente d'une réponse (défaut: profil de timing)
+        retries (int): Nouvelles tentatives si l'hôte reste muet (défaut: profil de timing)
     """
-    try:
-        # Utilisation de ping système (compatible Linux/Windows)
-        result = subprocess.run(
-            ['ping', '-c', '1', '-W', '1', str(ip)] if subprocess.sys.platform != 'win32' 
-            else ['ping', '-n', '1', '-w', '1000', str(ip)],
-            capture_output=True,
-            text=True,
-            timeout=3
-        )
+    timeout = timeout or get_timing().ping_timeout
+    policy = RetryPolicy.from_timing(retries)
+    # Utilisation de ping système (compatible Linux/Windows)
+    command = (['ping', '-c', '1', '-W', str(max(1, round(timeout))), str(ip)] if subprocess.sys.platform != 'win32'
+               else ['ping', '-n', '1', '-w', str(int(timeout * 1000)), str(ip)])
+    
+    for attempt in range(policy.retries + 1):
+        if attempt and not policy.backoff(attempt - 1):
+            break
+        
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=timeout + 2)
+        except subprocess.TimeoutExpired:
+            log(f"Timeout ping pour {ip}", "debug")
+            continue
+        except Exception as e:
+            log(f"Erreur ping pour {ip}: {str(e)}", "error")
+            get_retry_stats().record('ping', attempt)
+            return
+        
+        # Code 1 sans message ICMP : pas de réponse, issue ambiguë
+        if result.returncode == 1 and 'unreachable' not in result.stdout.lower():
+            continue
         
+        get_retry_stats().record('ping', attempt)
         if result.returncode == 0:
             with lock:
-                results.append({
-                    'ip': str(ip),
-                    'status': 'alive',
-                    'response_time': 'N/A'  # TODO: extraire le temps de réponse
-                })
-            print_colored(f"[+] {ip} est en ligne", "green")
-            
-    except subprocess.TimeoutExpired:
-        log(f"Timeout ping pour {ip}", "warning")
-    except Exception as e:
-        log(f"Erreur ping pour {ip}: {str(e)}", "error")
+                host = HostRecord(str(ip), 'alive', 'N/A')  # TODO: extraire le temps de réponse
+                results.append(host)
+            print_finding(f"[+] {ip} est en ligne")
+            if on_alive:
+                on_alive(host)
+        return
+    
+    get_retry_stats().record('ping', policy.retries, exhausted=True)
 
-def ping_sweep(cidr_range, max_threads=50):
+def _host_range(network):
+    """
+    Adresses d'hôtes d'un réseau, comme network.hosts() mais sans les énumérer
+    
+    Args:
+        network (ipaddress.IPv4Network or IPv6Network): Réseau
+    
+    Returns:
+        tuple: (décalage de la première adresse d'hôte, nombre d'adresses d'hôtes)
+    """
+    if network.version == 4 and network.prefixlen < 31:
+        return 1, network.num_addresses - 2
+    if network.version == 6 and network.prefixlen < 127:
+        return 1, network.num_addresses - 1
+    return 0, network.num_addresses
+
+def ping_sweep(cidr_range, max_threads=None, on_alive=None):
     """
     Effectue un ping sweep sur une plage réseau
     
     Args:
         cidr_range (str): Plage réseau en notation CIDR (ex: 192.168.1.0/24)
-        max_threads (int): Nombre maximum de threads
-        
+        max_threads (int): Nombre maximum de threads (défaut: profil de timing)
+        on_alive (callable): Appelé avec chaque hôte actif dès sa découverte
+    
     Returns:
-        list: Liste des hôtes actifs
+        list: Liste des hôtes actifs (HostRecord)
     """
+    scope = get_scope()
     try:
         network = ipaddress.ip_network(cidr_range, strict=False)
+        scope.check_network(cidr_range)
         print_colored(f"[*] Ping sweep sur {cidr_range} ({network.num_addresses} adresses)", "blue")
-        
+    
+    except ScopeError as e:
+        print_colored(f"[-] {e}", "red")
+        return []
     except ValueError as e:
         print_colored(f"[-] Plage réseau invalide: {e}", "red")
         return []
     
+    timing = get_timing()
+    runtime = get_runtime()
+    token = get_cancel_token()
     results = []
     lock = threading.Lock()
-    threads = []
-    semaphore = threading.Semaphore(max_threads)
     
-    def worker(ip):
-        with semaphore:
-            ping_host(ip, results, lock)
+    # Les adresses sont parcourues dans un ordre pseudo-aléatoire reproductible
+    # (graine du parcours) plutôt que séquentiellement : la charge ne se
+    # concentre pas sur un même segment du réseau
+    first, count = _host_range(network)
+    order = get_checkpoint().order(f"ping:{network}", count, space_digest(str(network)))
+    
+    def hosts():
+        for position, index in order.pending():
+            ip = network.network_address + first + index
+            if scope.allows(ip):
+                yield position, ip
+            else:
+                order.complete(position)
     
-    # Ping de chaque adresse du réseau
-    for ip in network.hosts():
-        thread = threading.Thread(target=worker, args=(ip,))
-        threads.append(thread)
-        thread.start()
-        time.sleep(0.01)  # Petit délai
+    def ping(item):
+        position, ip = item
+        ping_host(ip, results, lock, on_alive, timing.ping_timeout)
+        # Après une annulation, la sonde a pu être écourtée : elle sera refaite à la reprise
+        if not token.cancelled:
+            order.complete(position)
     
-    # Attente de tous les threads
-    for thread in threads:
-        thread.join()
+    # Ping de chaque adresse du réseau (hors plages refusées par le périmètre),
+    # sur le pool partagé du runtime ; scan_delay espace les hôtes
+    spacing = RateLimiter(1 / timing.scan_delay, burst=1) if timing.scan_delay else None
+    runtime.run(runtime.map_blocking(ping, hosts(), max_threads or timing.max_threads, rate_limiter=spacing))
     
     print_colored(f"[+] Ping sweep terminé: {len(results)}/{network.num_addresses} hôtes actifs", "green")
     log(f"Ping sweep sur {cidr_range}: {len(results)} hôtes actifs", "info")
     
     return results
 
-def scan_port(ip, port, results, lock, timeout=1):
+async def _tcp_probe(ip, port, timeout, policy):
+    """
+    Sonde TCP connect() sur la boucle du runtime
+    
+    Args:
+        ip (str): Adresse IP cible
+        port (int): Port à sonder
+        timeout (float): Timeout de connexion
+        policy (RetryPolicy): Politique de retransmission
+    
+    Returns:
+        str: open, closed, filtered (sans réponse après les retransmissions),
+            error, ou None si le port n'a pas pu être scanné (descripteurs épuisés)
+    """
+    loop = asyncio.get_running_loop()
+    budget = get_fd_budget()
+    family = socket.AF_INET6 if ipaddress.ip_address(ip).version == 6 else socket.AF_INET
+    retransmissions = 0
+    
+    for attempt in range(FD_MAX_ATTEMPTS + policy.retries):
+        await budget.acquire_async()
+        sock = None
+        error = None
+        try:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+            result = 0
+        except asyncio.TimeoutError:
+            result = errno.ETIMEDOUT
+        except OSError as e:
+            result = e.errno
+            error = e
+        finally:
+            # Fermeture systématique : une socket perdue consomme le budget
+            if sock:
+                sock.close()
+            budget.release()
+        
+        # Plus de descripteurs ou de ports éphémères : erreur locale, pas un port fermé
+        if result in FD_EXHAUSTION_ERRORS:
+            await asyncio.sleep(fd_backoff(attempt))
+            continue
+        
+        # Pas de réponse (SYN perdu ou filtré) : issue ambiguë, nouvelle
+        # tentative ; un RST (ECONNREFUSED) est définitif
+        if result in PROBE_TIMEOUT_ERRORS:
+            if retransmissions < policy.retries and not get_cancel_token().cancelled:
+                await asyncio.sleep(policy.delay(retransmissions))
+                retransmissions += 1
+                continue
+            get_retry_stats().record('tcp', retransmissions, exhausted=True)
+            return 'filtered'
+        
+        get_retry_stats().record('tcp', retransmissions)
+        if result == 0:
+            return 'open'
+        if result == errno.ECONNREFUSED:
+            return 'closed'
+        log(f"Erreur scan port {ip}:{port}: {str(error)}", "error")
+        return 'error'
+    
+    log(f"Port {ip}:{port} non scanné: descripteurs de fichiers épuisés", "error")
+    return None
+
+def _open_port(ip, port, results, on_open):
+    """Enregistre un port ouvert et le signale"""
+    entry = PortRecord(port, 'open', get_service_name(port))
+    results.append(entry)
+    print_finding(f"[+] {ip}:{port} ouvert ({get_service_name(port)})")
+    if on_open:
+        on_open(entry)
+
+def scan_port(ip, port, results, lock, timeout=None, on_open=None, retries=None):
     """
     Scanne un port spécifique sur une IP
     
@@ -98,27 +264,20 @@ def scan_port(ip, port, results, lock, timeout=1):
         port (int): Port à scanner
         results (list): Liste partagée pour stocker les résultats
         lock: Verrou pour l'accès concurrent
-        timeout (int): Timeout de connexion
+        timeout (float): Timeout de connexion (défaut: profil de timing)
+        on_open (callable): Appelé avec le PortRecord dès que le port est ouvert
+        retries (int): Nouvelles tentatives si la connexion reste sans réponse (défaut: profil de timing)
+    
+    Returns:
+        bool: True si le port a été scanné, False s'il n'a pas pu l'être
     """
-    try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        
-        result = sock.connect_ex((ip, port))
-        
-        if result == 0:
-            with lock:
-                results.append({
-                    'port': port,
-                    'status': 'open',
-                    'service': get_service_name(port)
-                })
-            print_colored(f"[+] {ip}:{port} ouvert ({get_service_name(port)})", "green")
-        
-        sock.close()
-        
-    except Exception as e:
-        log(f"Erreur scan port {ip}:{port}: {str(e)}", "error")
+    timeout = timeout or get_timing().connect_timeout
+    state = get_runtime().run(_tcp_probe(ip, port, timeout, RetryPolicy.from_timing(retries)))
+    
+    if state == 'open':
+        with lock:
+            _open_port(ip, port, results, on_open)
+    return state is not None
 
 def get_service_name(port):
     """
@@ -126,7 +285,7 @@ def get_service_name(port):
     
     Args:
         port (int): Numéro du port
-        
+    
     Returns:
         str: Nom du service
     """
@@ -150,104 +309,326 @@ def get_service_name(port):
         3389: 'RDP',
         5432: 'PostgreSQL',
         5900: 'VNC',
-        8080: 'HTTP-Alt'
+        8080: 'HTTP-Alt',
+        67: 'DHCP',
+        69: 'TFTP',
+        123: 'NTP',
+        137: 'NetBIOS-NS',
+        161: 'SNMP',
+        162: 'SNMP-Trap',
+        500: 'IKE',
+        514: 'Syslog',
+        520: 'RIP',
+        1900: 'SSDP',
+        4500: 'IPsec-NAT-T',
+        5353: 'mDNS'
     }
     
     return common_ports.get(port, 'Unknown')
 
-def port_scan(ip, ports, max_threads=50):
+async def port_scan_async(ip, ports, max_concurrency=None, rate_limiter=None, on_open=None):
     """
-    Effectue un scan de ports sur une IP
+    Effectue un scan de ports sur une IP (coroutine du runtime)
+    
+    Les ports sont sondés dans un ordre pseudo-aléatoire reproductible
+    (permutation de la graine du parcours, voir modules.permutation) ; avec
+    un fichier de reprise, les ports déjà sondés ne le sont pas à nouveau.
     
     Args:
-        ip (str): Adresse IP cible
+        ip (str): Adresse IP ou nom de la cible (résolu, toutes ses adresses
+            devant être dans le périmètre)
         ports (list): Liste des ports à scanner
-        max_threads (int): Nombre maximum de threads
-        
+        max_concurrency (int): Nombre maximum de sondes en vol (défaut: max_threads du profil de timing)
+        rate_limiter (RateLimiter): Limiteur de débit (défaut: celui du profil de timing, partagé)
+        on_open (callable): Appelé avec chaque port ouvert dès sa découverte,
+            depuis la boucle du runtime (ne doit pas bloquer)
+    
     Returns:
-        list: Liste des ports ouverts
+        list: Liste des ports ouverts (PortRecord)
     """
+    target = ip
+    try:
+        # Résolution hors de la boucle : getaddrinfo() bloque pour un nom
+        ip = await asyncio.get_running_loop().run_in_executor(None, get_scope().resolve, target)
+    except ScopeError as e:
+        print_colored(f"[-] Scan de {target} refusé: {e}", "red")
+        log(f"Scan de {target} refusé par le périmètre: {e}", "warning")
+        return []
+    
     print_colored(f"[*] Scan de {len(ports)} ports sur {ip}", "blue")
     
+    timing = get_timing()
+    runtime = get_runtime()
+    token = get_cancel_token()
+    policy = RetryPolicy.from_timing()
+    order = get_checkpoint().order(f"tcp:{ip}", len(ports), space_digest(list(ports)))
     results = []
-    lock = threading.Lock()
-    threads = []
-    semaphore = threading.Semaphore(max_threads)
-    
-    def worker(port):
-        with semaphore:
-            scan_port(ip, port, results, lock)
+    unscanned = []
     
-    # Scan de chaque port
-    for port in ports:
-        thread = threading.Thread(target=worker, args=(port,))
-        threads.append(thread)
-        thread.start()
-        time.sleep(0.001)  # Petit délai
+    async def probe(item):
+        position, index = item
+        port = ports[index]
+        state = await _tcp_probe(ip, port, timing.connect_timeout, policy)
+        if state == 'open':
+            _open_port(ip, port, results, on_open)
+        elif state is None:
+            unscanned.append(port)
+            return
+        # Un port filtré après une annulation n'a pas eu toutes ses retransmissions
+        if state != 'filtered' or not token.cancelled:
+            order.complete(position)
     
-    # Attente de tous les threads
-    for thread in threads:
-        thread.join()
+    # Toutes les sondes sont des tâches de la boucle partagée : pas de thread par port
+    await runtime.map(probe, order.pending(), min(max_concurrency or timing.max_threads, runtime.fd_budget.size),
+                      rate_limiter=rate_limiter or timing.rate_limiter)
     
     print_colored(f"[+] Scan terminé: {len(results)}/{len(ports)} ports ouverts", "green")
-    log(f"Port scan sur {ip}: {len(results)} ports ouverts", "info")
+    if unscanned:
+        print_colored(f"[!] {len(unscanned)} ports non scannés (descripteurs épuisés)", "yellow")
+    log(f"Port scan sur {ip}: {len(results)} ports ouverts, {len(unscanned)} non scannés", "info")
     
     return results
 
-def banner_grab(ip, port, timeout=3):
+def port_scan(ip, ports, max_threads=None, rate_limiter=None, on_open=None):
     """
-    Effectue un banner grabbing sur un port
+    Effectue un scan de ports sur une IP
+    
+    Args:
+        ip (str): Adresse IP ou nom de la cible
+        ports (list): Liste des ports à scanner
+        max_threads (int): Nombre maximum de sondes en vol (défaut: profil de timing)
+        rate_limiter (RateLimiter): Limiteur de débit (défaut: celui du profil de timing, partagé)
+        on_open (callable): Appelé avec chaque port ouvert dès sa découverte (ne doit pas bloquer)
+    
+    Returns:
+        list: Liste des ports ouverts (PortRecord)
+    """
+    return get_runtime().run(port_scan_async(ip, ports, max_threads, rate_limiter, on_open))
+
+async def banner_grab_async(ip, port, timeout=None):
+    """
+    Effectue un banner grabbing sur un port (coroutine du runtime)
     
     Args:
         ip (str): Adresse IP cible
         port (int): Port cible
-        timeout (int): Timeout de connexion
-        
+        timeout (float): Timeout de connexion et de lecture (défaut: profil de timing)
+    
     Returns:
-        dict: Informations du banner ou None
+        BannerRecord: Informations du banner ou None
     """
+    if not get_scope().allows(ip):
+        log(f"Banner grabbing de {ip}:{port} refusé par le périmètre", "warning")
+        return None
+    
+    timeout = timeout or get_timing().banner_timeout
+    budget = get_fd_budget()
+    await budget.acquire_async()
+    writer = None
+    
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        
-        sock.connect((ip, port))
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
         
         # Envoi d'une requête basique selon le port
         if port == 80 or port == 8080:
-            sock.send(b"GET / HTTP/1.1\r\nHost: " + ip.encode() + b"\r\n\r\n")
-        elif port == 443:
-            # Pour HTTPS, on ne peut pas faire de requête simple sans SSL
+            writer.write(b"GET / HTTP/1.1\r\nHost: " + ip.encode() + b"\r\n\r\n")
+        elif port in (443, 25, 21, 22):
+            # HTTPS : pas de requête simple sans SSL ; SMTP, FTP, SSH : banner automatique
             pass
-        elif port == 25:  # SMTP
-            pass  # Le serveur envoie généralement un banner automatiquement
-        elif port == 21:  # FTP
-            pass  # Banner automatique
-        elif port == 22:  # SSH
-            pass  # Banner automatique
         else:
             # Tentative générique
-            sock.send(b"\r\n")
+            writer.write(b"\r\n")
         
         # Réception du banner
-        banner = sock.recv(1024).decode('utf-8', errors='ignore').strip()
-        
-        sock.close()
+        data = await asyncio.wait_for(reader.read(1024), timeout)
+        banner = data.decode('utf-8', errors='ignore').strip()
         
         if banner:
-            banner_info = {
-                'port': port,
-                'banner': banner,
-                'service': get_service_name(port)
-            }
+            banner_info = BannerRecord(port, banner, get_service_name(port))
             
-            print_colored(f"[+] Banner {ip}:{port} -> {banner[:50]}{'...' if len(banner) > 50 else ''}", "green")
+            print_finding(f"[+] Banner {ip}:{port} -> {banner[:50]}{'...' if len(banner) > 50 else ''}")
             log(f"Banner grab réussi sur {ip}:{port}", "info")
             
             return banner_info
-        
-    except socket.timeout:
+    
+    except asyncio.TimeoutError:
         log(f"Timeout banner grab {ip}:{port}", "warning")
     except Exception as e:
         log(f"Erreur banner grab {ip}:{port}: {str(e)}", "error")
+    finally:
+        # Fermeture systématique : une socket perdue consomme le budget
+        if writer:
+            writer.close()
+        budget.release()
+    
+    return None
+
+def banner_grab(ip, port, timeout=None):
+    """
+    Effectue un banner grabbing sur un port
+    
+    Args:
+        ip (str): Adresse IP cible
+        port (int): Port cible
+        timeout (float): Timeout de connexion et de lecture (défaut: profil de timing)
+    
+    Returns:
+        BannerRecord: Informations du banner ou None
+    """
+    return get_runtime().run(banner_grab_async(ip, port, timeout))
+
+class _UDPProbeProtocol(asyncio.DatagramProtocol):
+    """Protocole asyncio pour une sonde UDP (socket connectée)"""
+    
+    def __init__(self, loop):
+        self.outcome = loop.create_future()
+    
+    def datagram_received(self, data, addr):
+        if not self.outcome.done():
+            self.outcome.set_result(('open', data))
+    
+    def error_received(self, exc):
+        # Sur une socket connectée, l'ICMP port-unreachable remonte
+        # sous forme de ConnectionRefusedError
+        if not self.outcome.done():
+            if isinstance(exc, ConnectionRefusedError):
+                self.outcome.set_result(('closed', None))
+            else:
+                self.outcome.set_result(('error', exc))
+
+async def _udp_probe(ip, port, timeout, retries, rate_limiter):
+    """
+    Envoie une sonde UDP avec retransmissions
+    
+    Args:
+        ip (str): Adresse IP cible
+        port (int): Port cible
+        timeout (float): Délai d'attente par tentative
+        retries (int): Nombre de retransmissions
+        rate_limiter (RateLimiter): Limiteur de débit partagé
+    
+    Returns:
+        tuple: (statut, données reçues) avec statut open, closed, open|filtered ou error
+    """
+    loop = asyncio.get_running_loop()
+    # asyncio ignore les datagrammes vides : sonde générique minimale
+    payload = UDP_PAYLOADS.get(port, b'\r\n')
+    
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: _UDPProbeProtocol(loop), remote_addr=(ip, port)
+    )
+    
+    try:
+        for attempt in range(retries + 1):
+            if attempt and get_cancel_token().cancelled:
+                break
+            delay = rate_limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            transport.sendto(payload)
+            
+            try:
+                return await asyncio.wait_for(asyncio.shield(protocol.outcome), timeout)
+            except asyncio.TimeoutError:
+                continue
+        
+        # Aucune réponse ni ICMP : impossible de trancher
+        return ('open|filtered', None)
+    finally:
+        transport.close()
+
+async def _udp_scan_async(targets, ports, max_concurrency, timeout, retries, rate_limiter):
+    """
+    Scan UDP asynchrone sur un ensemble de cibles
+    
+    Args:
+        targets (list): Adresses IP cibles
+        ports (list): Ports UDP à scanner
+        max_concurrency (int): Nombre maximum de sondes en vol
+        timeout (float): Délai d'attente par tentative
+        retries (int): Nombre de retransmissions
+        rate_limiter (RateLimiter): Limiteur de débit partagé
+    
+    Returns:
+        dict: Résultats par IP (même format que le scan TCP)
+    """
+    results = {}
+    runtime = get_runtime()
+    budget = runtime.fd_budget
+    token = get_cancel_token()
+    
+    # Espace hôtes × ports parcouru dans un ordre pseudo-aléatoire reproductible :
+    # les sondes consécutives visent des hôtes différents
+    digest = space_digest(list(targets), list(ports))
+    order = get_checkpoint().order(f"udp:{digest}", len(targets) * len(ports), digest)
+    
+    async def probe(ip, port):
+        for attempt in range(FD_MAX_ATTEMPTS):
+            await budget.acquire_async()
+            try:
+                return await _udp_probe(ip, port, timeout, retries, rate_limiter)
+            except OSError as e:
+                if not is_fd_exhaustion(e):
+                    return ('error', e)
+            finally:
+                budget.release()
+            await asyncio.sleep(fd_backoff(attempt))
+        
+        log(f"Port UDP {ip}:{port} non scanné: descripteurs de fichiers épuisés", "error")
+        return ('unscanned', None)
+    
+    async def handle(item):
+        position, index = item
+        ip, port = targets[index // len(ports)], ports[index % len(ports)]
+        status, data = await probe(ip, port)
+        if status != 'unscanned' and (status != 'open|filtered' or not token.cancelled):
+            order.complete(position)
+        
+        if status == 'error':
+            log(f"Erreur scan UDP {ip}:{port}: {str(data)}", "error")
+        elif status == 'open':
+            results.setdefault(ip, []).append(PortRecord(port, 'open', get_service_name(port)))
+            print_finding(f"[+] {ip}:{port}/udp ouvert ({get_service_name(port)})")
     
-    return None
\ No newline at end of file
+    await runtime.map(handle, order.pending(), min(max_concurrency, budget.size))
+    return results
+
+def udp_scan(targets, ports=None, max_concurrency=None, timeout=None, retries=None, rate_limiter=None):
+    """
+    Effectue un scan de ports UDP sur une ou plusieurs IPs
+    
+    Un port est ouvert s'il répond à la sonde, fermé si un ICMP
+    port-unreachable est reçu, et open|filtered s'il reste silencieux
+    après toutes les retransmissions (non reporté).
+    
+    Args:
+        targets (list): Adresses IP cibles
+        ports (list): Ports UDP à scanner (TOP_UDP_PORTS par défaut)
+        max_concurrency (int): Nombre maximum de sondes en vol (défaut: profil de timing)
+        timeout (float): Délai d'attente par tentative (défaut: profil de timing)
+        retries (int): Nombre de retransmissions (défaut: profil de timing)
+        rate_limiter (RateLimiter): Limiteur de débit (défaut: celui du profil de timing, partagé avec le scan TCP)
+    
+    Returns:
+        dict: Ports UDP ouverts par IP
+    """
+    ports = ports or TOP_UDP_PORTS
+    timing = get_timing()
+    max_concurrency = max_concurrency or timing.async_concurrency
+    timeout = timeout or timing.connect_timeout
+    retries = timing.retries if retries is None else retries
+    rate_limiter = rate_limiter or timing.rate_limiter
+    targets = get_scope().filter(targets)
+    
+    print_colored(f"[*] Scan UDP de {len(ports)} ports sur {len(targets)} hôte(s)", "blue")
+    
+    results = get_runtime().run(
+        _udp_scan_async(targets, ports, max_concurrency, timeout, retries, rate_limiter)
+    )
+    
+    total = sum(len(open_ports) for open_ports in results.values())
+    print_colored(f"[+] Scan UDP terminé: {total} ports ouverts", "green")
+    log(f"Scan UDP sur {len(targets)} hôte(s): {total} ports ouverts", "info")
+    
+    return results
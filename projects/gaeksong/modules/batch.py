@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module de reconnaissance en batch
+Reconnaissance passive sur une liste de domaines dans un seul processus
+"""
+
+import threading
+from datetime import datetime
+from modules.passive import (whois_lookup, dns_lookup, brute_force_subdomains, get_nameservers, zone_transfer,
+                             get_resolver)
+from modules.scheduler import PhaseScheduler
+from modules.export import NDJSONWriter
+from modules.utils import log, print_colored, print_finding, validate_domain, get_cancel_token
+from modules.wordlists import open_wordlists, DEFAULT_ERROR_RATE
+
+def load_domains(domains_path):
+    """
+    Charge une liste de domaines depuis un fichier (un domaine par ligne)
+    
+    Les lignes vides, les commentaires (#) et les doublons sont ignorés.
+    
+    Args:
+        domains_path (str): Chemin vers le fichier de domaines
+    
+    Returns:
+        list: Liste des domaines valides ou None en cas d'erreur
+    """
+    try:
+        domains = []
+        seen = set()
+        
+        with open(domains_path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                domain = line.strip().lower().rstrip('.')
+                if not domain or domain.startswith('#') or domain in seen:
+                    continue
+                
+                if not validate_domain(domain):
+                    log(f"Domaine invalide ignoré: {domain}", "warning")
+                    continue
+                
+                seen.add(domain)
+                domains.append(domain)
+        
+        log(f"Liste de domaines chargée: {len(domains)} entrées depuis {domains_path}", "info")
+        return domains
+    
+    except Exception as e:
+        log(f"Erreur lors du chargement des domaines {domains_path}: {str(e)}", "error")
+        return None
+
+def recon_domain(domain, whois_enabled=False, dns_enabled=False, wordlist_paths=None, max_threads=None,
+                 dedup='exact', error_rate=DEFAULT_ERROR_RATE, axfr_enabled=True, total=None):
+    """
+    Exécute le pipeline passif (WHOIS, DNS, bruteforce) pour un domaine
+    
+    Les phases sont ordonnancées comme pour la commande passive : WHOIS et
+    DNS tournent en parallèle, le transfert de zone attend les NS du DNS et
+    le bruteforce n'est lancé que si l'AXFR échoue.
+    
+    Args:
+        domain (str): Domaine cible
+        whois_enabled (bool): Active la récupération WHOIS
+        dns_enabled (bool): Active la récupération DNS
+        wordlist_paths (list): Wordlists du bruteforce, relues en flux pour chaque domaine (ou None)
+        max_threads (int): Nombre de threads pour le bruteforce (défaut: profil de timing)
+        dedup (str): Déduplication des candidats (exact ou bloom)
+        error_rate (float): Taux de faux positifs du filtre de Bloom
+        axfr_enabled (bool): Tente un transfert de zone avant le bruteforce
+        total (int): Nombre de lignes des wordlists, compté une fois pour tout le batch
+    
+    Returns:
+        dict: Résultats au même format que la commande passive
+    """
+    results = {
+        'type': 'passive',
+        'target': domain,
+        'timestamp': datetime.now().isoformat(),
+        'data': {}
+    }
+    
+    scheduler = PhaseScheduler()
+    
+    if whois_enabled:
+        scheduler.add('whois', lambda ctx: whois_lookup(domain))
+    
+    if dns_enabled:
+        scheduler.add('dns', lambda ctx: dns_lookup(domain))
+    
+    if wordlist_paths:
+        # Fast path AXFR avant le bruteforce
+        if axfr_enabled:
+            def axfr_phase(ctx):
+                dns_data = ctx.result('dns') if dns_enabled else None
+                if dns_data and dns_data.get('NS'):
+                    nameservers = [ns.rstrip('.') for ns in dns_data['NS']]
+                else:
+                    nameservers = get_nameservers(domain)
+                return zone_transfer(domain, nameservers)
+            
+            scheduler.add('axfr', axfr_phase, after=['dns'] if dns_enabled else [])
+        
+        def brute_phase(ctx):
+            if axfr_enabled and ctx.result('axfr'):
+                return ctx.result('axfr')['subdomains']
+            return brute_force_subdomains(domain, wordlist_paths, max_threads=max_threads,
+                                          dedup=dedup, error_rate=error_rate, total=total)
+        
+        scheduler.add('subdomains', brute_phase, after=['axfr'] if axfr_enabled else [])
+    
+    phases = scheduler.run()
+    
+    for key in ('whois', 'dns', 'subdomains'):
+        if key in phases:
+            results['data'][key] = phases[key]
+    
+    if phases.get('axfr'):
+        axfr = phases['axfr']
+        results['data']['axfr'] = {'nameserver': axfr['nameserver'], 'records': len(axfr['subdomains'])}
+    
+    return results
+
+def run_batch(domains_path, output_path, whois_enabled=False, dns_enabled=False,
+              wordlist_path=None, parallel=10, max_threads=None, dedup='exact', error_rate=DEFAULT_ERROR_RATE,
+              compress=False, axfr_enabled=True):
+    """
+    Lance la reconnaissance passive sur tous les domaines d'un fichier
+    
+    Les domaines sont traités par un pool de pipelines concurrents qui
+    partagent le résolveur DNS (et son cache). Les wordlists sont vérifiées
+    une fois puis relues en flux pour chaque domaine, avec le filtre de
+    déduplication demandé (exact, ou Bloom en mémoire constante) : rien
+    n'est chargé en mémoire. Chaque résultat est écrit dans un fichier NDJSON dès qu'il
+    est disponible. Après une annulation (Ctrl-C, --max-time), les domaines
+    en cours sont écrits avec leurs résultats partiels et les suivants ne
+    sont pas lancés.
+    
+    Args:
+        domains_path (str): Fichier contenant la liste des domaines
+        output_path (str): Fichier de sortie NDJSON
+        whois_enabled (bool): Active la récupération WHOIS
+        dns_enabled (bool): Active la récupération DNS
+        wordlist_path (str or list): Wordlist(s) pour le bruteforce (optionnelles)
+        parallel (int): Nombre de domaines traités en parallèle
+        max_threads (int): Nombre de threads de bruteforce par domaine (défaut: profil de timing)
+        dedup (str): Déduplication des candidats par domaine (exact ou bloom)
+        error_rate (float): Taux de faux positifs du filtre de Bloom
+        compress (bool): Compression gzip du fichier NDJSON
+        axfr_enabled (bool): Tente un transfert de zone avant chaque bruteforce
+    
+    Returns:
+        dict: Résumé du batch ou None en cas d'erreur
+    """
+    domains = load_domains(domains_path)
+    if not domains:
+        print_colored(f"[-] Aucun domaine valide dans: {domains_path}", "red")
+        return None
+    
+    wordlist_paths = None
+    total = None
+    if wordlist_path:
+        wordlist_paths = [wordlist_path] if isinstance(wordlist_path, str) else list(wordlist_path)
+        opened = open_wordlists(wordlist_paths)
+        if not opened or not opened[1]:
+            print_colored(f"[-] Impossible de charger la wordlist: {', '.join(wordlist_paths)}", "red")
+            return None
+        # Lignes comptées une seule fois pour tout le batch, pas à chaque domaine
+        total = opened[1]
+    
+    print_colored(f"[*] Batch sur {len(domains)} domaines ({parallel} en parallèle)", "blue")
+    
+    summary = {'domains': 0, 'errors': 0, 'subdomains': 0, 'output': output_path}
+    lock = threading.Lock()
+    domains_iter = iter(domains)
+    token = get_cancel_token()
+    
+    with NDJSONWriter(output_path, compress) as sink:
+        
+        def worker():
+            while not token.cancelled:
+                with lock:
+                    domain = next(domains_iter, None)
+                if domain is None:
+                    return
+                
+                try:
+                    results = recon_domain(domain, whois_enabled, dns_enabled, wordlist_paths, max_threads, dedup,
+                                           error_rate, axfr_enabled, total)
+                    if token.cancelled:
+                        results['interrupted'] = token.reason
+                    sink.write(results)
+                    found = len(results['data'].get('subdomains') or [])
+                    with lock:
+                        summary['domains'] += 1
+                        summary['subdomains'] += found
+                        done = summary['domains'] + summary['errors']
+                    print_finding(f"[+] [{done}/{len(domains)}] {domain} terminé")
+                
+                except Exception as e:
+                    with lock:
+                        summary['errors'] += 1
+                    log(f"Erreur batch pour {domain}: {str(e)}", "error")
+        
+        threads = []
+        for _ in range(max(1, min(parallel, len(domains)))):
+            thread = threading.Thread(target=worker, daemon=True)
+            threads.append(thread)
+            thread.start()
+        
+        for thread in threads:
+            thread.join()
+    
+    # Santé des résolveurs cumulée sur tout le batch (résolveur partagé)
+    if wordlist_paths:
+        get_resolver().log_report()
+    
+    if token.cancelled:
+        summary['interrupted'] = token.reason
+        print_colored(f"[!] Batch interrompu ({token.reason}): {len(domains) - summary['domains'] - summary['errors']} "
+                      f"domaines non traités", "yellow")
+    
+    print_colored(f"[+] Batch terminé: {summary['domains']} domaines, {summary['subdomains']} sous-domaines", "green")
+    log(f"Batch terminé sur {domains_path}: {summary['domains']} domaines, {summary['errors']} erreurs", "info")
+    
+    return summary
@@ -2,80 +2,492 @@
 # -*- coding: utf-8 -*-
 """
 Module d'export des résultats
-Fonctions pour exporter en JSON et HTML
+Fonctions pour exporter en JSON, NDJSON, CSV et HTML (compression gzip optionnelle)
 """
 
+import io
+import csv
+import gzip
+import html
 import json
 import os
+import itertools
+import threading
 from datetime import datetime
 from modules.utils import log, print_colored
 
-def export_to_json(data, output_path):
+def _json_default(obj):
+    """
+    Sérialise les objets non natifs JSON (enregistrements à slots, dates...)
+    
+    Args:
+        obj: Objet à sérialiser
+    
+    Returns:
+        Valeur sérialisable en JSON
+    """
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    return str(obj)
+
+# Formats d'export disponibles (extension = nom du format)
+EXPORT_FORMATS = ('json', 'ndjson', 'csv', 'html')
+
+# Colonnes des exports ligne à ligne (CSV, NDJSON)
+ROW_FIELDS = ('target', 'section', 'host', 'port', 'protocol', 'name', 'status', 'service', 'detail')
+
+def _open_output(output_path, compress=False):
+    """
+    Ouvre un fichier de sortie texte, compressé en gzip si demandé
+    
+    Args:
+        output_path (str): Chemin du fichier de sortie
+        compress (bool): Compression gzip
+    
+    Returns:
+        file: Fichier ouvert en écriture
+    """
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    if compress:
+        return gzip.open(output_path, 'wt', encoding='utf-8', newline='', compresslevel=6)
+    return open(output_path, 'w', encoding='utf-8', newline='')
+
+def export_to_json(data, output_path, compress=False):
     """
     Exporte les données au format JSON
     
+    Le document est encodé et écrit par morceaux (sans indentation) : la
+    chaîne complète n'est jamais construite en mémoire.
+    
     Args:
         data (dict): Données à exporter
         output_path (str): Chemin du fichier de sortie
-        
+        compress (bool): Compression gzip
+    
     Returns:
         bool: True si succès, False sinon
     """
     try:
-        # Création du répertoire parent si nécessaire
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_json_default)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+        with _open_output(output_path, compress) as f:
+            for chunk in encoder.iterencode(data):
+                f.write(chunk)
         
         log(f"Export JSON réussi: {output_path}", "info")
         return True
-        
+    
     except Exception as e:
         log(f"Erreur export JSON: {str(e)}", "error")
         print_colored(f"[-] Erreur lors de l'export JSON: {str(e)}", "red")
         return False
 
-def export_to_html(data, output_path):
+class NDJSONWriter:
     """
-    Exporte les données au format HTML
+    Écrit des résultats au fil de l'eau, un objet JSON par ligne
+    
+    Utilisé comme sink de streaming (mode batch) : chaque résultat est écrit
+    et flushé dès qu'il est disponible, sans garder le document en mémoire.
     
     Args:
-        data (dict): Données à exporter
         output_path (str): Chemin du fichier de sortie
+        compress (bool): Compression gzip
+    """
+    
+    def __init__(self, output_path, compress=False):
+        self.output_path = output_path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = _open_output(output_path, compress)
+    
+    def write(self, record):
+        """
+        Ajoute un enregistrement au fichier (thread-safe)
         
+        Args:
+            record (dict): Enregistrement à écrire
+        """
+        line = json.dumps(record, ensure_ascii=False, default=_json_default)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            self.count += 1
+    
+    def close(self):
+        """Ferme le fichier de sortie"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        log(f"Export NDJSON terminé: {self.count} enregistrements dans {self.output_path}", "info")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+def _row(target, section, **fields):
+    row = dict.fromkeys(ROW_FIELDS)
+    row['target'] = target
+    row['section'] = section
+    row.update(fields)
+    return row
+
+def _port_rows(target, ip, ports, protocol, banners=None):
+    banners = banners or {}
+    for port in ports or []:
+        # Les clés de port deviennent des chaînes après un aller-retour JSON
+        banner_info = banners.get(port.get('port')) or banners.get(str(port.get('port')))
+        yield _row(target, 'port', host=ip, port=port.get('port'), protocol=protocol,
+                   status=port.get('status'), service=port.get('service'),
+                   detail=banner_info.get('banner') if banner_info else None)
+
+def _subdomain_rows(target, entry):
+    for ip in entry.get('ips') or [None]:
+        yield _row(target, 'subdomain', host=ip, name=entry.get('subdomain'), status=entry.get('status'))
+
+def _host_row(target, host):
+    return _row(target, 'host', host=host.get('ip'), status=host.get('status'), detail=host.get('response_time'))
+
+def iter_item_rows(target, phase, item):
+    """
+    Lignes d'un résultat partiel émis par une phase (voir PhaseContext.emit())
+    
+    Args:
+        target (str): Cible de la commande
+        phase (str): Nom de la phase émettrice
+        item: Résultat partiel (sous-domaine, hôte actif, port ouvert...)
+    
+    Yields:
+        dict: Lignes identiques à celles d'iter_rows() pour le même enregistrement
+    """
+    if phase == 'subdomains':
+        yield from _subdomain_rows(target, item)
+    elif phase == 'ping_sweep':
+        yield _host_row(target, item)
+    elif phase == 'port_scan':
+        yield from _port_rows(target, target, [item], 'tcp')
+    elif phase == 'hosts' and isinstance(item, tuple):
+        # Pipeline : (IP, port ouvert)
+        ip, entry = item
+        yield from _port_rows(target, ip, [entry], 'tcp')
+
+def iter_rows(results):
+    """
+    Aplatit un résultat en lignes homogènes (une par enregistrement)
+    
+    Args:
+        results (dict): Résultat d'une commande (passive, active, pipeline)
+    
+    Yields:
+        dict: Ligne avec les colonnes ROW_FIELDS
+    """
+    target = results.get('target')
+    data = results.get('data') or {}
+    
+    for key, value in (data.get('whois') or {}).items():
+        if value:
+            yield _row(target, 'whois', name=target, service=key,
+                       detail=', '.join(map(str, value)) if isinstance(value, list) else str(value))
+    
+    for record_type, records in (data.get('dns') or {}).items():
+        for record in records or []:
+            yield _row(target, 'dns', name=target, service=record_type,
+                       detail=json.dumps(record, ensure_ascii=False) if isinstance(record, dict) else record)
+    
+    for entry in data.get('subdomains') or []:
+        yield from _subdomain_rows(target, entry)
+    
+    for host in data.get('ping_sweep') or []:
+        yield _host_row(target, host)
+    
+    yield from _port_rows(target, target, data.get('port_scan'), 'tcp', data.get('banners'))
+    
+    host_banners = data.get('host_banners') or {}
+    for ip, ports in (data.get('hosts') or {}).items():
+        yield from _port_rows(target, ip, ports, 'tcp', host_banners.get(ip))
+    
+    for ip, ports in (data.get('udp_scan') or {}).items():
+        yield from _port_rows(target, ip, ports, 'udp')
+    
+    for response in data.get('http') or []:
+        yield _row(target, 'http', name=response.get('url'), status=response.get('status'),
+                   service=response.get('server'), detail=response.get('title'))
+    
+    for certificate in data.get('certificates') or []:
+        yield _row(target, 'certificate', host=certificate.get('ip'), port=certificate.get('port'),
+                   protocol='tcp', name=certificate.get('sni'), service=certificate.get('issuer'),
+                   detail=' '.join(certificate.get('san') or []))
+
+def export_to_ndjson(data, output_path, compress=False):
+    """
+    Exporte les données au format NDJSON (une ligne JSON par enregistrement)
+    
+    Args:
+        data (dict): Données à exporter
+        output_path (str): Chemin du fichier de sortie
+        compress (bool): Compression gzip
+    
     Returns:
         bool: True si succès, False sinon
     """
     try:
-        # Création du répertoire parent si nécessaire
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with _open_output(output_path, compress) as f:
+            for row in iter_rows(data):
+                f.write(json.dumps(row, ensure_ascii=False, default=_json_default) + '\n')
         
-        html_content = generate_html_report(data)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        log(f"Export HTML réussi: {output_path}", "info")
+        log(f"Export NDJSON réussi: {output_path}", "info")
         return True
+    
+    except Exception as e:
+        log(f"Erreur export NDJSON: {str(e)}", "error")
+        print_colored(f"[-] Erreur lors de l'export NDJSON: {str(e)}", "red")
+        return False
+
+def export_to_csv(data, output_path, compress=False):
+    """
+    Exporte les données au format CSV (colonnes ROW_FIELDS)
+    
+    Args:
+        data (dict): Données à exporter
+        output_path (str): Chemin du fichier de sortie
+        compress (bool): Compression gzip
+    
+    Returns:
+        bool: True si succès, False sinon
+    """
+    try:
+        with _open_output(output_path, compress) as f:
+            writer = csv.DictWriter(f, fieldnames=ROW_FIELDS)
+            writer.writeheader()
+            writer.writerows(iter_rows(data))
         
+        log(f"Export CSV réussi: {output_path}", "info")
+        return True
+    
     except Exception as e:
-        log(f"Erreur export HTML: {str(e)}", "error")
-        print_colored(f"[-] Erreur lors de l'export HTML: {str(e)}", "red")
+        log(f"Erreur export CSV: {str(e)}", "error")
+        print_colored(f"[-] Erreur lors de l'export CSV: {str(e)}", "red")
         return False
 
-def generate_html_report(data):
+def output_path_for(base_path, export_format, compress=False):
     """
-    Génère le contenu HTML du rapport
+    Construit le chemin de sortie d'un format à partir d'un chemin de base
+    
+    Une extension connue (.json, .csv, .gz...) est remplacée par celle du format.
     
     Args:
-        data (dict): Données à inclure dans le rapport
+        base_path (str): Chemin de base (ex: results/scan ou results/scan.json)
+        export_format (str): Format d'export
+        compress (bool): Ajoute l'extension .gz
+    
+    Returns:
+        str: Chemin du fichier pour ce format
+    """
+    stem = base_path[:-3] if base_path.endswith('.gz') else base_path
+    root, extension = os.path.splitext(stem)
+    if extension.lstrip('.') in EXPORT_FORMATS:
+        stem = root
+    return f"{stem}.{export_format}" + ('.gz' if compress else '')
+
+def export_results(data, base_path, formats=('json',), compress=False):
+    """
+    Exporte un résultat dans chacun des formats demandés
+    
+    Args:
+        data (dict): Données à exporter
+        base_path (str): Chemin de base des fichiers de sortie
+        formats (iterable): Formats parmi EXPORT_FORMATS
+        compress (bool): Compression gzip de chaque fichier
+    
+    Returns:
+        list: Chemins des fichiers écrits avec succès
+    """
+    exporters = {
+        'json': export_to_json,
+        'ndjson': export_to_ndjson,
+        'csv': export_to_csv,
+        'html': export_to_html,
+    }
+    
+    written = []
+    for export_format in formats:
+        output_path = output_path_for(base_path, export_format, compress)
+        if exporters[export_format](data, output_path, compress):
+            written.append(output_path)
+    return written
+
+class ExportStream:
+    """
+    Exports d'un résultat, ouverts avant l'exécution
+    
+    Les formats ligne à ligne (CSV, NDJSON) reçoivent les lignes des
+    résultats partiels au fil de l'eau : observer() se branche sur
+    PhaseScheduler (ctx.emit()), un sweep de plusieurs millions de lignes
+    est donc écrit pendant l'exécution, sans document de sortie construit
+    en mémoire. finish() n'ajoute ensuite que les lignes absentes du flux
+    (WHOIS, DNS, HTTP, certificats, PTR...). JSON et HTML, d'un seul
+    tenant, sont encodés par morceaux dans leur fichier à la fin.
+    
+    Un format dont l'écriture échoue est abandonné sans interrompre les
+    phases ni les autres formats.
+    
+    Args:
+        base_path (str): Chemin de base des fichiers de sortie
+        target (str): Cible de la commande (colonne target des lignes)
+        formats (iterable): Formats parmi EXPORT_FORMATS
+        compress (bool): Compression gzip de chaque fichier
+        defer (iterable): Phases dont les lignes ne sont écrites qu'à la fin,
+            une phase ultérieure les complétant (ports et banners)
+    
+    Raises:
+        OSError: Un fichier de sortie ne peut pas être créé
+    """
+    
+    def __init__(self, base_path, target, formats=('json',), compress=False, defer=()):
+        self.target = target
+        self.defer = set(defer)
+        self.rows = 0
+        self._streamed = set()
+        self._lock = threading.Lock()
+        self._sinks = {}
+        
+        try:
+            for export_format in formats:
+                output_path = output_path_for(base_path, export_format, compress)
+                f = _open_output(output_path, compress)
+                writer = None
+                if export_format == 'csv':
+                    writer = csv.DictWriter(f, fieldnames=ROW_FIELDS)
+                    writer.writeheader()
+                self._sinks[export_format] = (output_path, f, writer)
+        except OSError:
+            self.abort()
+            raise
+    
+    def _write(self, row):
+        for export_format, (output_path, f, writer) in list(self._sinks.items()):
+            try:
+                if export_format == 'csv':
+                    writer.writerow(row)
+                elif export_format == 'ndjson':
+                    f.write(json.dumps(row, ensure_ascii=False, default=_json_default) + '\n')
+            except Exception as e:
+                self._fail(export_format, e)
+    
+    def _fail(self, export_format, error):
+        output_path, f, _ = self._sinks.pop(export_format)
+        log(f"Erreur export {export_format.upper()} ({output_path}): {str(error)}", "error")
+        print_colored(f"[-] Erreur lors de l'export {export_format.upper()}: {str(error)}", "red")
+        try:
+            f.close()
+        except Exception:
+            pass
+    
+    def observer(self, phase, item):
+        """
+        Écrit les lignes d'un résultat partiel (observer de PhaseScheduler)
         
+        Args:
+            phase (str): Nom de la phase émettrice
+            item: Résultat partiel
+        """
+        if phase in self.defer:
+            return
+        
+        rows = list(iter_item_rows(self.target, phase, item))
+        if not rows:
+            return
+        
+        with self._lock:
+            for row in rows:
+                self._streamed.add(tuple(row.values()))
+                self._write(row)
+            self.rows += len(rows)
+    
+    def finish(self, results):
+        """
+        Complète et ferme les exports
+        
+        Args:
+            results (dict): Résultat final de la commande
+        
+        Returns:
+            list: Chemins des fichiers écrits avec succès
+        """
+        with self._lock:
+            if {'csv', 'ndjson'} & set(self._sinks):
+                for row in iter_rows(results):
+                    if tuple(row.values()) not in self._streamed:
+                        self._write(row)
+            self._streamed.clear()
+            
+            for export_format, (output_path, f, _) in list(self._sinks.items()):
+                try:
+                    if export_format == 'json':
+                        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_json_default)
+                        for chunk in encoder.iterencode(results):
+                            f.write(chunk)
+                    elif export_format == 'html':
+                        write_html_report(results, f)
+                    f.close()
+                except Exception as e:
+                    self._fail(export_format, e)
+                    continue
+                log(f"Export {export_format.upper()} réussi: {output_path}", "info")
+            
+            written = [output_path for output_path, _, _ in self._sinks.values()]
+            self._sinks.clear()
+        
+        return written
+    
+    def abort(self):
+        """Ferme et supprime les fichiers de sortie (aucun résultat à exporter)"""
+        with self._lock:
+            for output_path, f, _ in self._sinks.values():
+                try:
+                    f.close()
+                    os.remove(output_path)
+                except OSError:
+                    pass
+            self._sinks.clear()
+
+def export_to_html(data, output_path, compress=False):
+    """
+    Exporte les données au format HTML
+    
+    Args:
+        data (dict): Données à exporter
+        output_path (str): Chemin du fichier de sortie
+        compress (bool): Compression gzip
+    
     Returns:
-        str: Contenu HTML généré
+        bool: True si succès, False sinon
     """
-    html_template = """
-<!DOCTYPE html>
+    try:
+        with _open_output(output_path, compress) as f:
+            write_html_report(data, f)
+        
+        log(f"Export HTML réussi: {output_path}", "info")
+        return True
+    
+    except Exception as e:
+        log(f"Erreur export HTML: {str(e)}", "error")
+        print_colored(f"[-] Erreur lors de l'export HTML: {str(e)}", "red")
+        return False
+
+# Au-delà de ce nombre de lignes, un tableau est rendu côté navigateur
+# (données JSON embarquées, pagination, tri et filtre)
+HTML_INLINE_ROWS = 200
+
+# Lignes affichées par page pour les tableaux rendus côté navigateur
+HTML_PAGE_SIZE = 100
+
+HTML_HEADER = """<!DOCTYPE html>
 <html lang="fr">
 <head>
     <meta charset="UTF-8">
@@ -141,6 +553,9 @@ def generate_html_report(data):
             background-color: #3498db;
             color: white;
         }}
+        th.sortable {{
+            cursor: pointer;
+        }}
         .code {{
             background-color: #f8f9fa;
             border: 1px solid #e9ecef;
@@ -149,6 +564,11 @@ def generate_html_report(data):
             font-family: monospace;
             white-space: pre-wrap;
         }}
+        .controls {{
+            display: flex;
+            gap: 10px;
+            align-items: center;
+        }}
     </style>
 </head>
 <body>
@@ -159,9 +579,16 @@ def generate_html_report(data):
             <p><strong>Type:</strong> {scan_type}</p>
             <p><strong>Date:</strong> {timestamp}</p>
         </div>
-        
-        {content}
-        
+"""
+
+# Bandeau des résultats partiels (exécution annulée par Ctrl-C ou --max-time)
+HTML_INTERRUPTED = """
+        <div class="section">
+            <p class="warning">⚠️ Résultats partiels : exécution interrompue ({reason})</p>
+        </div>
+"""
+
+HTML_FOOTER = """
         <div class="section">
             <h2>📊 Résumé</h2>
             <p>Rapport généré automatiquement par Gaeksong</p>
@@ -170,180 +597,308 @@ def generate_html_report(data):
     </div>
 </body>
 </html>
+"""
+
+# Rendu des tableaux volumineux : pagination, tri par colonne et filtre texte
+HTML_TABLE_SCRIPT = """
+<script>
+document.querySelectorAll('script.table-data').forEach(function (blob) {
+    var rows = JSON.parse(blob.textContent);
+    var columns = JSON.parse(blob.dataset.columns);
+    var pageSize = parseInt(blob.dataset.pageSize, 10);
+    var statusColumn = columns.indexOf('Statut');
+    var haystack = rows.map(function (row) { return row.join(' ').toLowerCase(); });
+    var state = {filter: '', sort: -1, desc: false, page: 0, view: rows};
+    
+    var controls = document.createElement('div');
+    controls.className = 'controls';
+    var input = document.createElement('input');
+    input.placeholder = 'Filtrer...';
+    var prev = document.createElement('button');
+    prev.textContent = '◀';
+    var next = document.createElement('button');
+    next.textContent = '▶';
+    var info = document.createElement('span');
+    controls.append(input, prev, next, info);
+    
+    var table = document.createElement('table');
+    var head = table.createTHead().insertRow();
+    var body = table.createTBody();
+    columns.forEach(function (name, index) {
+        var th = document.createElement('th');
+        th.textContent = name;
+        th.className = 'sortable';
+        th.onclick = function () {
+            state.desc = state.sort === index ? !state.desc : false;
+            state.sort = index;
+            update();
+        };
+        head.appendChild(th);
+    });
+    
+    function compare(a, b) {
+        var x = a[state.sort], y = b[state.sort];
+        if (typeof x === 'number' && typeof y === 'number') { return x - y; }
+        return String(x).localeCompare(String(y), undefined, {numeric: true});
+    }
+    
+    function update() {
+        var needle = state.filter;
+        state.view = needle ? rows.filter(function (row, i) { return haystack[i].indexOf(needle) !== -1; }) : rows.slice();
+        if (state.sort >= 0) {
+            state.view.sort(compare);
+            if (state.desc) { state.view.reverse(); }
+        }
+        state.page = 0;
+        render();
+    }
+    
+    function render() {
+        var pages = Math.max(1, Math.ceil(state.view.length / pageSize));
+        state.page = Math.min(Math.max(state.page, 0), pages - 1);
+        var fragment = document.createDocumentFragment();
+        state.view.slice(state.page * pageSize, (state.page + 1) * pageSize).forEach(function (row) {
+            var tr = document.createElement('tr');
+            row.forEach(function (value, index) {
+                var td = tr.insertCell();
+                td.textContent = value === null ? '' : value;
+                if (index === statusColumn) { td.className = 'success'; }
+            });
+            fragment.appendChild(tr);
+        });
+        body.replaceChildren(fragment);
+        info.textContent = 'Page ' + (state.page + 1) + '/' + pages + ' (' + state.view.length + ' lignes)';
+    }
+    
+    input.oninput = function () { state.filter = input.value.toLowerCase(); update(); };
+    prev.onclick = function () { state.page--; render(); };
+    next.onclick = function () { state.page++; render(); };
+    
+    blob.parentNode.insertBefore(controls, blob);
+    blob.parentNode.insertBefore(table, blob);
+    update();
+});
+</script>
+"""
+
+class HTMLTable:
+    """
+    Tableau d'une section du rapport HTML
+    
+    Args:
+        title (str): Titre de la section
+        columns (list): Noms des colonnes
+        rows (iterable): Lignes (listes de valeurs), éventuellement un générateur
+        count (int): Nombre de lignes
+    """
+    
+    __slots__ = ('title', 'columns', 'rows', 'count')
+    
+    def __init__(self, title, columns, rows, count):
+        self.title = title
+        self.columns = columns
+        self.rows = rows
+        self.count = count
+
+def _cell(value):
+    return '' if value is None else html.escape(str(value))
+
+def _write_table(f, table, table_id):
     """
+    Écrit une section tableau dans le rapport
     
-    # Génération du contenu selon le type de scan
-    content_sections = []
+    Les petits tableaux sont écrits en HTML statique. Au-delà de
+    HTML_INLINE_ROWS lignes, les données sont embarquées en JSON compact et
+    rendues page par page par le navigateur.
     
-    if data['type'] == 'passive':
-        content_sections.extend(generate_passive_sections(data.get('data', {})))
-    elif data['type'] == 'active':
-        content_sections.extend(generate_active_sections(data.get('data', {})))
+    Args:
+        f (file): Fichier de sortie
+        table (HTMLTable): Tableau à écrire
+        table_id (int): Identifiant unique du tableau dans la page
+    """
+    f.write(f'\n        <div class="section">\n            <h2>{_cell(table.title)}</h2>\n')
     
-    content = '\n'.join(content_sections)
+    if table.count <= HTML_INLINE_ROWS:
+        status_column = table.columns.index('Statut') if 'Statut' in table.columns else -1
+        f.write('            <table>\n                <tr>')
+        f.write(''.join(f'<th>{_cell(name)}</th>' for name in table.columns))
+        f.write('</tr>\n')
+        for row in table.rows:
+            cells = (f'<td><span class="success">{_cell(value)}</span></td>' if index == status_column
+                     else f'<td>{_cell(value)}</td>' for index, value in enumerate(row))
+            f.write('                <tr>' + ''.join(cells) + '</tr>\n')
+        f.write('            </table>\n')
+    else:
+        columns = html.escape(json.dumps(table.columns, ensure_ascii=False))
+        f.write(f'            <script type="application/json" class="table-data" id="table-{table_id}" '
+                f'data-columns="{columns}" data-page-size="{HTML_PAGE_SIZE}">[')
+        for index, row in enumerate(table.rows):
+            if index:
+                f.write(',')
+            # "</" fermerait la balise script : échappé en "<\\/"
+            f.write(json.dumps(row, ensure_ascii=False, separators=(',', ':'), default=_json_default).replace('</', '<\\/'))
+        f.write(']</script>\n')
     
-    return html_template.format(
-        target=data.get('target', 'N/A'),
-        scan_type=data.get('type', 'N/A').title(),
-        timestamp=data.get('timestamp', 'N/A'),
-        content=content
-    )
+    f.write('        </div>\n')
 
-def generate_passive_sections(data):
+def _banner_for(banners, port):
+    # Les clés de port deviennent des chaînes après un aller-retour JSON
+    banner_info = (banners or {}).get(port) or (banners or {}).get(str(port))
+    return banner_info.get('banner') if banner_info else None
+
+def iter_passive_tables(data):
     """
-    Génère les sections HTML pour la reconnaissance passive
+    Génère les tableaux HTML de la reconnaissance passive
     
     Args:
         data (dict): Données de reconnaissance passive
-        
-    Returns:
-        list: Liste des sections HTML
-    """
-    sections = []
     
-    # Section WHOIS
-    if 'whois' in data and data['whois']:
+    Yields:
+        HTMLTable: Tableau de chaque section présente
+    """
+    if data.get('whois'):
         whois_data = data['whois']
-        whois_html = f"""
-        <div class="section">
-            <h2>🏢 Informations WHOIS</h2>
-            <table>
-                <tr><th>Propriété</th><th>Valeur</th></tr>
-                <tr><td>Nom de domaine</td><td>{whois_data.get('domain_name', 'N/A')}</td></tr>
-                <tr><td>Registrar</td><td>{whois_data.get('registrar', 'N/A')}</td></tr>
-                <tr><td>Date de création</td><td>{whois_data.get('creation_date', 'N/A')}</td></tr>
-                <tr><td>Date d'expiration</td><td>{whois_data.get('expiration_date', 'N/A')}</td></tr>
-                <tr><td>Dernière mise à jour</td><td>{whois_data.get('updated_date', 'N/A')}</td></tr>
-                <tr><td>Organisation</td><td>{whois_data.get('org', 'N/A')}</td></tr>
-                <tr><td>Pays</td><td>{whois_data.get('country', 'N/A')}</td></tr>
-                <tr><td>Serveurs de noms</td><td>{', '.join(whois_data.get('name_servers', [])) if whois_data.get('name_servers') else 'N/A'}</td></tr>
-                <tr><td>Emails</td><td>{', '.join(whois_data.get('emails', [])) if whois_data.get('emails') else 'N/A'}</td></tr>
-            </table>
-        </div>
-        """
-        sections.append(whois_html)
+        labels = [('domain_name', 'Nom de domaine'), ('registrar', 'Registrar'),
+                  ('creation_date', 'Date de création'), ('expiration_date', "Date d'expiration"),
+                  ('updated_date', 'Dernière mise à jour'), ('org', 'Organisation'),
+                  ('country', 'Pays'), ('name_servers', 'Serveurs de noms'), ('emails', 'Emails')]
+        rows = []
+        for key, label in labels:
+            value = whois_data.get(key)
+            rows.append([label, ', '.join(map(str, value)) if isinstance(value, list) else (value or 'N/A')])
+        yield HTMLTable('🏢 Informations WHOIS', ['Propriété', 'Valeur'], rows, len(rows))
     
-    # Section DNS
-    if 'dns' in data and data['dns']:
-        dns_data = data['dns']
-        dns_html = """
-        <div class="section">
-            <h2>🌐 Enregistrements DNS</h2>
-        """
-        
-        for record_type, records in dns_data.items():
-            if records:
-                dns_html += f"<h3>Enregistrements {record_type}</h3>"
-                dns_html += "<ul>"
-                for record in records:
-                    if isinstance(record, dict):
-                        if record_type == 'MX':
-                            dns_html += f"<li><strong>Priorité {record['priority']}:</strong> {record['exchange']}</li>"
-                        elif record_type == 'SOA':
-                            dns_html += f"<li><strong>MNAME:</strong> {record['mname']}, <strong>RNAME:</strong> {record['rname']}</li>"
-                    else:
-                        dns_html += f"<li>{record}</li>"
-                dns_html += "</ul>"
-        
-        dns_html += "</div>"
-        sections.append(dns_html)
+    if data.get('dns'):
+        rows = []
+        for record_type, records in data['dns'].items():
+            for record in records or []:
+                if isinstance(record, dict) and record_type == 'MX':
+                    record = f"Priorité {record.get('priority')}: {record.get('exchange')}"
+                elif isinstance(record, dict) and record_type == 'SOA':
+                    record = f"MNAME: {record.get('mname')}, RNAME: {record.get('rname')}"
+                rows.append([record_type, record])
+        yield HTMLTable('🌐 Enregistrements DNS', ['Type', 'Valeur'], rows, len(rows))
     
-    # Section Sous-domaines
-    if 'subdomains' in data and data['subdomains']:
+    if data.get('subdomains'):
         subdomains = data['subdomains']
-        subdomains_html = f"""
-        <div class="section">
-            <h2>🔍 Sous-domaines découverts ({len(subdomains)} trouvés)</h2>
-            <table>
-                <tr><th>Sous-domaine</th><th>Adresses IP</th><th>Statut</th></tr>
-        """
-        
-        for subdomain in subdomains:
-            ips = ', '.join(subdomain.get('ips', []))
-            subdomains_html += f"""
-                <tr>
-                    <td>{subdomain.get('subdomain', 'N/A')}</td>
-                    <td>{ips}</td>
-                    <td><span class="success">{subdomain.get('status', 'N/A')}</span></td>
-                </tr>
-            """
-        
-        subdomains_html += "</table></div>"
-        sections.append(subdomains_html)
+        rows = ([entry.get('subdomain', 'N/A'), ', '.join(entry.get('ips', [])), entry.get('status', 'N/A')]
+                for entry in subdomains)
+        yield HTMLTable(f'🔍 Sous-domaines découverts ({len(subdomains)} trouvés)',
+                        ['Sous-domaine', 'Adresses IP', 'Statut'], rows, len(subdomains))
+    
+    if data.get('http'):
+        responses = data['http']
+        rows = ([response.get('url', 'N/A'), response.get('status', 'N/A'), response.get('title') or '',
+                 response.get('server') or '',
+                 ' → '.join(r.get('location', '') for r in response.get('redirects') or []),
+                 response.get('content_length', 'N/A')]
+                for response in responses)
+        yield HTMLTable(f'🌍 Sondage HTTP ({len(responses)} réponses)',
+                        ['URL', 'Statut', 'Titre', 'Serveur', 'Redirections', 'Taille'], rows, len(responses))
     
-    return sections
+    if data.get('certificates'):
+        certificates = data['certificates']
+        rows = ([f"{certificate.get('ip', 'N/A')}:{certificate.get('port', 'N/A')}", certificate.get('sni') or '',
+                 certificate.get('subject') or '', certificate.get('issuer') or '',
+                 certificate.get('not_after') or 'N/A', ', '.join(certificate.get('san') or [])]
+                for certificate in certificates)
+        yield HTMLTable(f'🔒 Certificats TLS ({len(certificates)} certificats)',
+                        ['Hôte', 'SNI', 'Sujet', 'Émetteur', 'Expiration', 'SAN'], rows, len(certificates))
 
-def generate_active_sections(data):
+def iter_active_tables(data):
     """
-    Génère les sections HTML pour la reconnaissance active
+    Génère les tableaux HTML de la reconnaissance active
     
     Args:
         data (dict): Données de reconnaissance active
-        
-    Returns:
-        list: Liste des sections HTML
-    """
-    sections = []
     
-    # Section Ping Sweep
-    if 'ping_sweep' in data and data['ping_sweep']:
+    Yields:
+        HTMLTable: Tableau de chaque section présente
+    """
+    if data.get('ping_sweep'):
         hosts = data['ping_sweep']
-        ping_html = f"""
-        <div class="section">
-            <h2>📡 Ping Sweep ({len(hosts)} hôtes actifs)</h2>
-            <table>
-                <tr><th>Adresse IP</th><th>Statut</th><th>Temps de réponse</th></tr>
-        """
-        
-        for host in hosts:
-            ping_html += f"""
-                <tr>
-                    <td>{host.get('ip', 'N/A')}</td>
-                    <td><span class="success">{host.get('status', 'N/A')}</span></td>
-                    <td>{host.get('response_time', 'N/A')}</td>
-                </tr>
-            """
-        
-        ping_html += "</table></div>"
-        sections.append(ping_html)
+        rows = ([host.get('ip', 'N/A'), host.get('status', 'N/A'), host.get('response_time', 'N/A')] for host in hosts)
+        yield HTMLTable(f'📡 Ping Sweep ({len(hosts)} hôtes actifs)',
+                        ['Adresse IP', 'Statut', 'Temps de réponse'], rows, len(hosts))
     
-    # Section Port Scan
-    if 'port_scan' in data and data['port_scan']:
+    if data.get('port_scan'):
         ports = data['port_scan']
-        port_html = f"""
-        <div class="section">
-            <h2>🔌 Scan de ports ({len(ports)} ports ouverts)</h2>
-            <table>
-                <tr><th>Port</th><th>Statut</th><th>Service</th></tr>
-        """
-        
-        for port in ports:
-            port_html += f"""
-                <tr>
-                    <td>{port.get('port', 'N/A')}</td>
-                    <td><span class="success">{port.get('status', 'N/A')}</span></td>
-                    <td>{port.get('service', 'N/A')}</td>
-                </tr>
-            """
-        
-        port_html += "</table></div>"
-        sections.append(port_html)
+        rows = ([port.get('port', 'N/A'), port.get('status', 'N/A'), port.get('service', 'N/A')] for port in ports)
+        yield HTMLTable(f'🔌 Scan de ports ({len(ports)} ports ouverts)',
+                        ['Port', 'Statut', 'Service'], rows, len(ports))
     
-    # Section Banners
-    if 'banners' in data and data['banners']:
+    if data.get('banners'):
         banners = data['banners']
-        banner_html = f"""
-        <div class="section">
-            <h2>📋 Banner Grabbing ({len(banners)} banners collectés)</h2>
-        """
-        
-        for port, banner_info in banners.items():
-            banner_html += f"""
-            <h3>Port {port} ({banner_info.get('service', 'Unknown')})</h3>
-            <div class="code">{banner_info.get('banner', 'N/A')}</div>
-            """
-        
-        banner_html += "</div>"
-        sections.append(banner_html)
+        rows = ([port, banner_info.get('service', 'Unknown'), banner_info.get('banner', 'N/A')]
+                for port, banner_info in banners.items())
+        yield HTMLTable(f'📋 Banner Grabbing ({len(banners)} banners collectés)',
+                        ['Port', 'Service', 'Banner'], rows, len(banners))
+    
+    # Hôtes scannés (pipeline, --scan-alive)
+    if data.get('hosts'):
+        hosts = data['hosts']
+        host_banners = data.get('host_banners') or {}
+        ip_names = data.get('ip_names') or {}
+        rows = ([ip, ', '.join(ip_names.get(ip, [])), port.get('port', 'N/A'), port.get('service', 'N/A'),
+                 (_banner_for(host_banners.get(ip), port.get('port')) or '')[:80]]
+                for ip, ports in hosts.items() for port in ports)
+        yield HTMLTable(f'🖥️ Hôtes scannés ({len(hosts)} IPs)',
+                        ['Adresse IP', 'Noms', 'Port', 'Service', 'Banner'], rows,
+                        sum(len(ports) for ports in hosts.values()))
     
-    return sections
\ No newline at end of file
+    if data.get('udp_scan'):
+        udp_hosts = data['udp_scan']
+        count = sum(len(ports) for ports in udp_hosts.values())
+        rows = ([ip, f"{port.get('port', 'N/A')}/udp", port.get('status', 'N/A'), port.get('service', 'N/A')]
+                for ip, ports in udp_hosts.items() for port in ports)
+        yield HTMLTable(f'📶 Scan UDP ({count} ports ouverts)',
+                        ['Adresse IP', 'Port', 'Statut', 'Service'], rows, count)
+
+def write_html_report(data, f):
+    """
+    Écrit le rapport HTML section par section
+    
+    Chaque morceau est écrit dès qu'il est produit : le coût est linéaire
+    en nombre de lignes et le document complet n'est jamais construit.
+    
+    Args:
+        data (dict): Données à inclure dans le rapport
+        f (file): Fichier de sortie texte
+    """
+    f.write(HTML_HEADER.format(
+        target=_cell(data.get('target', 'N/A')),
+        scan_type=_cell(data.get('type', 'N/A').title()),
+        timestamp=_cell(data.get('timestamp', 'N/A'))
+    ))
+    if data.get('interrupted'):
+        f.write(HTML_INTERRUPTED.format(reason=_cell(data['interrupted'])))
+    
+    sections = data.get('data', {})
+    tables = []
+    if data['type'] in ('passive', 'pipeline'):
+        tables.append(iter_passive_tables(sections))
+    if data['type'] in ('active', 'pipeline'):
+        tables.append(iter_active_tables(sections))
+    
+    embedded = False
+    for table_id, table in enumerate(itertools.chain.from_iterable(tables)):
+        _write_table(f, table, table_id)
+        embedded = embedded or table.count > HTML_INLINE_ROWS
+    
+    if embedded:
+        f.write(HTML_TABLE_SCRIPT)
+    f.write(HTML_FOOTER)
+
+def generate_html_report(data):
+    """
+    Génère le contenu HTML du rapport
+    
+    Args:
+        data (dict): Données à inclure dans le rapport
+    
+    Returns:
+        str: Contenu HTML généré
+    """
+    buffer = io.StringIO()
+    write_html_report(data, buffer)
+    return buffer.getvalue()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module de fusion des résultats
+Tri externe et fusion k-voies de fichiers de résultats, déduplication et agrégats en mémoire bornée
+"""
+
+import os
+import csv
+import glob
+import gzip
+import json
+import heapq
+import shutil
+import tempfile
+import ipaddress
+import itertools
+from collections import Counter, defaultdict
+from modules.export import ROW_FIELDS, iter_rows, output_path_for, export_to_json, _open_output, _json_default
+from modules.utils import log, print_colored
+
+# Formats de sortie de la fusion (une ligne par enregistrement)
+MERGE_FORMATS = ('ndjson', 'csv')
+
+# Extensions reconnues dans les dossiers d'entrée
+INPUT_SUFFIXES = ('.json', '.ndjson', '.csv', '.json.gz', '.ndjson.gz', '.csv.gz')
+
+# Lignes triées en mémoire avant d'être écrites dans un fichier temporaire
+DEFAULT_RUN_SIZE = 200000
+
+# Nombre maximum de fichiers temporaires fusionnés à la fois
+MERGE_FAN_IN = 128
+
+# Préfixe des sous-réseaux IPv6 dans les agrégats
+IPV6_SUBNET_PREFIX = 64
+
+# Champs identifiant un enregistrement, par section : deux lignes de même
+# clé sont fusionnées (ex: un port par (hôte, protocole, port), un
+# sous-domaine par (nom, IP))
+DEDUP_KEYS = {
+    'subdomain': ('name', 'host'),
+    'host': ('host',),
+    'port': ('host', 'protocol', 'port'),
+    'http': ('name',),
+    'certificate': ('host', 'port', 'name'),
+    'dns': ('target', 'service', 'detail'),
+    'whois': ('target', 'service')
+}
+
+def expand_inputs(paths):
+    """
+    Développe les entrées de la fusion (fichiers, dossiers, motifs glob)
+    
+    Args:
+        paths (list): Fichiers, dossiers ou motifs
+    
+    Returns:
+        list: Fichiers de résultats, sans doublon
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if name.endswith(INPUT_SUFFIXES)))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            matches = sorted(glob.glob(path))
+            if not matches:
+                log(f"Entrée de fusion introuvable: {path}", "warning")
+            files.extend(matches)
+    
+    return list(dict.fromkeys(files))
+
+def _open_input(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace', newline='')
+    return open(path, 'r', encoding='utf-8', errors='replace', newline='')
+
+def _normalize(row):
+    """Ramène une ligne aux colonnes ROW_FIELDS (vide -> None, port -> int)"""
+    row = {field: row.get(field) if row.get(field) != '' else None for field in ROW_FIELDS}
+    port = row['port']
+    if isinstance(port, str) and port.isdigit():
+        row['port'] = int(port)
+    return row
+
+def _object_rows(obj):
+    """Lignes d'un objet JSON : ligne d'export (section) ou résultat complet (data)"""
+    if isinstance(obj, list):
+        for item in obj:
+            yield from _object_rows(item)
+    elif isinstance(obj, dict):
+        if 'section' in obj:
+            yield _normalize(obj)
+        elif 'data' in obj:
+            for row in iter_rows(obj):
+                yield _normalize(row)
+
+def iter_file_rows(path):
+    """
+    Lit les lignes d'un fichier de résultats, quel que soit son format
+    
+    Formats acceptés (éventuellement gzip) : JSON d'une commande, NDJSON du
+    mode batch (un résultat par ligne), NDJSON et CSV d'export (une ligne
+    par enregistrement). Une ligne NDJSON tronquée (exécution interrompue)
+    est ignorée.
+    
+    Args:
+        path (str): Chemin du fichier
+    
+    Yields:
+        dict: Ligne avec les colonnes ROW_FIELDS
+    """
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith('.csv'):
+        with _open_input(path) as f:
+            for row in csv.DictReader(f):
+                yield _normalize(row)
+        return
+    
+    with _open_input(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                if number == 1:
+                    break
+                log(f"{path}:{number}: ligne JSON invalide ignorée", "warning")
+                continue
+            yield from _object_rows(obj)
+        else:
+            return
+    
+    # Première ligne illisible : document JSON indenté sur plusieurs lignes
+    with _open_input(path) as f:
+        yield from _object_rows(json.load(f))
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, int):
+        # Tri numérique des ports
+        return f"{value:05d}"
+    return str(value)
+
+def merge_key(row):
+    """
+    Clé de tri et de déduplication d'une ligne
+    
+    La clé commence par l'hôte : toutes les lignes d'une même IP sont
+    contiguës dans le flux fusionné, ce qui permet de compter les hôtes
+    distincts sans les garder en mémoire.
+    
+    Args:
+        row (dict): Ligne normalisée
+    
+    Returns:
+        tuple: Clé (chaînes comparables)
+    """
+    fields = DEDUP_KEYS.get(row['section'], ROW_FIELDS)
+    return (_text(row['host']), _text(row['section'])) + tuple(_text(row[field]) for field in fields)
+
+def _combine(kept, row):
+    """Complète une ligne avec les champs renseignés d'un doublon (ex: banner absent d'un des scans)"""
+    for field in ROW_FIELDS:
+        if kept[field] is None and row[field] is not None:
+            kept[field] = row[field]
+    return kept
+
+def _dedup_sorted(items):
+    """Fusionne les doublons consécutifs d'un flux de (clé, ligne) trié"""
+    for key, group in itertools.groupby(items, key=lambda item: item[0]):
+        _, kept = next(group)
+        for _, row in group:
+            kept = _combine(kept, row)
+        yield key, kept
+
+def _write_run(items, directory):
+    """Écrit un flux trié de (clé, ligne) dans un fichier temporaire"""
+    fd, path = tempfile.mkstemp(suffix='.run', dir=directory)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for key, row in items:
+            f.write(json.dumps([key, row], ensure_ascii=False, default=_json_default) + '\n')
+    return path
+
+def _read_run(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            key, row = json.loads(line)
+            yield tuple(key), row
+
+def _merge_runs(paths):
+    """Fusion k-voies de fichiers temporaires triés"""
+    return heapq.merge(*(_read_run(path) for path in paths), key=lambda item: item[0])
+
+class MergeStats:
+    """
+    Agrégats calculés en une passe sur le flux fusionné
+    
+    La mémoire dépend du nombre de ports, services et sous-réseaux
+    distincts, pas du nombre de lignes.
+    
+    Args:
+        subnet_prefix (int): Préfixe des sous-réseaux IPv4 pour le comptage des hôtes
+    """
+    
+    def __init__(self, subnet_prefix=24):
+        self.subnet_prefix = subnet_prefix
+        self.files = 0
+        self.input_rows = 0
+        self.rows = 0
+        self.sections = Counter()
+        self.services = defaultdict(Counter)
+        self.subnets = Counter()
+        self._last_host = None
+    
+    def add(self, row):
+        """
+        Compte une ligne du flux fusionné (lignes triées par hôte)
+        
+        Args:
+            row (dict): Ligne dédupliquée
+        """
+        self.rows += 1
+        self.sections[row['section']] += 1
+        
+        if row['section'] == 'port':
+            self.services[f"{row['port']}/{row['protocol']}"][row['service'] or 'unknown'] += 1
+        
+        host = row['host']
+        if host and host != self._last_host:
+            self._last_host = host
+            try:
+                address = ipaddress.ip_address(host)
+            except ValueError:
+                return
+            prefix = self.subnet_prefix if address.version == 4 else IPV6_SUBNET_PREFIX
+            self.subnets[str(ipaddress.ip_network(f"{host}/{prefix}", strict=False))] += 1
+    
+    def to_dict(self):
+        """
+        Résumé de la fusion
+        
+        Returns:
+            dict: Compteurs, services par port et hôtes par sous-réseau (triés par fréquence)
+        """
+        services = sorted(self.services.items(), key=lambda item: -sum(item[1].values()))
+        return {
+            'type': 'merge',
+            'files': self.files,
+            'input_rows': self.input_rows,
+            'rows': self.rows,
+            'duplicates': self.input_rows - self.rows,
+            'sections': dict(self.sections.most_common()),
+            'services_per_port': {port: dict(counts.most_common()) for port, counts in services},
+            'hosts_per_subnet': dict(self.subnets.most_common())
+        }
+
+def merge_results(paths, base_path, formats=('ndjson',), compress=False, subnet_prefix=24,
+                  run_size=DEFAULT_RUN_SIZE):
+    """
+    Fusionne des fichiers de résultats en un flux dédupliqué et ses agrégats
+    
+    Chaque entrée est lue une seule fois. Les lignes sont triées par blocs
+    de run_size en mémoire et écrites dans des fichiers temporaires, puis
+    fusionnées (fusion k-voies) : les doublons deviennent contigus et sont
+    fusionnés à la volée. La mémoire est bornée par run_size, quel que soit
+    le nombre de fichiers.
+    
+    Args:
+        paths (list): Fichiers, dossiers ou motifs glob à fusionner
+        base_path (str): Chemin de sortie sans extension
+        formats (list): Formats de sortie parmi MERGE_FORMATS
+        compress (bool): Compression gzip des sorties
+        subnet_prefix (int): Préfixe IPv4 pour le comptage des hôtes par sous-réseau
+        run_size (int): Nombre de lignes triées en mémoire
+    
+    Returns:
+        dict: Agrégats (voir MergeStats.to_dict) avec les fichiers écrits, ou None si aucune entrée
+    """
+    files = expand_inputs(paths)
+    if not files:
+        print_colored("[-] Aucun fichier de résultats à fusionner", "red")
+        return None
+    
+    print_colored(f"[*] Fusion de {len(files)} fichiers de résultats", "blue")
+    stats = MergeStats(subnet_prefix)
+    workdir = tempfile.mkdtemp(prefix='gaeksong-merge-')
+    
+    try:
+        # Passe unique sur les entrées : blocs triés et dédupliqués
+        runs = []
+        chunk = []
+        for path in files:
+            try:
+                for row in iter_file_rows(path):
+                    stats.input_rows += 1
+                    chunk.append((merge_key(row), row))
+                    if len(chunk) >= run_size:
+                        chunk.sort(key=lambda item: item[0])
+                        runs.append(_write_run(_dedup_sorted(chunk), workdir))
+                        chunk = []
+                stats.files += 1
+            except (OSError, ValueError) as e:
+                log(f"Fichier de résultats illisible {path}: {str(e)}", "error")
+        
+        chunk.sort(key=lambda item: item[0])
+        
+        # Trop de blocs pour les ouvrir tous : fusions intermédiaires
+        while len(runs) > MERGE_FAN_IN:
+            runs = [_write_run(_dedup_sorted(_merge_runs(runs[i:i + MERGE_FAN_IN])), workdir)
+                    for i in range(0, len(runs), MERGE_FAN_IN)]
+        
+        merged = heapq.merge(iter(chunk), *(_read_run(path) for path in runs), key=lambda item: item[0])
+        
+        written = []
+        outputs = []
+        try:
+            for merge_format in formats:
+                path = output_path_for(base_path, merge_format, compress)
+                f = _open_output(path, compress)
+                outputs.append((merge_format, f, csv.DictWriter(f, fieldnames=ROW_FIELDS)))
+                written.append(path)
+            
+            for merge_format, f, writer in outputs:
+                if merge_format == 'csv':
+                    writer.writeheader()
+            
+            for _, row in _dedup_sorted(merged):
+                stats.add(row)
+                for merge_format, f, writer in outputs:
+                    if merge_format == 'csv':
+                        writer.writerow(row)
+                    else:
+                        f.write(json.dumps(row, ensure_ascii=False, default=_json_default) + '\n')
+        finally:
+            for _, f, _ in outputs:
+                f.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    summary = stats.to_dict()
+    stats_path = output_path_for(f"{base_path}_stats", 'json', compress)
+    if export_to_json(summary, stats_path, compress):
+        written.append(stats_path)
+    
+    summary['output'] = written
+    log(f"Fusion terminée: {stats.files} fichiers, {stats.rows} lignes, {summary['duplicates']} doublons", "info")
+    return summary
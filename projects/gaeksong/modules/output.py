@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module d'affichage
+Rendu du terminal dans un thread dédié : écritures groupées et résumé des résultats sur les scans rapides
+"""
+
+import sys
+import time
+import queue
+import atexit
+import threading
+from modules.utils import get_config
+
+# Codes ANSI des couleurs de print_colored()
+COLORS = {
+    'red': '\033[91m',
+    'green': '\033[92m',
+    'blue': '\033[94m',
+    'yellow': '\033[93m',
+    'white': '\033[0m',
+    'cyan': '\033[96m',
+    'magenta': '\033[95m'
+}
+RESET = '\033[0m'
+
+# Résultats par seconde au-delà desquels le détail est remplacé par un résumé
+DEFAULT_SUMMARY_THRESHOLD = 200
+
+# Période du résumé et de la mesure du débit des résultats, en secondes
+SUMMARY_INTERVAL = 1.0
+
+# Nombre maximum de messages regroupés dans une écriture
+MAX_BATCH = 1024
+
+# Attente maximale de l'écriture des derniers messages à la sortie du processus
+EXIT_FLUSH_TIMEOUT = 5.0
+
+class OutputRenderer:
+    """
+    Rendu du terminal dans un thread dédié
+    
+    Les threads et coroutines des moteurs déposent leurs messages dans une
+    file sans toucher à stdout ; le thread de rendu les formate et les
+    écrit par lots, en une écriture par lot. Les résultats unitaires (port
+    ouvert, sous-domaine trouvé...) sont comptés : au-delà de
+    `summary_threshold` résultats par seconde, leur détail est remplacé par
+    une ligne de résumé par seconde, jusqu'à ce que le débit retombe sous
+    la moitié du seuil. Les exports restent complets.
+    
+    Args:
+        stream (file): Flux de sortie (défaut: sys.stdout au moment de l'écriture)
+        colored (bool): Couleurs ANSI
+        quiet (bool): Masque les résultats unitaires (messages d'état et bilans seulement)
+        verbose (bool): Détail de tous les résultats, sans passage en résumé
+        summary_threshold (float): Résultats par seconde déclenchant le résumé
+    """
+    
+    def __init__(self, stream=None, colored=True, quiet=False, verbose=False,
+                 summary_threshold=DEFAULT_SUMMARY_THRESHOLD):
+        self.stream = stream
+        self.colored = colored
+        self.quiet = quiet
+        self.verbose = verbose
+        self.summary_threshold = summary_threshold
+        self.findings = 0
+        self.summarizing = False
+        self._hidden = 0
+        self._window_count = 0
+        self._window_start = time.monotonic()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='output', daemon=True)
+        self._thread.start()
+    
+    def write(self, message, color='white', finding=False):
+        """
+        Dépose un message (sans attendre son écriture)
+        
+        Args:
+            message (str): Message à afficher
+            color (str): Couleur (voir COLORS)
+            finding (bool): Résultat unitaire, pouvant être résumé ou masqué
+        """
+        self._queue.put(('finding' if finding else 'line', message, color))
+    
+    def flush(self, timeout=None):
+        """
+        Attend l'écriture de tous les messages déjà déposés
+        
+        Args:
+            timeout (float): Attente maximale en secondes
+        
+        Returns:
+            bool: True si tout a été écrit
+        """
+        done = threading.Event()
+        self._queue.put(('flush', done, None))
+        return done.wait(timeout)
+    
+    def _format(self, message, color):
+        if not self.colored:
+            return f"{message}\n"
+        return f"{COLORS.get(color.lower(), RESET)}{message}{RESET}\n"
+    
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=SUMMARY_INTERVAL)]
+            except queue.Empty:
+                batch = []
+            
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            self._write_batch(batch)
+    
+    def _write_batch(self, batch):
+        """Formate un lot de messages et l'écrit en une fois"""
+        lines = []
+        waiters = []
+        
+        for kind, message, color in batch:
+            if kind == 'flush':
+                waiters.append(message)
+                continue
+            
+            if kind == 'finding':
+                self.findings += 1
+                self._window_count += 1
+                if (not self.summarizing and not self.verbose
+                        and self._window_count > self.summary_threshold * SUMMARY_INTERVAL):
+                    self.summarizing = True
+                    if not self.quiet:
+                        lines.append(self._format(f"[*] Plus de {self.summary_threshold:g} résultats/s: affichage "
+                                                  f"résumé (détail complet dans les exports)", 'blue'))
+                if self.quiet or self.summarizing:
+                    self._hidden += 1
+                    continue
+            elif self._hidden:
+                # Les résultats masqués sont résumés avant le message qui les suit
+                lines.extend(self._summary())
+            
+            lines.append(self._format(message, color))
+        
+        lines.extend(self._tick(flushing=bool(waiters)))
+        
+        if lines:
+            try:
+                stream = self.stream or sys.stdout
+                stream.write(''.join(lines))
+                stream.flush()
+            except (OSError, ValueError):
+                # Terminal fermé : l'affichage ne doit pas interrompre la reconnaissance
+                pass
+        
+        for waiter in waiters:
+            waiter.set()
+    
+    def _tick(self, flushing=False):
+        """
+        Clôt la fenêtre de mesure du débit (au plus une fois par SUMMARY_INTERVAL)
+        
+        Args:
+            flushing (bool): Un flush attend : les résultats masqués sont résumés sans attendre
+        
+        Returns:
+            list: Lignes de résumé et de changement de mode à écrire
+        """
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        lines = []
+        
+        if self._hidden and (flushing or elapsed >= SUMMARY_INTERVAL):
+            lines.extend(self._summary())
+        
+        if elapsed >= SUMMARY_INTERVAL:
+            rate = self._window_count / elapsed
+            self._window_start = now
+            self._window_count = 0
+            if self.summarizing and rate < self.summary_threshold / 2:
+                self.summarizing = False
+                if not self.quiet:
+                    lines.append(self._format("[*] Débit des résultats redescendu: affichage détaillé", 'blue'))
+        
+        return lines
+    
+    def _summary(self):
+        """Ligne de résumé des résultats masqués depuis le dernier résumé (aucune en mode quiet)"""
+        hidden, self._hidden = self._hidden, 0
+        if self.quiet:
+            return []
+        
+        elapsed = max(SUMMARY_INTERVAL, time.monotonic() - self._window_start)
+        rate = self._window_count / elapsed
+        return [self._format(f"[+] {hidden} résultats ({self.findings} au total, {rate:.0f}/s)", 'green')]
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+def get_renderer():
+    """
+    Retourne le rendu du terminal du processus (démarré au premier appel)
+    
+    Les options sont lues dans la section [OUTPUT] de config.ini
+    (colored_output, quiet, verbose, summary_threshold). Les messages
+    encore en file sont écrits à la sortie du processus.
+    
+    Returns:
+        OutputRenderer: Rendu partagé
+    """
+    global _renderer
+    
+    with _renderer_lock:
+        if _renderer is None:
+            config = get_config()
+            _renderer = OutputRenderer(
+                colored=config.getboolean('OUTPUT', 'colored_output', fallback=True),
+                quiet=config.getboolean('OUTPUT', 'quiet', fallback=False),
+                verbose=config.getboolean('OUTPUT', 'verbose', fallback=False),
+                summary_threshold=config.getfloat('OUTPUT', 'summary_threshold', fallback=DEFAULT_SUMMARY_THRESHOLD)
+            )
+            atexit.register(_renderer.flush, EXIT_FLUSH_TIMEOUT)
+    
+    return _renderer
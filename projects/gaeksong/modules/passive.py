@@ -5,13 +5,65 @@ Module de reconnaissance passive
 Fonctions pour WHOIS, DNS et bruteforce de sous-domaines
 """
 
-import whois
+import asyncio
 import dns.resolver
+import dns.reversename
 import dns.exception
+import dns.name
+import dns.query
+import dns.zone
 import socket
 import threading
 import time
-from modules.utils import log, print_colored, load_wordlist
+import ipaddress
+from collections import deque
+from modules.utils import log, print_colored, print_finding, get_fd_budget, get_config, config_list, get_cancel_token
+from modules.records import SubdomainRecord
+from modules.resolvers import ResolverPool
+from modules.scope import get_scope
+from modules.wordlists import ExactFilter, make_filter, open_wordlists, DEFAULT_ERROR_RATE
+from modules.timing import get_timing
+from modules.retry import RetryPolicy, get_retry_stats
+from modules.runtime import get_runtime
+
+# Cache négatif PTR (ip -> expiration) partagé entre les sweeps
+PTR_NEGATIVE_TTL = 3600
+_ptr_negative_cache = {}
+
+# Cache WHOIS (domaine -> (expiration, résultat)) : les réponses changent
+# rarement et les serveurs WHOIS limitent sévèrement le débit
+WHOIS_CACHE_TTL = 86400
+_whois_cache = {}
+
+# Résolveur partagé entre tous les threads (et tous les domaines en mode batch)
+_resolver = None
+_resolver_lock = threading.Lock()
+
+def get_resolver():
+    """
+    Retourne le résolveur DNS partagé, avec un cache LRU commun
+    
+    Les serveurs sont ceux de dns_servers dans config.ini (ceux du système
+    à défaut) ; les requêtes sont réparties selon leur santé.
+    
+    Returns:
+        ResolverPool: Résolveur partagé
+    """
+    global _resolver
+    
+    with _resolver_lock:
+        if _resolver is None:
+            config = get_config()
+            servers = config_list('PASSIVE', 'dns_servers') or dns.resolver.Resolver().nameservers
+            _resolver = ResolverPool(
+                servers,
+                timeout=get_timing().dns_timeout,
+                verify_servers=config_list('PASSIVE', 'dns_verify_servers'),
+                quarantine=config.getfloat('PASSIVE', 'dns_quarantine', fallback=30)
+            )
+            log(f"Résolveurs DNS: {', '.join(servers)}", "info")
+    
+    return _resolver
 
 def whois_lookup(domain):
     """
@@ -19,10 +71,18 @@ def whois_lookup(domain):
     
     Args:
         domain (str): Le domaine à analyser
-        
+    
     Returns:
         dict: Informations WHOIS ou None en cas d'erreur
     """
+    cached = _whois_cache.get(domain)
+    if cached and cached[0] > time.monotonic():
+        log(f"WHOIS {domain} servi depuis le cache", "debug")
+        return cached[1]
+    
+    # Import paresseux : python-whois n'est chargé que si WHOIS est demandé
+    import whois
+    
     try:
         w = whois.whois(domain)
         
@@ -41,8 +101,9 @@ def whois_lookup(domain):
         }
         
         log(f"WHOIS lookup réussi pour {domain}", "info")
+        _whois_cache[domain] = (time.monotonic() + WHOIS_CACHE_TTL, whois_data)
         return whois_data
-        
+    
     except Exception as e:
         log(f"Erreur WHOIS pour {domain}: {str(e)}", "error")
         print_colored(f"[-] Erreur WHOIS: {str(e)}", "red")
@@ -54,7 +115,7 @@ def dns_lookup(domain):
     
     Args:
         domain (str): Le domaine à analyser
-        
+    
     Returns:
         dict: Enregistrements DNS trouvés
     """
@@ -72,7 +133,7 @@ def dns_lookup(domain):
     
     for record_type in record_types:
         try:
-            answers = dns.resolver.resolve(domain, record_type)
+            answers = get_resolver().resolve(domain, record_type)
             for answer in answers:
                 if record_type == 'MX':
                     dns_data[record_type].append({
@@ -91,7 +152,7 @@ def dns_lookup(domain):
                     })
                 else:
                     dns_data[record_type].append(str(answer))
-                    
+        
         except dns.resolver.NXDOMAIN:
             log(f"Domaine {domain} n'existe pas pour {record_type}", "warning")
         except dns.resolver.NoAnswer:
@@ -102,85 +163,479 @@ def dns_lookup(domain):
     log(f"DNS lookup effectué pour {domain}", "info")
     return dns_data
 
-def check_subdomain(subdomain, domain, results, lock):
+def get_nameservers(domain):
+    """
+    Retourne les serveurs de noms (NS) d'un domaine
+    
+    Args:
+        domain (str): Le domaine à analyser
+    
+    Returns:
+        list: Noms des serveurs NS (vide en cas d'erreur)
+    """
+    try:
+        return [str(answer).rstrip('.') for answer in get_resolver().resolve(domain, 'NS')]
+    except Exception as e:
+        log(f"Impossible de récupérer les NS de {domain}: {str(e)}", "warning")
+        return []
+
+def _nameserver_addresses(nameserver):
+    """
+    Résout un serveur de noms en adresses IP (accepte aussi une IP directe)
+    
+    Args:
+        nameserver (str): Nom ou IP du serveur
+    
+    Returns:
+        list: Adresses IP du serveur
+    """
+    try:
+        ipaddress.ip_address(nameserver)
+        return [nameserver]
+    except ValueError:
+        pass
+    
+    try:
+        return [str(ip) for ip in get_resolver().resolve(nameserver, 'A')]
+    except Exception as e:
+        log(f"Impossible de résoudre le NS {nameserver}: {str(e)}", "warning")
+        return []
+
+def zone_transfer(domain, nameservers, timeout=None, port=53):
+    """
+    Tente un transfert de zone (AXFR) sur chaque serveur de noms
+    
+    Args:
+        domain (str): Le domaine principal
+        nameservers (list): Serveurs NS à tester (noms ou IPs)
+        timeout (float): Délai maximum par tentative (défaut: dns_timeout du profil de timing)
+        port (int): Port DNS des serveurs
+    
+    Returns:
+        dict: {'nameserver', 'subdomains'} au premier succès, None sinon
+    """
+    timeout = timeout or get_timing().dns_timeout
+    
+    for nameserver in nameservers:
+        for address in _nameserver_addresses(nameserver):
+            try:
+                zone = dns.zone.from_xfr(
+                    dns.query.xfr(address, domain, port=port, timeout=timeout, lifetime=timeout)
+                )
+            except Exception as e:
+                log(f"AXFR refusé par {nameserver} ({address}) pour {domain}: {str(e)}", "info")
+                continue
+            
+            subdomains = []
+            for name, node in zone.nodes.items():
+                # L'apex (@) n'est pas un sous-domaine
+                if name == dns.name.empty:
+                    continue
+                
+                full_domain = name.derelativize(zone.origin).to_text(omit_final_dot=True)
+                rdataset = node.get_rdataset(dns.rdataclass.IN, dns.rdatatype.A)
+                ips = [str(rdata) for rdata in rdataset] if rdataset else []
+                
+                status = 'out_of_scope' if ips and not get_scope().allows_any(ips) else 'found'
+                subdomains.append(SubdomainRecord(full_domain, ips, status))
+            
+            print_colored(f"[+] Transfert de zone réussi sur {nameserver}: {len(subdomains)} noms", "green")
+            log(f"AXFR réussi pour {domain} via {nameserver} ({address})", "info")
+            
+            return {'nameserver': nameserver, 'subdomains': subdomains}
+    
+    return None
+
+def check_subdomain(subdomain, domain, results, lock, on_found=None, retries=None):
     """
     Vérifie l'existence d'un sous-domaine
     
+    Un timeout ou un SERVFAIL de tous les résolveurs est retenté après un
+    backoff ; NXDOMAIN et NoAnswer sont des réponses définitives.
+    
     Args:
         subdomain (str): Le sous-domaine à tester
         domain (str): Le domaine principal
         results (list): Liste partagée pour stocker les résultats
         lock: Verrou pour l'accès concurrent à la liste
+        on_found (callable): Appelé avec le SubdomainRecord dès sa résolution (si une IP est dans le périmètre)
+        retries (int): Nouvelles tentatives si la résolution reste ambiguë (défaut: profil de timing)
     """
     full_domain = f"{subdomain}.{domain}"
+    policy = RetryPolicy.from_timing(retries)
     
-    try:
-        # Tentative de résolution DNS
-        answer = dns.resolver.resolve(full_domain, 'A')
+    for attempt in range(policy.retries + 1):
+        if attempt and not policy.backoff(attempt - 1):
+            break
+        
+        try:
+            # Tentative de résolution DNS (une socket par requête)
+            with get_fd_budget():
+                answer = get_resolver().resolve(full_domain, 'A')
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            # Sous-domaine n'existe pas
+            get_retry_stats().record('dns', attempt)
+            return
+        except (dns.exception.Timeout, dns.resolver.NoNameservers) as e:
+            log(f"Résolution ambiguë de {full_domain} (tentative {attempt + 1}): {str(e)}", "debug")
+            continue
+        except Exception as e:
+            log(f"Erreur lors de la vérification de {full_domain}: {str(e)}", "error")
+            get_retry_stats().record('dns', attempt)
+            return
+        
+        get_retry_stats().record('dns', attempt)
         ips = [str(ip) for ip in answer]
         
+        # Un nom qui ne pointe que hors périmètre est conservé mais jamais sondé
+        in_scope = get_scope().allows_any(ips)
+        entry = SubdomainRecord(full_domain, ips, 'found' if in_scope else 'out_of_scope')
         with lock:
-            results.append({
-                'subdomain': full_domain,
-                'ips': ips,
-                'status': 'found'
-            })
-            
-        print_colored(f"[+] Trouvé: {full_domain} -> {', '.join(ips)}", "green")
+            results.append(entry)
         
-    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
-        # Sous-domaine n'existe pas
-        pass
-    except Exception as e:
-        log(f"Erreur lors de la vérification de {full_domain}: {str(e)}", "error")
+        print_finding(f"[+] Trouvé: {full_domain} -> {', '.join(ips)}" + ("" if in_scope else " (hors périmètre)"))
+        if on_found and in_scope:
+            on_found(entry)
+        return
+    
+    get_retry_stats().record('dns', policy.retries, exhausted=True)
+    log(f"Pas de réponse pour {full_domain} après {policy.retries + 1} tentatives", "warning")
 
-def brute_force_subdomains(domain, wordlist_path, max_threads=50):
+class SubdomainFrontier:
     """
-    Effectue un bruteforce des sous-domaines
+    Frontière de découverte des sous-domaines
+    
+    Fournit aux workers du bruteforce les mots de la wordlist, puis les noms
+    injectés en cours de route (SAN des certificats TLS...). Chaque label
+    n'est testé qu'une fois. Le bruteforce se termine quand la wordlist et
+    la file sont vides et qu'aucun travail susceptible d'ajouter des noms
+    n'est en cours (workers actifs ou réservations via hold()). close()
+    libère les réservations restantes et refuse les suivantes : la phase
+    qui les libère l'appelle en se terminant, même sur erreur, pour que le
+    bruteforce ne les attende pas indéfiniment.
     
     Args:
         domain (str): Le domaine principal
-        wordlist_path (str): Chemin vers le fichier wordlist
-        max_threads (int): Nombre maximum de threads
+        words (iterable): Wordlist initiale
+    """
+    
+    def __init__(self, domain, words=()):
+        self.domain = domain.lower().rstrip('.')
+        self._words = iter(words)
+        self._queue = deque()
+        self._seen = ExactFilter()
+        self._active = 0
+        self._holds = 0
+        self.closed = False
+        self._cond = threading.Condition()
+    
+    def add(self, name):
+        """
+        Injecte un nom complet dans la frontière (hors périmètre : ignoré)
         
-    Returns:
-        list: Liste des sous-domaines trouvés
+        Args:
+            name (str): Nom complet (ex: api.example.com ou *.api.example.com)
+        
+        Returns:
+            bool: True si le nom est nouveau et a été ajouté (False après close())
+        """
+        name = name.lower().strip().rstrip('.')
+        if name.startswith('*.'):
+            name = name[2:]
+        if not name.endswith('.' + self.domain):
+            return False
+        
+        label = name[:-len(self.domain) - 1]
+        with self._cond:
+            if self.closed or not self._seen.add(label):
+                return False
+            self._queue.append(label)
+            self._cond.notify()
+        return True
+    
+    def take(self):
+        """
+        Retourne le prochain label à tester (bloque tant que du travail est en cours)
+        
+        Returns:
+            str: Label à tester ou None quand la découverte est terminée
+        """
+        with self._cond:
+            while True:
+                if self._queue:
+                    self._active += 1
+                    return self._queue.popleft()
+                
+                word = next(self._words, None)
+                if word is not None:
+                    word = word.strip().lower()
+                    if word and self._seen.add(word):
+                        self._active += 1
+                        return word
+                    continue
+                
+                if self._active == 0:
+                    self._cond.notify_all()
+                    return None
+                self._cond.wait()
+    
+    def set_wordlist(self, words, seen=None):
+        """
+        Définit la wordlist consommée après la file des noms injectés
+        
+        Args:
+            words (iterable): Mots à tester (liste ou flux)
+            seen (ExactFilter or BloomFilter): Filtre de déduplication à utiliser
+                désormais (les labels déjà vus y sont recopiés)
+        """
+        with self._cond:
+            if seen is not None:
+                if isinstance(self._seen, ExactFilter):
+                    for label in self._seen:
+                        seen.add(label)
+                self._seen = seen
+            self._words = iter(words)
+            self._cond.notify_all()
+    
+    def hold(self):
+        """
+        Signale un travail en cours pouvant encore injecter des noms
+        
+        Returns:
+            bool: True si la réservation est prise (à libérer par release_hold()),
+                False après close()
+        """
+        with self._cond:
+            if self.closed:
+                return False
+            self._holds += 1
+            self._active += 1
+            return True
+    
+    def release_hold(self):
+        """Libère une réservation prise par hold() (sans effet si close() les a déjà libérées)"""
+        with self._cond:
+            if not self._holds:
+                return
+            self._holds -= 1
+            self._active -= 1
+            if self._active == 0:
+                self._cond.notify_all()
+    
+    def release(self):
+        """Termine un travail commencé par take()"""
+        with self._cond:
+            self._active -= 1
+            if self._active == 0:
+                self._cond.notify_all()
+    
+    def close(self):
+        """Libère toutes les réservations et n'accepte plus de noms injectés ni de réservations"""
+        with self._cond:
+            self.closed = True
+            self._active -= self._holds
+            self._holds = 0
+            self._cond.notify_all()
+
+def brute_force_subdomains(domain, wordlist_path, max_threads=None, wordlist=None, on_found=None, frontier=None,
+                           dedup='exact', error_rate=DEFAULT_ERROR_RATE, total=None):
     """
-    print_colored(f"[*] Chargement de la wordlist: {wordlist_path}", "blue")
+    Effectue un bruteforce des sous-domaines
     
-    # Chargement de la wordlist
-    wordlist = load_wordlist(wordlist_path)
-    if not wordlist:
-        print_colored(f"[-] Impossible de charger la wordlist: {wordlist_path}", "red")
-        return []
+    Les wordlists sont lues en flux ; les mots déjà testés (doublons entre
+    wordlists, noms injectés) sont écartés par le filtre de déduplication.
     
-    print_colored(f"[*] {len(wordlist)} mots chargés, démarrage du bruteforce...", "blue")
+    Args:
+        domain (str): Le domaine principal
+        wordlist_path (str or list): Chemin(s) vers les fichiers wordlist
+        max_threads (int): Nombre maximum de threads (défaut: profil de timing)
+        wordlist (list): Wordlist déjà chargée en mémoire (à la place de wordlist_path)
+        on_found (callable): Appelé avec chaque sous-domaine dès sa découverte
+        frontier (SubdomainFrontier): Frontière partagée, pour recevoir des noms en cours de route
+        dedup (str): Déduplication exacte (exact) ou par filtre de Bloom (bloom)
+        error_rate (float): Taux de faux positifs du filtre de Bloom
+        total (int): Nombre de lignes des wordlists s'il est déjà connu (sinon elles sont comptées)
+    
+    Returns:
+        list: Liste des sous-domaines trouvés (SubdomainRecord)
+    """
+    if wordlist is None:
+        paths = [wordlist_path] if isinstance(wordlist_path, str) else list(wordlist_path)
+        print_colored(f"[*] Chargement des wordlists: {', '.join(paths)}", "blue")
+        
+        # Lecture en flux : rien n'est chargé en mémoire
+        opened = open_wordlists(paths, total)
+        if not opened:
+            print_colored(f"[-] Impossible de charger les wordlists: {', '.join(paths)}", "red")
+            return []
+        wordlist, total = opened
+    else:
+        total = len(wordlist)
+    
+    print_colored(f"[*] {total} candidats, démarrage du bruteforce sur {domain}...", "blue")
     
     results = []
     lock = threading.Lock()
-    threads = []
     
-    # Limitation du nombre de threads actifs
-    semaphore = threading.Semaphore(max_threads)
+    if frontier is None:
+        frontier = SubdomainFrontier(domain)
+    frontier.set_wordlist(wordlist, seen=make_filter(dedup, total, error_rate))
     
-    def worker(subdomain):
-        with semaphore:
-            check_subdomain(subdomain, domain, results, lock)
+    timing = get_timing()
+    runtime = get_runtime()
     
-    # Création des threads
-    for subdomain in wordlist:
-        thread = threading.Thread(target=worker, args=(subdomain.strip(),))
-        threads.append(thread)
-        thread.start()
-        
-        # Petit délai pour éviter de surcharger
-        time.sleep(0.01)
+    def check(subdomain):
+        try:
+            check_subdomain(subdomain, domain, results, lock, on_found)
+        finally:
+            frontier.release()
     
-    # Attente de tous les threads
-    for thread in threads:
-        thread.join()
+    # La frontière est lue en flux (elle attend les noms injectés) ; les
+    # résolutions tournent sur le pool partagé du runtime, pas un thread par mot
+    concurrency = max(1, min(max_threads or timing.dns_threads, total))
+    runtime.run(runtime.map_blocking(check, iter(frontier.take, None), concurrency,
+                                     rate_limiter=timing.dns_rate_limiter, stream=True))
     
     print_colored(f"[+] Bruteforce terminé: {len(results)} sous-domaines trouvés", "green")
     log(f"Bruteforce terminé pour {domain}: {len(results)} sous-domaines", "info")
     
-    return results
\ No newline at end of file
+    return results
+
+
+def merge_subdomain_results(*result_lists):
+    """
+    Fusionne plusieurs listes de sous-domaines (bruteforce, PTR...)
+    
+    Args:
+        *result_lists (list): Listes de résultats au format sous-domaine
+    
+    Returns:
+        list: Liste fusionnée, un enregistrement par nom avec l'union des IPs
+    """
+    merged = {}
+    
+    for results in result_lists:
+        for entry in results or []:
+            name = entry['subdomain']
+            if name not in merged:
+                merged[name] = SubdomainRecord(name, [], entry.get('status', 'found'))
+            for ip in entry.get('ips', []):
+                if ip not in merged[name].ips:
+                    merged[name].ips.append(ip)
+    
+    return list(merged.values())
+
+async def _ptr_lookup(resolver, ip, timeout, policy):
+    """
+    Résout l'enregistrement PTR d'une IP (avec cache négatif)
+    
+    Seules les réponses définitives (NXDOMAIN, NoAnswer) sont mises en
+    cache ; un timeout ou un SERVFAIL de tous les serveurs est retenté
+    après un backoff, comme pour le bruteforce.
+    
+    Args:
+        resolver (ResolverPool): Pool de résolveurs (resolve_async)
+        ip (str): Adresse IP
+        timeout (float): Délai maximum pour la requête
+        policy (RetryPolicy): Politique de retransmission
+    
+    Returns:
+        list: Noms d'hôtes associés à l'IP
+    """
+    expiry = _ptr_negative_cache.get(ip)
+    if expiry and expiry > time.monotonic():
+        return []
+    
+    for attempt in range(policy.retries + 1):
+        if attempt:
+            if get_cancel_token().cancelled:
+                break
+            await asyncio.sleep(policy.delay(attempt - 1))
+        
+        try:
+            answer = await resolver.resolve_async(dns.reversename.from_address(ip), 'PTR', lifetime=timeout)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            # Pas de PTR : inutile de redemander pendant PTR_NEGATIVE_TTL
+            _ptr_negative_cache[ip] = time.monotonic() + PTR_NEGATIVE_TTL
+            get_retry_stats().record('ptr', attempt)
+            return []
+        except (dns.exception.Timeout, dns.resolver.NoNameservers) as e:
+            log(f"Résolution PTR ambiguë pour {ip} (tentative {attempt + 1}): {str(e)}", "debug")
+            continue
+        except Exception as e:
+            log(f"Erreur PTR pour {ip}: {str(e)}", "error")
+            get_retry_stats().record('ptr', attempt)
+            return []
+        
+        get_retry_stats().record('ptr', attempt)
+        return [str(rdata).rstrip('.') for rdata in answer]
+    
+    get_retry_stats().record('ptr', policy.retries, exhausted=True)
+    return []
+
+async def _ptr_sweep_async(hosts, max_concurrency, timeout, policy):
+    """
+    Sweep PTR asynchrone avec un nombre borné de requêtes en vol
+    
+    Args:
+        hosts (iterator): Itérateur sur les adresses IP (str)
+        max_concurrency (int): Nombre maximum de requêtes simultanées
+        timeout (float): Délai maximum par requête
+        policy (RetryPolicy): Politique de retransmission
+    
+    Returns:
+        list: Résultats au format sous-domaine
+    """
+    runtime = get_runtime()
+    budget = runtime.fd_budget
+    results = []
+    
+    # Les hôtes sont consommés au fil de l'eau : jamais plus de
+    # max_concurrency requêtes en vol, quelle que soit la taille du réseau
+    async def lookup(ip):
+        await budget.acquire_async()
+        try:
+            names = await _ptr_lookup(runtime.resolver, ip, timeout, policy)
+        finally:
+            budget.release()
+        
+        for name in names:
+            results.append(SubdomainRecord(name, [ip], 'found'))
+            print_finding(f"[+] PTR: {ip} -> {name}")
+    
+    await runtime.map(lookup, hosts, min(max_concurrency, budget.size), rate_limiter=runtime.dns_rate_limiter)
+    return results
+
+def ptr_sweep(cidr_range, max_concurrency=None, timeout=None, retries=None):
+    """
+    Effectue un sweep de reverse DNS (PTR) sur une plage réseau
+    
+    Args:
+        cidr_range (str): Plage réseau en notation CIDR (ex: 192.168.1.0/24)
+        max_concurrency (int): Nombre maximum de requêtes simultanées (défaut: profil de timing)
+        timeout (float): Délai maximum par requête (défaut: profil de timing)
+        retries (int): Nouvelles tentatives sur timeout ou SERVFAIL (défaut: profil de timing)
+    
+    Returns:
+        list: Noms trouvés, au même format que le bruteforce de sous-domaines
+    """
+    timing = get_timing()
+    max_concurrency = max_concurrency or timing.async_concurrency
+    timeout = timeout or timing.dns_timeout
+    policy = RetryPolicy.from_timing(retries)
+    
+    try:
+        network = ipaddress.ip_network(cidr_range, strict=False)
+    except ValueError as e:
+        print_colored(f"[-] Plage réseau invalide: {e}", "red")
+        return []
+    
+    print_colored(f"[*] Sweep PTR sur {cidr_range} ({network.num_addresses} adresses)", "blue")
+    
+    hosts = (str(ip) for ip in network.hosts())
+    results = get_runtime().run(_ptr_sweep_async(hosts, max_concurrency, timeout, policy))
+    
+    print_colored(f"[+] Sweep PTR terminé: {len(results)} noms trouvés", "green")
+    log(f"Sweep PTR sur {cidr_range}: {len(results)} noms", "info")
+    
+    return results
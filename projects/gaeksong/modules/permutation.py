@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module d'ordre des sondes
+Permutation pseudo-aléatoire reproductible (réseau de Feistel) de l'espace hôtes × ports, avec reprise
+"""
+
+import os
+import json
+import random
+import hashlib
+import threading
+from modules.utils import log, get_config
+
+# Tours du réseau de Feistel (4 tours suffisent à bien mélanger les indices)
+FEISTEL_ROUNDS = 4
+
+# Constantes de la fonction de tour (finaliseur de splitmix64)
+_MIX_MULTIPLIERS = (0xBF58476D1CE4E5B9, 0x94D049BB133111EB)
+_MASK64 = (1 << 64) - 1
+
+class IndexPermutation:
+    """
+    Bijection pseudo-aléatoire de [0, size) sur lui-même, en mémoire constante
+    
+    Un réseau de Feistel équilibré chiffre les indices sur le plus petit
+    domaine 2**(2h) >= size ; les valeurs hors de [0, size) sont
+    rechiffrées jusqu'à y retomber (cycle walking), ce qui reste une
+    bijection. La même graine donne toujours le même ordre : la position
+    p du parcours désigne la sonde permutation[p], d'une exécution à
+    l'autre.
+    
+    Args:
+        size (int): Taille de l'espace des indices
+        seed (int): Graine (None : ordre naturel, sans permutation)
+        key (str): Nom de l'espace (moteur et cible), pour que deux espaces
+            de même taille n'aient pas le même ordre
+    """
+    
+    __slots__ = ('size', 'seed', '_half_bits', '_half_mask', '_keys')
+    
+    def __init__(self, size, seed, key=''):
+        self.size = size
+        self.seed = seed
+        half_bits = 1
+        while (1 << (2 * half_bits)) < size:
+            half_bits += 1
+        self._half_bits = half_bits
+        self._half_mask = (1 << half_bits) - 1
+        
+        if seed is None:
+            self._keys = None
+        else:
+            digest = hashlib.blake2b(f"{seed}:{key}".encode(), digest_size=8 * FEISTEL_ROUNDS).digest()
+            self._keys = [int.from_bytes(digest[8 * i:8 * (i + 1)], 'big') for i in range(FEISTEL_ROUNDS)]
+    
+    def _round(self, value, key):
+        value = (value + key) & _MASK64
+        value = ((value ^ (value >> 30)) * _MIX_MULTIPLIERS[0]) & _MASK64
+        value = ((value ^ (value >> 27)) * _MIX_MULTIPLIERS[1]) & _MASK64
+        return (value ^ (value >> 31)) & self._half_mask
+    
+    def _encrypt(self, value):
+        left, right = value >> self._half_bits, value & self._half_mask
+        for key in self._keys:
+            left, right = right, left ^ self._round(right, key)
+        return (left << self._half_bits) | right
+    
+    def __len__(self):
+        return self.size
+    
+    def __getitem__(self, position):
+        """
+        Indice de la sonde à la position `position` du parcours
+        
+        Args:
+            position (int): Position dans [0, size)
+        
+        Returns:
+            int: Indice dans [0, size)
+        """
+        if not 0 <= position < self.size:
+            raise IndexError(position)
+        if self._keys is None:
+            return position
+        
+        value = self._encrypt(position)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+class ProbeOrder:
+    """
+    Parcours d'un espace de sondes dans l'ordre d'une IndexPermutation
+    
+    Les positions terminées sont suivies sous forme d'un seuil (toutes les
+    positions inférieures sont faites) et des quelques positions faites
+    au-delà (au plus la concurrence du moteur) : l'état reste petit et une
+    reprise ne refait que les sondes qui n'avaient pas abouti.
+    
+    Args:
+        permutation (IndexPermutation): Ordre des sondes
+        digest (str): Empreinte de l'espace (cibles, ports) pour valider une reprise
+        done_below (int): Positions déjà faites sous ce seuil (reprise)
+        done (iterable): Positions déjà faites au-delà du seuil (reprise)
+    """
+    
+    def __init__(self, permutation, digest, done_below=0, done=()):
+        self.permutation = permutation
+        self.digest = digest
+        self.done_below = done_below
+        self.done = set(done)
+        self._lock = threading.Lock()
+    
+    @property
+    def remaining(self):
+        """Nombre de sondes restant à faire"""
+        with self._lock:
+            return self.permutation.size - self.done_below - len(self.done)
+    
+    def pending(self):
+        """
+        Positions restant à faire, dans l'ordre du parcours
+        
+        Yields:
+            tuple: (position, indice de la sonde)
+        """
+        position = self.done_below
+        while position < self.permutation.size:
+            if position not in self.done:
+                yield position, self.permutation[position]
+            position += 1
+    
+    def complete(self, position):
+        """
+        Marque une position comme faite (sonde aboutie)
+        
+        Args:
+            position (int): Position dans le parcours
+        """
+        with self._lock:
+            if position != self.done_below:
+                self.done.add(position)
+                return
+            self.done_below += 1
+            while self.done_below in self.done:
+                self.done.discard(self.done_below)
+                self.done_below += 1
+    
+    def state(self):
+        """
+        État sérialisable du parcours
+        
+        Returns:
+            dict: Taille, empreinte, seuil et positions faites au-delà
+        """
+        with self._lock:
+            return {'size': self.permutation.size, 'digest': self.digest, 'done_below': self.done_below,
+                    'done': sorted(self.done)}
+
+def space_digest(*parts):
+    """
+    Empreinte d'un espace de sondes
+    
+    Args:
+        *parts: Éléments définissant l'espace (cibles, liste de ports...)
+    
+    Returns:
+        str: Empreinte hexadécimale courte
+    """
+    return hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+
+class ProbeCheckpoint:
+    """
+    Graine et avancement de tous les parcours de sondes d'une exécution
+    
+    Chaque moteur demande son parcours par order() ; avec un fichier de
+    reprise, la graine et l'avancement de l'exécution précédente sont
+    rechargés et seules les sondes non abouties sont refaites, dans le
+    même ordre. save() écrit l'état, y compris après une interruption.
+    
+    Args:
+        seed (int): Graine des permutations (None : tirée au hasard)
+        randomize (bool): Ordre pseudo-aléatoire (sinon ordre naturel)
+    """
+    
+    def __init__(self, seed=None, randomize=True):
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.randomize = randomize
+        self.path = None
+        self._saved = {}
+        self._orders = {}
+        self._lock = threading.Lock()
+    
+    def load(self, path):
+        """
+        Charge l'état d'une exécution précédente (fichier de reprise)
+        
+        Un fichier absent n'est pas une erreur : il sera créé par save().
+        
+        Args:
+            path (str): Fichier de reprise JSON
+        
+        Raises:
+            ValueError: Fichier illisible
+        """
+        self.path = path
+        if not os.path.exists(path):
+            return
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.seed = int(state['seed'])
+            self.randomize = bool(state.get('randomize', True))
+            self._saved = dict(state.get('orders', {}))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Fichier de reprise illisible {path}: {str(e)}")
+        
+        log(f"Reprise depuis {path}: graine {self.seed}, {len(self._saved)} parcours", "info")
+    
+    def order(self, name, size, digest):
+        """
+        Parcours d'un espace de sondes (repris s'il figure dans le fichier de reprise)
+        
+        Args:
+            name (str): Nom unique du parcours (moteur et cible, ex: tcp:10.0.0.5)
+            size (int): Nombre de sondes
+            digest (str): Empreinte de l'espace (space_digest())
+        
+        Returns:
+            ProbeOrder: Parcours de l'espace
+        """
+        permutation = IndexPermutation(size, self.seed if self.randomize else None, name)
+        saved = self._saved.get(name)
+        
+        if saved and saved.get('size') == size and saved.get('digest') == digest:
+            order = ProbeOrder(permutation, digest, saved.get('done_below', 0), saved.get('done', ()))
+            log(f"Parcours {name} repris: {order.remaining}/{size} sondes restantes", "info")
+        else:
+            if saved:
+                log(f"Parcours {name} différent de la reprise (cibles ou ports modifiés): reparti de zéro", "warning")
+            order = ProbeOrder(permutation, digest)
+        
+        # Avancement conservé seulement pour le fichier de reprise (pas
+        # d'accumulation dans un processus de longue durée comme le serveur)
+        if self.path:
+            with self._lock:
+                self._orders[name] = order
+        return order
+    
+    def state(self):
+        """
+        État sérialisable de l'exécution
+        
+        Returns:
+            dict: Graine, mode et avancement de chaque parcours
+        """
+        with self._lock:
+            orders = dict(self._saved)
+            orders.update({name: order.state() for name, order in self._orders.items()})
+        return {'seed': self.seed, 'randomize': self.randomize, 'orders': orders}
+    
+    def save(self, path=None):
+        """
+        Écrit l'état dans le fichier de reprise (remplacement atomique)
+        
+        Args:
+            path (str): Fichier de reprise (défaut: celui de load())
+        
+        Returns:
+            bool: True si l'état a été écrit
+        """
+        path = path or self.path
+        if not path:
+            return False
+        
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.state(), f)
+            os.replace(tmp_path, path)
+            log(f"État de reprise sauvegardé: {path}", "info")
+            return True
+        except OSError as e:
+            log(f"Erreur lors de la sauvegarde de l'état de reprise {path}: {str(e)}", "error")
+            return False
+
+_checkpoint = None
+_checkpoint_lock = threading.Lock()
+
+def get_checkpoint():
+    """
+    Retourne l'état des parcours de sondes du processus (créé au premier appel)
+    
+    L'ordre pseudo-aléatoire est réglé par l'option randomize_order de la
+    section [ACTIVE] de config.ini ; la graine est tirée au hasard (--seed
+    ou --resume la fixent).
+    
+    Returns:
+        ProbeCheckpoint: État partagé par tous les moteurs
+    """
+    global _checkpoint
+    
+    with _checkpoint_lock:
+        if _checkpoint is None:
+            randomize = get_config().getboolean('ACTIVE', 'randomize_order', fallback=True)
+            _checkpoint = ProbeCheckpoint(randomize=randomize)
+    
+    return _checkpoint
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module de profilage des exécutions
+Profil cProfile de tous les threads, durées par phase et échantillons (threads, RSS, CPU) dans une seule archive
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import platform
+import threading
+from modules.utils import log
+from modules.retry import get_retry_stats
+
+# Intervalle d'échantillonnage des threads et de la mémoire, en secondes
+PROFILE_SAMPLE_INTERVAL = 0.5
+
+# Nombre de fonctions listées dans le résumé texte
+PROFILE_TOP_FUNCTIONS = 40
+
+# Catégories du résumé des points chauds : (nom, fragment du fichier, nom de fonction)
+HOTSPOT_CATEGORIES = (
+    ('dns', f"{os.sep}dns{os.sep}", None),
+    ('logging', f"{os.sep}logging{os.sep}", None),
+    ('print', None, 'print_colored'),
+    ('print', None, 'print_finding'),
+    ('print', None, '_write_batch'),
+    ('thread_start', 'threading.py', 'start'),
+    ('ssl', 'ssl.py', None),
+    ('socket', 'socket.py', None),
+    ('json', f"{os.sep}json{os.sep}", None)
+)
+
+def _rss_bytes():
+    """Mémoire résidente actuelle (pic de mémoire si /proc est absent)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss est en octets sous macOS, en kilo-octets ailleurs
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+class RunProfiler:
+    """
+    Profil complet d'une exécution
+    
+    cProfile ne suit que le thread qui l'active : un profileur est donc
+    démarré dans chaque nouveau thread (threading.setprofile), ainsi que
+    dans les threads persistants du runtime (pool des sondes et boucle,
+    via profile_thread()), puis tous les profils sont fusionnés. Les
+    threads du runtime vivent jusqu'à la fin du processus : à l'arrêt,
+    leur profileur est arrêté et relevé dans chacun d'eux
+    (collect_thread()). Un thread d'échantillonnage relève le
+    nombre de threads, la mémoire résidente et le temps CPU ; le
+    PhaseScheduler rapporte la durée et le CPU de chaque phase.
+    
+    Args:
+        sample_interval (float): Intervalle d'échantillonnage en secondes
+    """
+    
+    def __init__(self, sample_interval=PROFILE_SAMPLE_INTERVAL):
+        self.sample_interval = sample_interval
+        self.samples = []
+        self.phases = []
+        self._profiles = []
+        self._threads = {}
+        self._collected = set()
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._main = None
+        self._start = None
+        self._cpu_start = None
+        self.wall = None
+        self.cpu = None
+    
+    def _thread_hook(self, frame, event, arg):
+        # Premier événement d'un nouveau thread : remplace ce hook par un profileur dédié
+        sys.setprofile(None)
+        self.profile_thread()
+    
+    def profile_thread(self):
+        """Démarre un profileur dédié au thread courant (sans effet s'il en a déjà un)"""
+        import cProfile
+        
+        thread = threading.current_thread()
+        with self._lock:
+            if self._stopped or thread in self._threads or thread is threading.main_thread():
+                return
+            profile = cProfile.Profile()
+            self._threads[thread] = profile
+            self._profiles.append((thread, profile))
+        profile.enable()
+    
+    def collect_thread(self):
+        """Arrête et relève le profileur du thread courant (thread encore actif à l'arrêt)"""
+        thread = threading.current_thread()
+        with self._lock:
+            profile = self._threads.get(thread)
+            if profile is None or thread in self._collected:
+                return
+            self._collected.add(thread)
+        # Dans le thread propriétaire : disable() arrête réellement son profileur
+        profile.create_stats()
+    
+    def _sample(self):
+        # Un échantillon au démarrage, à chaque intervalle et à l'arrêt
+        while True:
+            stopping = self._stop.is_set()
+            self.samples.append({
+                't': round(time.monotonic() - self._start, 3),
+                'threads': threading.active_count(),
+                'rss': _rss_bytes(),
+                'cpu': round(time.process_time() - self._cpu_start, 3)
+            })
+            if stopping:
+                return
+            self._stop.wait(self.sample_interval)
+    
+    def start(self):
+        """Démarre le profilage du thread courant et des threads créés ensuite"""
+        import cProfile
+        
+        self._start = time.monotonic()
+        self._cpu_start = time.process_time()
+        
+        # Le thread d'échantillonnage est créé avant le hook : il n'est pas profilé
+        self._sampler = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+        self._sampler.start()
+        
+        threading.setprofile(self._thread_hook)
+        self._main = cProfile.Profile()
+        self._main.enable()
+    
+    def stop(self):
+        """Arrête le profilage et l'échantillonnage"""
+        self._main.disable()
+        threading.setprofile(None)
+        with self._lock:
+            self._stopped = True
+        
+        # Les threads du runtime ne se terminent pas : leurs profils sont relevés sur place
+        from modules.runtime import current_runtime
+        
+        runtime = current_runtime()
+        if runtime:
+            runtime.run_in_threads(self.collect_thread)
+        
+        self.wall = time.monotonic() - self._start
+        self.cpu = time.process_time() - self._cpu_start
+        self._stop.set()
+        self._sampler.join()
+    
+    def record_phase(self, name, start, wall, thread_cpu, process_cpu):
+        """
+        Enregistre les mesures d'une phase du PhaseScheduler
+        
+        Args:
+            name (str): Nom de la phase
+            start (float): Début de la phase (time.monotonic())
+            wall (float): Durée de la phase
+            thread_cpu (float): CPU du thread de la phase
+            process_cpu (float): CPU de tout le processus pendant la phase
+                (inclut les phases concurrentes et les threads de travail)
+        """
+        with self._lock:
+            self.phases.append({
+                'phase': name,
+                'start': round(start - self._start, 3),
+                'wall': round(wall, 3),
+                'thread_cpu': round(thread_cpu, 3),
+                'process_cpu': round(process_cpu, 3)
+            })
+    
+    def stats(self):
+        """
+        Fusionne les profils de tous les threads
+        
+        Les threads encore actifs à l'arrêt dont le profil n'a pas été relevé
+        (threads démons hors du runtime) sont écartés : leur profileur est
+        toujours en cours d'écriture.
+        
+        Returns:
+            pstats.Stats: Statistiques fusionnées
+        """
+        import pstats
+        
+        stats = pstats.Stats(self._main)
+        skipped = 0
+        with self._lock:
+            for thread, profile in self._profiles:
+                if thread.is_alive() and thread not in self._collected:
+                    skipped += 1
+                    continue
+                stats.add(profile)
+        
+        if skipped:
+            log(f"Profilage: {skipped} threads encore actifs non inclus", "debug")
+        return stats
+    
+    @staticmethod
+    def hotspots(stats):
+        """
+        Regroupe le temps passé par catégorie (DNS, logging, affichage...)
+        
+        Args:
+            stats (pstats.Stats): Statistiques fusionnées
+        
+        Returns:
+            dict: Temps propre (tottime) et nombre d'appels par catégorie
+        """
+        totals = {name: {'calls': 0, 'time': 0.0} for name, _, _ in HOTSPOT_CATEGORIES}
+        for (filename, _, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            for name, path_part, function_name in HOTSPOT_CATEGORIES:
+                if path_part and path_part not in filename:
+                    continue
+                if function_name and function_name != function:
+                    continue
+                totals[name]['calls'] += calls
+                # Pour une fonction précise (print_colored, Thread.start), tout son sous-arbre compte
+                totals[name]['time'] += cumtime if function_name else tottime
+                break
+        
+        return {name: {'calls': total['calls'], 'time': round(total['time'], 3)} for name, total in totals.items()}
+    
+    def report(self, stats, argv=None):
+        """
+        Rapport JSON du profilage
+        
+        Args:
+            stats (pstats.Stats): Statistiques fusionnées
+            argv (list): Ligne de commande
+        
+        Returns:
+            dict: Environnement, totaux, phases, points chauds, retransmissions et échantillons
+        """
+        rss = [sample['rss'] for sample in self.samples if sample['rss']]
+        return {
+            'argv': argv if argv is not None else sys.argv,
+            'python': sys.version,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'wall': round(self.wall, 3),
+            'cpu': round(self.cpu, 3),
+            'threads_profiled': len(self._profiles) + 1,
+            'peak_threads': max((sample['threads'] for sample in self.samples), default=None),
+            'peak_rss': max(rss, default=None),
+            'phases': sorted(self.phases, key=lambda phase: phase['start']),
+            'hotspots': self.hotspots(stats),
+            'retries': get_retry_stats().report(),
+            'sample_interval': self.sample_interval,
+            'samples': self.samples
+        }
+    
+    def save(self, output_path, argv=None):
+        """
+        Écrit l'archive de profilage (tar.gz)
+        
+        L'archive contient profile.pstats (à ouvrir avec pstats ou
+        snakeviz), report.json et top.txt (fonctions les plus coûteuses).
+        
+        Args:
+            output_path (str): Chemin de l'archive
+            argv (list): Ligne de commande
+        
+        Returns:
+            bool: True si l'écriture a réussi
+        """
+        import marshal
+        import tarfile
+        
+        try:
+            stats = self.stats()
+            
+            top = io.StringIO()
+            stats.stream = top
+            stats.sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+            stats.sort_stats('tottime').print_stats(PROFILE_TOP_FUNCTIONS)
+            
+            members = {
+                'profile.pstats': marshal.dumps(stats.stats),
+                'report.json': json.dumps(self.report(stats, argv), indent=2, ensure_ascii=False).encode('utf-8'),
+                'top.txt': top.getvalue().encode('utf-8')
+            }
+            
+            directory = os.path.dirname(output_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            with tarfile.open(output_path, 'w:gz') as archive:
+                for name, content in members.items():
+                    info = tarfile.TarInfo(name)
+                    info.size = len(content)
+                    info.mtime = int(time.time())
+                    archive.addfile(info, io.BytesIO(content))
+            
+            log(f"Profil sauvegardé: {output_path}", "info")
+            return True
+        
+        except Exception as e:
+            log(f"Erreur lors de la sauvegarde du profil {output_path}: {str(e)}", "error")
+            return False
+
+_profiler = None
+
+def get_profiler():
+    """
+    Retourne le profileur de l'exécution en cours
+    
+    Returns:
+        RunProfiler: Profileur actif ou None si --profile n'est pas demandé
+    """
+    return _profiler
+
+def start_profiler(sample_interval=PROFILE_SAMPLE_INTERVAL):
+    """
+    Démarre le profilage de l'exécution
+    
+    Args:
+        sample_interval (float): Intervalle d'échantillonnage en secondes
+    
+    Returns:
+        RunProfiler: Profileur démarré
+    """
+    global _profiler
+    
+    _profiler = RunProfiler(sample_interval)
+    _profiler.start()
+    return _profiler
+
+def profile_path_for(base_path):
+    """
+    Chemin de l'archive de profilage à côté des résultats
+    
+    Args:
+        base_path (str): Chemin des résultats (avec ou sans extension)
+    
+    Returns:
+        str: Chemin de l'archive (.profile.tar.gz)
+    """
+    base = base_path[:-3] if base_path.endswith('.gz') else base_path
+    root, extension = os.path.splitext(base)
+    if extension.lower() in ('.json', '.ndjson', '.csv', '.html'):
+        base = root
+    return f"{base}.profile.tar.gz"
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module des enregistrements de résultats
+Types compacts (__slots__) pour les sous-domaines, hôtes, ports et banners
+"""
+
+import sys
+
+def _intern(value):
+    """Interne une chaîne répétée (statut, service) pour la partager entre enregistrements"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Record:
+    """
+    Base des enregistrements de résultats
+    
+    Un enregistrement n'a pas de __dict__ : ses champs sont stockés dans des
+    slots. L'accès en lecture reste compatible avec les anciens dicts
+    (record['port'], record.get('status')) pour les exports et la fusion.
+    """
+    
+    __slots__ = ()
+    
+    def get(self, key, default=None):
+        """Lecture d'un champ façon dict"""
+        return getattr(self, key, default) if key in self.__slots__ else default
+    
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __contains__(self, key):
+        return key in self.__slots__
+    
+    def keys(self):
+        """Noms des champs, dans l'ordre de sérialisation"""
+        return self.__slots__
+    
+    def to_dict(self):
+        """
+        Convertit l'enregistrement en dict (sérialisation JSON)
+        
+        Returns:
+            dict: Champs de l'enregistrement
+        """
+        return {key: getattr(self, key) for key in self.__slots__}
+    
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        fields = ', '.join(f"{key}={getattr(self, key)!r}" for key in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+class SubdomainRecord(Record):
+    """Sous-domaine découvert (bruteforce, AXFR, PTR)"""
+    
+    __slots__ = ('subdomain', 'ips', 'status')
+    
+    def __init__(self, subdomain, ips, status='found'):
+        self.subdomain = subdomain
+        self.ips = list(ips)
+        self.status = _intern(status)
+
+class HostRecord(Record):
+    """Hôte actif détecté par le ping sweep"""
+    
+    __slots__ = ('ip', 'status', 'response_time')
+    
+    def __init__(self, ip, status='alive', response_time='N/A'):
+        self.ip = ip
+        self.status = _intern(status)
+        self.response_time = _intern(response_time)
+
+class PortRecord(Record):
+    """Port ouvert (TCP ou UDP)"""
+    
+    __slots__ = ('port', 'status', 'service')
+    
+    def __init__(self, port, status, service):
+        self.port = port
+        self.status = _intern(status)
+        self.service = _intern(service)
+
+class BannerRecord(Record):
+    """Banner récupéré sur un port"""
+    
+    __slots__ = ('port', 'banner', 'service')
+    
+    def __init__(self, port, banner, service):
+        self.port = port
+        self.banner = banner
+        self.service = _intern(service)
+
+class HttpRecord(Record):
+    """Réponse HTTP(S) d'un hôte"""
+    
+    __slots__ = ('url', 'status', 'title', 'server', 'redirects', 'content_length')
+    
+    def __init__(self, url, status, title=None, server=None, redirects=None, content_length=None):
+        self.url = url
+        self.status = status
+        self.title = title
+        self.server = _intern(server)
+        self.redirects = redirects or []
+        self.content_length = content_length
+
+class CertificateRecord(Record):
+    """Certificat TLS récupéré lors d'une poignée de main"""
+    
+    __slots__ = ('ip', 'port', 'sni', 'subject', 'issuer', 'not_before', 'not_after', 'san')
+    
+    def __init__(self, ip, port, sni, subject, issuer, not_before, not_after, san):
+        self.ip = ip
+        self.port = port
+        self.sni = sni
+        self.subject = subject
+        self.issuer = _intern(issuer)
+        self.not_before = not_before
+        self.not_after = not_after
+        self.san = san
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module de gestion des résolveurs DNS
+Répartition des requêtes selon la santé de chaque serveur, quarantaine et contre-vérification
+"""
+
+import time
+import random
+import threading
+import dns.name
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+import dns.exception
+from modules.utils import log
+
+# Lissage exponentiel des mesures (poids de la dernière requête)
+HEALTH_ALPHA = 0.1
+
+# Latence supposée d'un serveur encore jamais interrogé
+DEFAULT_LATENCY = 0.1
+
+# Quarantaine au-delà de ce taux d'erreur, après un minimum de requêtes
+QUARANTINE_THRESHOLD = 0.5
+QUARANTINE_MIN_QUERIES = 5
+
+class ServerHealth:
+    """
+    Santé d'un serveur DNS : latence et taux d'erreur lissés
+    
+    Args:
+        address (str): Adresse IP du serveur
+    """
+    
+    __slots__ = ('address', 'latency', 'timeout_rate', 'servfail_rate', 'mismatch_rate',
+                 'queries', 'quarantined_until', 'quarantines')
+    
+    def __init__(self, address):
+        self.address = address
+        self.latency = DEFAULT_LATENCY
+        self.timeout_rate = 0.0
+        self.servfail_rate = 0.0
+        self.mismatch_rate = 0.0
+        self.queries = 0
+        self.quarantined_until = 0.0
+        self.quarantines = 0
+    
+    @property
+    def error_rate(self):
+        """Proportion lissée de requêtes en échec (timeout, SERVFAIL, réponse contredite)"""
+        return min(1.0, self.timeout_rate + self.servfail_rate + self.mismatch_rate)
+    
+    def weight(self):
+        """Poids dans le tirage du serveur : rapide et fiable = souvent choisi"""
+        return (1.0 - min(self.error_rate, 0.95)) ** 2 / max(self.latency, 0.001)
+    
+    def record(self, outcome, latency=None):
+        """
+        Met à jour les mesures après une requête
+        
+        Args:
+            outcome (str): ok, timeout, servfail ou mismatch
+            latency (float): Durée de la requête (réponses ok uniquement)
+        """
+        self.queries += 1
+        if latency is not None:
+            self.latency += HEALTH_ALPHA * (latency - self.latency)
+        
+        self.timeout_rate += HEALTH_ALPHA * ((outcome == 'timeout') - self.timeout_rate)
+        self.servfail_rate += HEALTH_ALPHA * ((outcome == 'servfail') - self.servfail_rate)
+        self.mismatch_rate += HEALTH_ALPHA * ((outcome == 'mismatch') - self.mismatch_rate)
+    
+    def to_dict(self):
+        """
+        Résumé de la santé du serveur
+        
+        Returns:
+            dict: Latence (ms), taux d'erreur et nombre de quarantaines
+        """
+        return {
+            'server': self.address,
+            'queries': self.queries,
+            'latency_ms': round(self.latency * 1000, 1),
+            'timeout_rate': round(self.timeout_rate, 3),
+            'servfail_rate': round(self.servfail_rate, 3),
+            'mismatch_rate': round(self.mismatch_rate, 3),
+            'quarantines': self.quarantines
+        }
+
+class ResolverPool:
+    """
+    Ensemble de serveurs DNS interrogés selon leur santé
+    
+    Chaque requête est envoyée à un serveur tiré au sort, pondéré par sa
+    latence et son taux d'erreur. Un timeout ou un SERVFAIL bascule sur un
+    autre serveur ; un serveur dont le taux d'erreur dépasse
+    QUARANTINE_THRESHOLD est écarté temporairement (durée doublée à chaque
+    récidive). Si des serveurs de vérification sont fournis, chaque réponse
+    positive A/AAAA est confirmée auprès de l'un d'eux : un serveur qui
+    invente des réponses est pénalisé comme un serveur en panne.
+    
+    S'utilise comme un dns.resolver.Resolver (méthode resolve()) ; les
+    coroutines du runtime passent par resolve_async(), avec les mêmes
+    serveurs, le même cache et les mêmes mesures de santé.
+    
+    Args:
+        servers (list): Adresses des serveurs DNS
+        timeout (float): Délai maximum par requête et par serveur
+        verify_servers (list): Serveurs de contre-vérification (optionnels)
+        quarantine (float): Durée de la première quarantaine, en secondes
+        cache_size (int): Taille du cache LRU partagé
+    """
+    
+    def __init__(self, servers, timeout=5, verify_servers=(), quarantine=30, cache_size=100000):
+        if not servers:
+            raise ValueError("Aucun serveur DNS fourni")
+        
+        self.nameservers = list(servers)
+        self.verify_servers = list(verify_servers)
+        self.timeout = timeout
+        self.quarantine = quarantine
+        self.cache = dns.resolver.LRUCache(cache_size)
+        self._health = {address: ServerHealth(address) for address in self.nameservers}
+        self._lock = threading.Lock()
+        
+        # Un résolveur par serveur, tous branchés sur le même cache
+        self._resolvers = {address: self._make_resolver(address, timeout, self.cache) for address in self.nameservers}
+        self._verifiers = [self._make_resolver(address, timeout, None) for address in verify_servers]
+        
+        # Résolveurs asynchrones (resolve_async), créés au premier appel
+        self._async_resolvers = None
+        self._async_verifiers = None
+    
+    @staticmethod
+    def _make_resolver(address, timeout, cache):
+        resolver = dns.resolver.Resolver(configure=False)
+        resolver.nameservers = [address]
+        resolver.timeout = timeout
+        resolver.lifetime = timeout
+        resolver.cache = cache
+        return resolver
+    
+    def _pick(self, exclude):
+        """
+        Tire un serveur parmi ceux qui ne sont ni exclus ni en quarantaine
+        
+        Si tous sont en quarantaine, celui dont la quarantaine se termine le
+        plus tôt est utilisé : mieux vaut un serveur douteux que pas de réponse.
+        
+        Args:
+            exclude (set): Serveurs déjà essayés pour cette requête
+        
+        Returns:
+            ServerHealth: Serveur choisi ou None si tous ont été essayés
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [health for address, health in self._health.items() if address not in exclude]
+            if not candidates:
+                return None
+            
+            healthy = [health for health in candidates if health.quarantined_until <= now]
+            if not healthy:
+                return min(candidates, key=lambda health: health.quarantined_until)
+            
+            return random.choices(healthy, weights=[health.weight() for health in healthy])[0]
+    
+    def _record(self, health, outcome, latency=None):
+        with self._lock:
+            health.record(outcome, latency)
+            
+            if (health.queries >= QUARANTINE_MIN_QUERIES and health.error_rate > QUARANTINE_THRESHOLD
+                    and health.quarantined_until <= time.monotonic()):
+                duration = self.quarantine * 2 ** min(health.quarantines, 4)
+                health.quarantined_until = time.monotonic() + duration
+                health.quarantines += 1
+                
+                # À la sortie de quarantaine, le serveur repart en période d'essai
+                health.timeout_rate /= 4
+                health.servfail_rate /= 4
+                health.mismatch_rate /= 4
+                
+                log(f"Résolveur {health.address} en quarantaine pour {duration:.0f}s "
+                    f"(taux d'erreur {health.error_rate * 4:.0%})", "warning")
+    
+    def _is_cached(self, qname, rdtype):
+        name = dns.name.from_text(qname)
+        return (self.cache.get((name, rdtype, dns.rdataclass.IN)) is not None
+                or self.cache.get((name, dns.rdatatype.ANY, dns.rdataclass.IN)) is not None)
+    
+    def _async_pool(self):
+        """Résolveurs et vérificateurs asynchrones, branchés sur le même cache (créés au premier appel)"""
+        with self._lock:
+            if self._async_resolvers is None:
+                import dns.asyncresolver
+                
+                def make(address, cache):
+                    resolver = dns.asyncresolver.Resolver(configure=False)
+                    resolver.nameservers = [address]
+                    resolver.timeout = self.timeout
+                    resolver.lifetime = self.timeout
+                    resolver.cache = cache
+                    return resolver
+                
+                self._async_resolvers = {server: make(server, self.cache) for server in self.nameservers}
+                self._async_verifiers = [make(server, None) for server in self.verify_servers]
+            return self._async_resolvers, self._async_verifiers
+    
+    def _next_server(self, tried, last_error):
+        """Serveur suivant pour une requête (voir _pick) ; relève la dernière erreur s'il n'y en a plus"""
+        health = self._pick(tried)
+        if health is None:
+            raise last_error or dns.resolver.NoNameservers()
+        tried.add(health.address)
+        return health
+    
+    def _failed(self, health, error, start, cached):
+        """
+        Enregistre l'échec d'une requête
+        
+        Returns:
+            dns.exception.DNSException: Erreur ambiguë, la requête bascule sur un autre serveur
+        
+        Raises:
+            dns.resolver.NXDOMAIN, dns.resolver.NoAnswer: Réponse négative (définitive)
+        """
+        if isinstance(error, (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer)):
+            if not cached:
+                self._record(health, 'ok', time.monotonic() - start)
+            raise error
+        if isinstance(error, dns.exception.Timeout):
+            self._record(health, 'timeout')
+            return error
+        if isinstance(error, dns.resolver.NoNameservers):
+            self._record(health, 'servfail')
+            return error
+        raise error
+    
+    def _answered(self, health, qname, rdtype, latency, contradiction):
+        """Enregistre une réponse positive, invalidée si le serveur de vérification la contredit"""
+        if contradiction:
+            log(f"Réponse de {health.address} pour {qname} contredite par le serveur de vérification", "warning")
+            self._record(health, 'mismatch', latency)
+            self.cache.flush((dns.name.from_text(qname), rdtype, dns.rdataclass.IN))
+            raise contradiction
+        self._record(health, 'ok', latency)
+    
+    def _checked(self, rdtype):
+        return bool(self.verify_servers) and rdtype in (dns.rdatatype.A, dns.rdatatype.AAAA)
+    
+    def resolve(self, qname, rdtype='A', lifetime=None):
+        """
+        Résout un nom en basculant sur un autre serveur en cas d'échec
+        
+        Args:
+            qname (str): Nom à résoudre
+            rdtype (str): Type d'enregistrement
+            lifetime (float): Délai maximum par serveur (défaut: timeout du pool)
+        
+        Returns:
+            dns.resolver.Answer: Réponse obtenue
+        
+        Raises:
+            dns.resolver.NXDOMAIN, dns.resolver.NoAnswer: Réponse négative
+            dns.exception.DNSException: Aucun serveur n'a répondu
+        """
+        qname = str(qname)
+        rdtype = dns.rdatatype.RdataType.make(rdtype)
+        cached = self._is_cached(qname, rdtype)
+        tried = set()
+        last_error = None
+        
+        while True:
+            health = self._next_server(tried, last_error)
+            start = time.monotonic()
+            try:
+                answer = self._resolvers[health.address].resolve(qname, rdtype, lifetime=lifetime)
+            except dns.exception.DNSException as e:
+                last_error = self._failed(health, e, start, cached)
+                continue
+            
+            if not cached:
+                latency = time.monotonic() - start
+                contradiction = self._cross_check(qname, rdtype) if self._checked(rdtype) else None
+                self._answered(health, qname, rdtype, latency, contradiction)
+            return answer
+    
+    async def resolve_async(self, qname, rdtype='A', lifetime=None):
+        """
+        Version asynchrone de resolve() pour les coroutines du runtime
+        
+        Même répartition par santé, bascule, quarantaine, cache et
+        contre-vérification que resolve().
+        
+        Args:
+            qname (str): Nom à résoudre
+            rdtype (str): Type d'enregistrement
+            lifetime (float): Délai maximum par serveur (défaut: timeout du pool)
+        
+        Returns:
+            dns.resolver.Answer: Réponse obtenue
+        
+        Raises:
+            dns.resolver.NXDOMAIN, dns.resolver.NoAnswer: Réponse négative
+            dns.exception.DNSException: Aucun serveur n'a répondu
+        """
+        qname = str(qname)
+        rdtype = dns.rdatatype.RdataType.make(rdtype)
+        cached = self._is_cached(qname, rdtype)
+        tried = set()
+        last_error = None
+        
+        while True:
+            health = self._next_server(tried, last_error)
+            start = time.monotonic()
+            try:
+                answer = await self._async_pool()[0][health.address].resolve(qname, rdtype, lifetime=lifetime)
+            except dns.exception.DNSException as e:
+                last_error = self._failed(health, e, start, cached)
+                continue
+            
+            if not cached:
+                latency = time.monotonic() - start
+                contradiction = await self._cross_check_async(qname, rdtype) if self._checked(rdtype) else None
+                self._answered(health, qname, rdtype, latency, contradiction)
+            return answer
+    
+    def _cross_check(self, qname, rdtype):
+        """
+        Confirme une réponse positive auprès d'un serveur de vérification
+        
+        Un vérificateur muet ne remet pas la réponse en cause.
+        
+        Args:
+            qname (str): Nom résolu
+            rdtype (dns.rdatatype.RdataType): Type d'enregistrement
+        
+        Returns:
+            dns.exception.DNSException: Réponse négative du vérificateur, None si confirmée
+        """
+        try:
+            random.choice(self._verifiers).resolve(qname, rdtype)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as e:
+            return e
+        except dns.exception.DNSException as e:
+            log(f"Vérification impossible pour {qname}: {str(e)}", "debug")
+        return None
+    
+    async def _cross_check_async(self, qname, rdtype):
+        """Version asynchrone de _cross_check()"""
+        try:
+            await random.choice(self._async_pool()[1]).resolve(qname, rdtype)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as e:
+            return e
+        except dns.exception.DNSException as e:
+            log(f"Vérification impossible pour {qname}: {str(e)}", "debug")
+        return None
+    
+    def report(self):
+        """
+        Retourne la santé de chaque serveur
+        
+        Returns:
+            list: Un dict par serveur (voir ServerHealth.to_dict)
+        """
+        with self._lock:
+            return [health.to_dict() for health in self._health.values()]
+    
+    def log_report(self):
+        """Journalise la santé de chaque serveur interrogé"""
+        for health in self.report():
+            if health['queries']:
+                log(f"Résolveur {health['server']}: {health['queries']} requêtes, {health['latency_ms']} ms, "
+                    f"timeouts {health['timeout_rate']:.0%}, SERVFAIL {health['servfail_rate']:.0%}, "
+                    f"contredites {health['mismatch_rate']:.0%}, quarantaines {health['quarantines']}", "info")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module de retransmission des sondes
+Backoff exponentiel avec gigue et compteurs de retransmissions par moteur
+"""
+
+import random
+import threading
+from collections import Counter, defaultdict
+from modules.utils import log, get_cancel_token
+
+# Plafond du délai entre deux tentatives, en secondes
+RETRY_MAX_DELAY = 10.0
+
+class RetryPolicy:
+    """
+    Politique de retransmission d'une sonde à l'issue ambiguë
+    
+    Seules les issues ambiguës (timeout, SERVFAIL, pas de réponse au
+    ping) sont retentées ; une réponse définitive (RST, NXDOMAIN, port
+    ouvert) met fin à la sonde. Le délai avant la tentative n est
+    base_delay * 2**n, dont la moitié est tirée au hasard (gigue) pour que
+    les sondes perdues ensemble ne repartent pas ensemble. Aucune
+    retransmission n'est faite une fois l'exécution annulée.
+    
+    Args:
+        retries (int): Nombre de retransmissions après la première tentative
+        base_delay (float): Délai avant la première retransmission
+        max_delay (float): Délai maximum entre deux tentatives
+    """
+    
+    __slots__ = ('retries', 'base_delay', 'max_delay')
+    
+    def __init__(self, retries, base_delay, max_delay=RETRY_MAX_DELAY):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+    
+    @classmethod
+    def from_timing(cls, retries=None):
+        """
+        Politique du profil de timing actif
+        
+        Args:
+            retries (int): Nombre de retransmissions (défaut: profil de timing)
+        
+        Returns:
+            RetryPolicy: Politique configurée
+        """
+        from modules.timing import get_timing
+        
+        timing = get_timing()
+        return cls(timing.retries if retries is None else retries, timing.retry_delay)
+    
+    def delay(self, attempt):
+        """
+        Délai avant une retransmission
+        
+        Args:
+            attempt (int): Numéro de la retransmission (0 pour la première)
+        
+        Returns:
+            float: Délai en secondes
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    def backoff(self, attempt):
+        """
+        Attend avant une retransmission (voir delay())
+        
+        Args:
+            attempt (int): Numéro de la retransmission (0 pour la première)
+        
+        Returns:
+            bool: False si l'exécution a été annulée (pas de retransmission)
+        """
+        return not get_cancel_token().wait(self.delay(attempt))
+
+class RetryStats:
+    """
+    Compteurs de retransmissions par moteur (tcp, dns, ping...)
+    
+    Pour chaque moteur : sondes terminées, retransmissions envoyées, sondes
+    dont une retransmission a obtenu une réponse définitive (recovered) et
+    sondes restées ambiguës après toutes les tentatives (exhausted).
+    """
+    
+    def __init__(self):
+        self._counters = defaultdict(Counter)
+        self._lock = threading.Lock()
+    
+    def record(self, engine, retries, exhausted=False):
+        """
+        Enregistre l'issue d'une sonde
+        
+        Args:
+            engine (str): Moteur de la sonde
+            retries (int): Retransmissions effectuées
+            exhausted (bool): Issue toujours ambiguë après la dernière tentative
+        """
+        with self._lock:
+            counters = self._counters[engine]
+            counters['probes'] += 1
+            if retries:
+                counters['retries'] += retries
+                counters['exhausted' if exhausted else 'recovered'] += 1
+            elif exhausted:
+                counters['exhausted'] += 1
+    
+    def report(self):
+        """
+        Compteurs de chaque moteur
+        
+        Returns:
+            dict: {moteur: {probes, retries, recovered, exhausted}}
+        """
+        with self._lock:
+            return {engine: {key: counters[key] for key in ('probes', 'retries', 'recovered', 'exhausted')}
+                    for engine, counters in sorted(self._counters.items())}
+    
+    def log_report(self):
+        """Journalise les compteurs des moteurs ayant retransmis"""
+        for engine, counters in self.report().items():
+            if counters['retries'] or counters['exhausted']:
+                log(f"Retransmissions {engine}: {counters['retries']} sur {counters['probes']} sondes, "
+                    f"{counters['recovered']} récupérées, {counters['exhausted']} sans réponse", "info")
+
+_retry_stats = RetryStats()
+
+def get_retry_stats():
+    """
+    Retourne les compteurs de retransmissions du processus
+    
+    Returns:
+        RetryStats: Compteurs partagés par tous les moteurs
+    """
+    return _retry_stats
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module du runtime réseau
+Boucle asyncio unique partagée par tous les moteurs : budget de sockets, débit, résolveur, compteurs et annulation
+"""
+
+import asyncio
+import threading
+import concurrent.futures
+from modules.utils import log, get_config, get_fd_budget, get_cancel_token
+from modules.timing import get_timing
+from modules.retry import get_retry_stats
+
+# Threads du pool partagé des sondes écrites en code bloquant (bruteforce DNS, ping)
+DEFAULT_BLOCKING_WORKERS = 256
+
+# Marqueur de fin d'un flux lu par Runtime.map()
+_END = object()
+
+class Runtime:
+    """
+    Runtime réseau du processus
+    
+    Une seule boucle asyncio, dans un thread dédié, exécute les sondes de
+    tous les moteurs : scan TCP, banner grabbing, UDP, PTR, HTTP et TLS y
+    tournent en coroutines ; les sondes qui reposent sur des bibliothèques
+    bloquantes (résolveur du bruteforce DNS, ping système) y sont planifiées
+    sur un pool de threads unique. Des moteurs lancés en même temps
+    (découverte, scan, banners) partagent ainsi la boucle, le pool, le
+    budget de sockets, le limiteur de débit du profil de timing, le
+    résolveur et les compteurs de retransmissions, au lieu de créer chacun
+    leurs threads.
+    
+    Le code synchrone passe par run(), qui bloque le thread appelant
+    jusqu'au résultat ; cancel() annule toutes les tâches en cours. À
+    l'annulation du jeton du processus (Ctrl-C, --max-time), map() cesse de
+    lancer des sondes et rend la main après le délai de grâce du jeton.
+    
+    Args:
+        blocking_workers (int): Taille du pool des sondes bloquantes
+    """
+    
+    def __init__(self, blocking_workers=DEFAULT_BLOCKING_WORKERS):
+        self.blocking_workers = blocking_workers
+        self.loop = asyncio.new_event_loop()
+        self._futures = set()
+        self._lock = threading.Lock()
+        self._pool_threads = set()
+        self.executor = concurrent.futures.ThreadPoolExecutor(blocking_workers, thread_name_prefix='probe',
+                                                              initializer=self._init_thread)
+        self.loop.set_default_executor(self.executor)
+        self._thread = threading.Thread(target=self._run_loop, name='runtime-loop', daemon=True)
+        self._thread.start()
+        
+        # Événement créé sur la boucle du runtime : avant Python 3.10, un
+        # asyncio.Event se lie à la boucle par défaut du thread qui le crée
+        self._cancelled = asyncio.run_coroutine_threadsafe(self._create_event(), self.loop).result()
+        self.cancel_token.add_callback(lambda: self.loop.call_soon_threadsafe(self._cancelled.set))
+    
+    @staticmethod
+    async def _create_event():
+        return asyncio.Event()
+    
+    def _init_thread(self):
+        """Initialisation des workers du pool : recensement et profilage si --profile"""
+        with self._lock:
+            self._pool_threads.add(threading.current_thread())
+        self._profile_thread()
+    
+    @staticmethod
+    def _profile_thread():
+        from modules.profiling import get_profiler
+        
+        profiler = get_profiler()
+        if profiler:
+            profiler.profile_thread()
+    
+    def _run_loop(self):
+        self._profile_thread()
+        self.loop.run_forever()
+    
+    @property
+    def cancel_token(self):
+        """Jeton d'annulation du processus (CancelToken)"""
+        return get_cancel_token()
+    
+    @property
+    def fd_budget(self):
+        """Budget de sockets partagé (FdBudget)"""
+        return get_fd_budget()
+    
+    @property
+    def rate_limiter(self):
+        """Limiteur de débit des sondes TCP/UDP du profil de timing actif"""
+        return get_timing().rate_limiter
+    
+    @property
+    def dns_rate_limiter(self):
+        """Limiteur de débit des requêtes DNS (bruteforce, sweep PTR) du profil de timing actif"""
+        return get_timing().dns_rate_limiter
+    
+    @property
+    def metrics(self):
+        """Compteurs de retransmissions par moteur (RetryStats)"""
+        return get_retry_stats()
+    
+    @property
+    def resolver(self):
+        """Pool de résolveurs partagé (ResolverPool) ; les coroutines passent par resolve_async()"""
+        from modules.passive import get_resolver
+        
+        return get_resolver()
+    
+    def submit(self, coro):
+        """
+        Planifie une coroutine sur la boucle depuis n'importe quel thread
+        
+        Args:
+            coro (coroutine): Coroutine à exécuter
+        
+        Returns:
+            concurrent.futures.Future: Résultat de la coroutine
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        return future
+    
+    def _forget(self, future):
+        with self._lock:
+            self._futures.discard(future)
+    
+    def run(self, coro):
+        """
+        Exécute une coroutine sur la boucle et attend son résultat
+        
+        Args:
+            coro (coroutine): Coroutine à exécuter
+        
+        Returns:
+            Valeur retournée par la coroutine
+        
+        Raises:
+            RuntimeError: Appel depuis la boucle elle-même (utiliser await)
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("Runtime.run() appelé depuis la boucle du runtime")
+        
+        future = self.submit(coro)
+        try:
+            return future.result()
+        except KeyboardInterrupt:
+            future.cancel()
+            raise
+    
+    def cancel(self):
+        """
+        Annule toutes les tâches soumises et encore en cours
+        
+        Returns:
+            int: Nombre de tâches annulées
+        """
+        with self._lock:
+            futures = list(self._futures)
+        return sum(1 for future in futures if future.cancel())
+    
+    async def pace(self, rate_limiter=None):
+        """
+        Attend un jeton du limiteur de débit sans bloquer la boucle
+        
+        L'attente est écourtée par l'annulation de l'exécution.
+        
+        Args:
+            rate_limiter (RateLimiter): Limiteur (défaut: celui du profil de timing)
+        """
+        delay = (rate_limiter or self.rate_limiter).reserve()
+        if delay > 0:
+            try:
+                await asyncio.wait_for(self._cancelled.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+    
+    def _feed(self, items, queue, credits, stopped):
+        """Lit un flux bloquant dans un thread et le transmet à la boucle (au plus `credits` éléments d'avance)"""
+        try:
+            for item in items:
+                credits.acquire()
+                if stopped.is_set():
+                    return
+                self.loop.call_soon_threadsafe(queue.put_nowait, item)
+        except Exception as e:
+            log(f"Erreur de lecture du flux du runtime: {str(e)}", "error")
+        finally:
+            self.loop.call_soon_threadsafe(queue.put_nowait, _END)
+    
+    async def map(self, handler, items, concurrency, rate_limiter=None, stream=False):
+        """
+        Applique une coroutine à chaque élément, avec au plus `concurrency` en vol
+        
+        Après une annulation du jeton, plus aucun élément n'est pris ; les
+        handlers en cours ont le délai de grâce du jeton pour finir, puis
+        sont annulés.
+        
+        Une exception d'un handler est journalisée et n'arrête que sa sonde ;
+        une exception hors des handlers (lecture de `items`, limiteur) est
+        relancée une fois les workers arrêtés.
+        
+        Args:
+            handler (callable): Coroutine handler(item)
+            items (iterable): Éléments à traiter
+            concurrency (int): Nombre maximum de handlers simultanés
+            rate_limiter (RateLimiter): Limiteur consulté avant chaque élément (optionnel)
+            stream (bool): items peut bloquer (flux d'une phase, frontière...) : il
+                est alors lu par un thread dédié pour ne pas bloquer la boucle
+        """
+        concurrency = max(1, concurrency)
+        
+        if stream:
+            queue = asyncio.Queue()
+            credits = threading.Semaphore(concurrency)
+            stopped = threading.Event()
+            threading.Thread(target=self._feed, args=(items, queue, credits, stopped), daemon=True).start()
+            
+            async def next_item():
+                item = await queue.get()
+                if item is _END:
+                    # Le marqueur reste disponible pour les autres workers
+                    queue.put_nowait(_END)
+                    return _END
+                credits.release()
+                return item
+        else:
+            iterator = iter(items)
+            
+            async def next_item():
+                return next(iterator, _END)
+        
+        async def worker():
+            while not self._cancelled.is_set():
+                item = await next_item()
+                if item is _END:
+                    return
+                if rate_limiter:
+                    await self.pace(rate_limiter)
+                    if self._cancelled.is_set():
+                        return
+                try:
+                    await handler(item)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log(f"Erreur de sonde sur {item}: {str(e)}", "error")
+        
+        tasks = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+        workers = asyncio.gather(*tasks, return_exceptions=True)
+        cancelled = asyncio.ensure_future(self._cancelled.wait())
+        try:
+            await asyncio.wait((workers, cancelled), return_when=asyncio.FIRST_COMPLETED)
+            if not workers.done():
+                # Annulation : réveille les workers en attente du flux et
+                # laisse aux sondes en vol le délai de grâce
+                if stream:
+                    queue.put_nowait(_END)
+                await asyncio.wait((workers,), timeout=self.cancel_token.grace)
+                if not workers.done():
+                    log("Sondes en vol abandonnées après le délai de grâce", "warning")
+            
+            # Une erreur hors des handlers (lecture des éléments, limiteur de
+            # débit) ne doit pas passer pour une phase terminée normalement
+            errors = [task.exception() for task in tasks if task.done() and not task.cancelled()
+                      and task.exception() is not None]
+            if errors:
+                log(f"Erreur du runtime, {len(errors)} workers arrêtés: {str(errors[0])}", "error")
+                raise errors[0]
+        finally:
+            cancelled.cancel()
+            for task in tasks:
+                task.cancel()
+            if stream:
+                stopped.set()
+                credits.release()
+    
+    async def map_blocking(self, func, items, concurrency, rate_limiter=None, stream=False):
+        """
+        Applique une fonction bloquante à chaque élément sur le pool partagé
+        
+        Args:
+            func (callable): Fonction func(item), exécutée dans le pool
+            items (iterable): Éléments à traiter
+            concurrency (int): Nombre maximum d'appels simultanés pour ce moteur
+            rate_limiter (RateLimiter): Limiteur consulté avant chaque élément (optionnel)
+            stream (bool): items peut bloquer (voir map())
+        """
+        async def handler(item):
+            await self.loop.run_in_executor(self.executor, func, item)
+        
+        await self.map(handler, items, concurrency, rate_limiter, stream)
+    
+    def run_in_threads(self, func, timeout=5.0):
+        """
+        Exécute une fonction dans chaque thread du runtime (boucle et workers démarrés du pool)
+        
+        Chaque worker attend les autres après son appel : aucun ne prend deux
+        appels, chacun s'exécute donc sur un thread différent. func doit rester
+        sans effet si elle est rappelée dans le même thread (worker occupé
+        au-delà de `timeout`).
+        
+        Args:
+            func (callable): Fonction sans argument
+            timeout (float): Attente maximale des threads occupés, en secondes
+        
+        Returns:
+            int: Nombre d'appels exécutés
+        """
+        async def on_loop():
+            func()
+        
+        futures = [asyncio.run_coroutine_threadsafe(on_loop(), self.loop)]
+        
+        with self._lock:
+            workers = len(self._pool_threads)
+        if workers:
+            barrier = threading.Barrier(workers)
+            
+            def on_worker():
+                func()
+                try:
+                    barrier.wait(timeout)
+                except threading.BrokenBarrierError:
+                    pass
+            
+            futures.extend(self.executor.submit(on_worker) for _ in range(workers))
+        
+        done, _ = concurrent.futures.wait(futures, timeout=2 * timeout)
+        for future in done:
+            if future.exception():
+                log(f"Erreur dans un thread du runtime: {str(future.exception())}", "error")
+        return len(done)
+    
+    def report(self):
+        """
+        État du runtime
+        
+        Returns:
+            dict: Tâches soumises en cours, taille et threads démarrés du pool
+        """
+        with self._lock:
+            tasks = len(self._futures)
+            threads = len(self._pool_threads)
+        return {
+            'tasks': tasks,
+            'blocking_workers': self.blocking_workers,
+            'pool_threads': threads
+        }
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+def current_runtime():
+    """
+    Retourne le runtime réseau du processus s'il a déjà été démarré
+    
+    Returns:
+        Runtime: Runtime partagé ou None
+    """
+    return _runtime
+
+def get_runtime():
+    """
+    Retourne le runtime réseau du processus (démarré au premier appel)
+    
+    La taille du pool des sondes bloquantes est lue dans la section
+    [RUNTIME] de config.ini (blocking_workers).
+    
+    Returns:
+        Runtime: Runtime partagé
+    """
+    global _runtime
+    
+    with _runtime_lock:
+        if _runtime is None:
+            workers = get_config().getint('RUNTIME', 'blocking_workers', fallback=DEFAULT_BLOCKING_WORKERS)
+            _runtime = Runtime(max(1, workers))
+    
+    return _runtime
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module d'ordonnancement des phases
+Exécute les phases de reconnaissance selon un graphe de dépendances
+"""
+
+import queue
+import threading
+import time
+from modules.utils import log, get_cancel_token
+from modules.profiling import get_profiler
+
+# Marqueur de fin de flux
+_END = object()
+
+class PhaseContext:
+    """
+    Contexte passé à chaque phase
+    
+    Permet d'émettre des résultats partiels vers les phases abonnées,
+    de consommer le flux d'une phase amont et de lire son résultat final.
+    """
+    
+    def __init__(self, scheduler, name):
+        self._scheduler = scheduler
+        self.name = name
+    
+    def emit(self, item):
+        """
+        Publie un résultat partiel vers toutes les phases abonnées
+        
+        Args:
+            item: Résultat partiel (hôte actif, port ouvert, sous-domaine...)
+        """
+        for subscriber in self._scheduler._subscribers[self.name]:
+            subscriber.put(item)
+        if self._scheduler.observer:
+            self._scheduler.observer(self.name, item)
+    
+    def stream(self, name):
+        """
+        Itère sur les résultats partiels d'une phase amont au fil de l'eau
+        
+        Args:
+            name (str): Nom de la phase amont (déclarée dans streams)
+        
+        Yields:
+            Résultats partiels jusqu'à la fin de la phase amont
+        """
+        channel = self._scheduler._channels[(name, self.name)]
+        while True:
+            item = channel.get()
+            if item is _END:
+                return
+            yield item
+    
+    def result(self, name):
+        """
+        Attend la fin d'une phase et retourne son résultat
+        
+        Args:
+            name (str): Nom de la phase
+        
+        Returns:
+            Valeur retournée par la phase (None en cas d'erreur)
+        """
+        self._scheduler._done[name].wait()
+        return self._scheduler.results.get(name)
+
+class PhaseScheduler:
+    """
+    Ordonnanceur de phases sous forme de graphe (DAG)
+    
+    Chaque phase tourne dans son propre thread. Une phase démarre dès que
+    les phases listées dans `after` sont terminées ; les phases listées dans
+    `streams` ne bloquent pas son démarrage, leurs résultats partiels sont
+    consommés via ctx.stream(). Une phase qui devrait démarrer après
+    l'annulation de l'exécution (Ctrl-C, --max-time) est ignorée.
+    
+    Args:
+        observer (callable): Appelé avec (phase, résultat partiel) à chaque
+            ctx.emit(), en plus des phases abonnées (ex: flux d'un job du serveur)
+    """
+    
+    def __init__(self, observer=None):
+        self.observer = observer
+        self._phases = {}
+        self._subscribers = {}
+        self._channels = {}
+        self._done = {}
+        self.results = {}
+        self.timings = {}
+    
+    def add(self, name, func, after=(), streams=()):
+        """
+        Déclare une phase
+        
+        Args:
+            name (str): Nom unique de la phase
+            func (callable): Fonction func(ctx) exécutant la phase
+            after (iterable): Phases à attendre avant de démarrer
+            streams (iterable): Phases dont on consomme les résultats partiels
+        """
+        if name in self._phases:
+            raise ValueError(f"Phase déjà déclarée: {name}")
+        
+        self._phases[name] = {'func': func, 'after': list(after), 'streams': list(streams)}
+    
+    def _check_graph(self):
+        """Vérifie que les dépendances existent et que le graphe est acyclique"""
+        pending = {}
+        for name, phase in self._phases.items():
+            deps = set(phase['after']) | set(phase['streams'])
+            unknown = deps - set(self._phases)
+            if unknown:
+                raise ValueError(f"Phase {name}: dépendances inconnues {sorted(unknown)}")
+            pending[name] = deps
+        
+        # Tri topologique (Kahn)
+        ready = [name for name, deps in pending.items() if not deps]
+        visited = 0
+        while ready:
+            current = ready.pop()
+            visited += 1
+            for name, deps in pending.items():
+                if current in deps:
+                    deps.discard(current)
+                    if not deps:
+                        ready.append(name)
+        
+        if visited != len(self._phases):
+            raise ValueError("Cycle détecté dans le graphe des phases")
+    
+    def _run_phase(self, name):
+        phase = self._phases[name]
+        
+        for dependency in phase['after']:
+            self._done[dependency].wait()
+        
+        start = time.monotonic()
+        thread_cpu = time.thread_time()
+        process_cpu = time.process_time()
+        try:
+            token = get_cancel_token()
+            if token.cancelled:
+                log(f"Phase {name} ignorée: exécution annulée ({token.reason})", "warning")
+                self.results[name] = None
+            else:
+                self.results[name] = phase['func'](PhaseContext(self, name))
+        except Exception as e:
+            log(f"Erreur dans la phase {name}: {str(e)}", "error")
+            self.results[name] = None
+        finally:
+            self.timings[name] = time.monotonic() - start
+            profiler = get_profiler()
+            if profiler:
+                profiler.record_phase(name, start, self.timings[name], time.thread_time() - thread_cpu,
+                                      time.process_time() - process_cpu)
+            for subscriber in self._subscribers[name]:
+                subscriber.put(_END)
+            self._done[name].set()
+    
+    def run(self):
+        """
+        Exécute toutes les phases et attend leur fin
+        
+        Returns:
+            dict: Résultat de chaque phase, indexé par nom
+        """
+        self._check_graph()
+        
+        for name in self._phases:
+            self._subscribers[name] = []
+            self._done[name] = threading.Event()
+        
+        for name, phase in self._phases.items():
+            for upstream in phase['streams']:
+                channel = queue.Queue()
+                self._channels[(upstream, name)] = channel
+                self._subscribers[upstream].append(channel)
+        
+        threads = []
+        for name in self._phases:
+            thread = threading.Thread(target=self._run_phase, args=(name,), name=f"phase-{name}", daemon=True)
+            threads.append(thread)
+            thread.start()
+        
+        for thread in threads:
+            thread.join()
+        
+        log("Phases terminées: " + ', '.join(f"{name}={duration:.2f}s" for name, duration in self.timings.items()), "info")
+        return self.results
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module de contrôle du périmètre
+Index d'intervalles des plages autorisées et bloquées ([SECURITY] de config.ini)
+"""
+
+import bisect
+import socket
+import ipaddress
+import threading
+from modules.utils import log, get_config, config_list
+
+# Plages non routables : soumises à allowed_private_ranges
+PRIVATE_RANGES = (
+    '0.0.0.0/8', '10.0.0.0/8', '100.64.0.0/10', '127.0.0.0/8', '169.254.0.0/16',
+    '172.16.0.0/12', '192.0.0.0/24', '192.168.0.0/16', '198.18.0.0/15',
+    '::1/128', '::/128', 'fc00::/7', 'fe80::/10'
+)
+
+class ScopeError(ValueError):
+    """Cible refusée par le contrôle du périmètre"""
+
+class IntervalIndex:
+    """
+    Union de plages d'adresses, triée et fusionnée
+    
+    Les plages sont converties en intervalles d'entiers [début, fin] puis
+    fusionnées ; une recherche est une bisection, en O(log n) quel que soit
+    le nombre de plages chargées.
+    
+    Args:
+        networks (iterable): Plages CIDR (str ou ipaddress.ip_network)
+    """
+    
+    def __init__(self, networks=()):
+        intervals = {4: [], 6: []}
+        for network in networks:
+            if isinstance(network, str):
+                network = ipaddress.ip_network(network.strip(), strict=False)
+            intervals[network.version].append((int(network.network_address), int(network.broadcast_address)))
+        
+        self._starts = {}
+        self._ends = {}
+        for version, items in intervals.items():
+            items.sort()
+            merged = []
+            for start, end in items:
+                if merged and start <= merged[-1][1] + 1:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            self._starts[version] = [start for start, _ in merged]
+            self._ends[version] = [end for _, end in merged]
+    
+    def __len__(self):
+        return len(self._starts[4]) + len(self._starts[6])
+    
+    def _find(self, version, value):
+        # Dernier intervalle commençant avant value
+        index = bisect.bisect_right(self._starts[version], value) - 1
+        return index if index >= 0 and value <= self._ends[version][index] else None
+    
+    def contains(self, address):
+        """
+        Indique si une adresse appartient à l'une des plages
+        
+        Args:
+            address (ipaddress.IPv4Address or IPv6Address): Adresse
+        
+        Returns:
+            bool: True si l'adresse est couverte
+        """
+        return self._find(address.version, int(address)) is not None
+
+def load_scope_file(path):
+    """
+    Charge un fichier de périmètre (une plage CIDR ou une IP par ligne)
+    
+    Les lignes vides et les commentaires (#) sont ignorés.
+    
+    Args:
+        path (str): Chemin du fichier
+    
+    Returns:
+        list: Plages (ipaddress.ip_network)
+    
+    Raises:
+        ScopeError: Fichier illisible ou plage invalide
+    """
+    networks = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                try:
+                    networks.append(ipaddress.ip_network(line, strict=False))
+                except ValueError as e:
+                    raise ScopeError(f"{path}:{number}: plage invalide '{line}' ({str(e)})")
+    except OSError as e:
+        raise ScopeError(f"Fichier de périmètre illisible {path}: {str(e)}")
+    
+    log(f"Périmètre chargé: {len(networks)} plages depuis {path}", "info")
+    return networks
+
+class Scope:
+    """
+    Périmètre autorisé pour les sondes actives
+    
+    Une adresse est refusée si elle est dans une plage bloquée, hors de la
+    liste d'autorisation (si un fichier de périmètre est fourni), ou dans
+    une plage non routable absente de allowed_private_ranges. Les plages
+    plus grandes que max_scan_range sont refusées en bloc.
+    
+    Args:
+        allowed (iterable): Plages autorisées (None : tout l'Internet routable)
+        allowed_private (iterable): Plages privées autorisées
+        blocked (iterable): Plages interdites, prioritaires sur le reste
+        max_scan_range (int): Nombre maximum d'adresses d'une plage cible (None : illimité)
+        enabled (bool): Active le contrôle (validate_targets)
+    """
+    
+    def __init__(self, allowed=None, allowed_private=(), blocked=(), max_scan_range=None, enabled=True):
+        self.enabled = enabled
+        self.max_scan_range = max_scan_range
+        self._allowed = IntervalIndex(allowed) if allowed is not None else None
+        self._allowed_private = IntervalIndex(allowed_private)
+        self._blocked = IntervalIndex(blocked)
+        self._private = IntervalIndex(PRIVATE_RANGES)
+    
+    @classmethod
+    def from_config(cls, scope_file=None):
+        """
+        Construit le périmètre depuis la section [SECURITY] de config.ini
+        
+        Args:
+            scope_file (str): Fichier de périmètre (sinon scope_file de la configuration)
+        
+        Returns:
+            Scope: Périmètre configuré
+        """
+        config = get_config()
+        scope_file = scope_file or config.get('SECURITY', 'scope_file', fallback='').strip()
+        max_scan_range = config.getint('SECURITY', 'max_scan_range', fallback=0)
+        
+        return cls(
+            allowed=load_scope_file(scope_file) if scope_file else None,
+            allowed_private=config_list('SECURITY', 'allowed_private_ranges'),
+            blocked=config_list('SECURITY', 'blocked_ranges'),
+            max_scan_range=max_scan_range or None,
+            enabled=config.getboolean('SECURITY', 'validate_targets', fallback=True)
+        )
+    
+    def check(self, address):
+        """
+        Retourne la raison du refus d'une adresse
+        
+        Args:
+            address (str): Adresse IP
+        
+        Returns:
+            str: Raison du refus ou None si l'adresse est autorisée
+        """
+        if not self.enabled:
+            return None
+        
+        try:
+            address = ipaddress.ip_address(address)
+        except ValueError:
+            return "adresse invalide"
+        
+        if self._blocked.contains(address):
+            return "plage bloquée"
+        if self._allowed is not None and not self._allowed.contains(address):
+            return "hors périmètre"
+        if self._private.contains(address) and not self._allowed_private.contains(address):
+            return "plage privée non autorisée"
+        return None
+    
+    def allows(self, address):
+        """
+        Indique si une adresse peut être sondée
+        
+        Args:
+            address (str): Adresse IP
+        
+        Returns:
+            bool: True si l'adresse est dans le périmètre
+        """
+        return self.check(address) is None
+    
+    def resolve(self, host):
+        """
+        Résout un hôte et vérifie que toutes ses adresses sont dans le périmètre
+        
+        Un nom qui pointe à la fois dans et hors du périmètre est refusé :
+        l'appelant se connecte ensuite à l'adresse retournée, jamais à une
+        adresse choisie par le résolveur du système au moment de connect().
+        
+        Args:
+            host (str): Nom ou adresse IP
+        
+        Returns:
+            str: Adresse vérifiée à laquelle se connecter
+        
+        Raises:
+            ScopeError: Nom non résolu ou adresse hors périmètre
+        """
+        try:
+            addresses = [str(ipaddress.ip_address(host))]
+        except ValueError:
+            try:
+                infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+            except (OSError, UnicodeError) as e:
+                raise ScopeError(f"résolution de {host} échouée ({str(e)})")
+            addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        
+        for address in addresses:
+            reason = self.check(address)
+            if reason:
+                raise ScopeError(reason if address == host else f"{address}: {reason}")
+        return addresses[0]
+    
+    def allows_any(self, addresses):
+        """Indique si au moins une des adresses est dans le périmètre"""
+        return any(self.allows(address) for address in addresses)
+    
+    def filter(self, addresses):
+        """
+        Retire les adresses hors périmètre (en journalisant chaque refus)
+        
+        Args:
+            addresses (iterable): Adresses IP
+        
+        Returns:
+            list: Adresses autorisées
+        """
+        allowed = []
+        for address in addresses:
+            reason = self.check(address)
+            if reason:
+                log(f"Cible {address} ignorée: {reason}", "warning")
+            else:
+                allowed.append(address)
+        return allowed
+    
+    def check_network(self, cidr_range):
+        """
+        Vérifie la taille d'une plage cible
+        
+        Args:
+            cidr_range (str): Plage CIDR
+        
+        Raises:
+            ScopeError: Plage plus grande que max_scan_range
+        """
+        if not self.enabled or not self.max_scan_range:
+            return
+        
+        try:
+            network = ipaddress.ip_network(cidr_range, strict=False)
+        except ValueError:
+            # Plage invalide : signalée par l'appelant
+            return
+        
+        if network.num_addresses > self.max_scan_range:
+            raise ScopeError(f"Plage {cidr_range} trop grande: {network.num_addresses} adresses "
+                             f"(max_scan_range = {self.max_scan_range})")
+
+_scope = None
+_scope_lock = threading.Lock()
+
+def get_scope():
+    """
+    Retourne le périmètre partagé (construit depuis config.ini au premier appel)
+    
+    Returns:
+        Scope: Périmètre partagé
+    """
+    global _scope
+    
+    with _scope_lock:
+        if _scope is None:
+            _scope = Scope.from_config()
+    
+    return _scope
+
+def set_scope(scope):
+    """
+    Remplace le périmètre partagé (ex: fichier passé en ligne de commande)
+    
+    Args:
+        scope (Scope): Nouveau périmètre
+    """
+    global _scope
+    
+    with _scope_lock:
+        _scope = scope
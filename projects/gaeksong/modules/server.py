@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module du serveur de jobs
+API locale (socket Unix ou HTTP sur localhost) : file de jobs, exécution sous budgets partagés et flux des résultats
+"""
+
+import io
+import os
+import json
+import stat
+import time
+import queue
+import signal
+import socket
+import itertools
+import threading
+import contextlib
+import socketserver
+from collections import Counter, OrderedDict, deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from modules.utils import log, print_colored
+from modules.export import ExportStream, _json_default
+
+# Commandes acceptées dans un job (batch et merge écrivent leurs propres fichiers)
+JOB_COMMANDS = ('passive', 'active', 'pipeline')
+
+# Port HTTP par défaut (écoute sur localhost)
+DEFAULT_PORT = 8765
+
+# Taille maximale d'une requête (JSON du job)
+MAX_REQUEST_SIZE = 1 << 20
+
+# Jobs terminés conservés pour consultation (les plus anciens sont oubliés)
+KEEP_FINISHED_JOBS = 1000
+
+# Jobs terminés dont le résultat et les résultats partiels restent consultables ;
+# des plus anciens, seul l'état (summary) est conservé
+KEEP_FINISHED_RESULTS = 20
+
+# Événements conservés par job : au-delà, les plus anciens sont oubliés
+MAX_JOB_EVENTS = 10000
+
+# Intervalle des lignes vides envoyées sur un flux inactif (détection des clients partis)
+STREAM_HEARTBEAT = 15
+
+class Job:
+    """
+    Job de reconnaissance soumis au serveur
+    
+    Chaque étape (mise en file, démarrage, résultat partiel, fin) est
+    ajoutée au journal d'événements du job, que les clients lisent en flux
+    depuis n'importe quelle position. Le journal ne garde que les
+    max_events derniers événements (leur numéro seq reste croissant : un
+    client en retard voit le saut) ; compact() oublie le résultat et les
+    résultats partiels d'un job terminé.
+    
+    Args:
+        job_id (str): Identifiant du job
+        argv (list): Ligne de commande de la sous-commande
+        args (argparse.Namespace): Arguments analysés
+        priority (int): Priorité (plus petit = plus tôt)
+        export (bool): Exporte aussi le résultat dans results/ comme la ligne de commande
+        max_events (int): Nombre maximum d'événements conservés
+    """
+    
+    def __init__(self, job_id, argv, args, priority=0, export=False, max_events=MAX_JOB_EVENTS):
+        self.id = job_id
+        self.argv = argv
+        self.args = args
+        self.priority = priority
+        self.export = export
+        self.status = 'queued'
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.events = deque(maxlen=max_events)
+        self.compacted = False
+        self._next_seq = 0
+        self._cond = threading.Condition()
+    
+    @property
+    def done(self):
+        """Indique si le job est terminé (succès, échec ou annulation)"""
+        return self.status in ('done', 'failed', 'cancelled')
+    
+    def publish(self, event, **fields):
+        """
+        Ajoute un événement au journal du job et réveille les flux en attente
+        
+        Args:
+            event (str): Type d'événement (queued, started, item, done...)
+            **fields: Contenu de l'événement
+        """
+        with self._cond:
+            self.events.append({'seq': self._next_seq, 'event': event, 'time': round(time.time(), 3), **fields})
+            self._next_seq += 1
+            self._cond.notify_all()
+    
+    def finish(self, status, **fields):
+        """
+        Termine le job et publie l'événement final
+        
+        Args:
+            status (str): done, failed ou cancelled
+            **fields: Contenu de l'événement final (result, error...)
+        """
+        with self._cond:
+            self.status = status
+            self.finished = time.time()
+            self.publish(status, **fields)
+    
+    def wait_events(self, index, timeout):
+        """
+        Attend les événements postérieurs à une position du journal
+        
+        Args:
+            index (int): Numéro (seq) du premier événement voulu
+            timeout (float): Attente maximale
+        
+        Returns:
+            tuple: (événements encore conservés à partir de index, job terminé)
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._next_seq > index or self.done, timeout)
+            if self.compacted:
+                return [event for event in self.events if event['seq'] >= index], self.done
+            # Journal contigu : les (_next_seq - index) derniers événements, lus depuis la fin
+            newest = itertools.islice(reversed(self.events), max(0, self._next_seq - index))
+            return list(newest)[::-1], self.done
+    
+    def compact(self):
+        """
+        Oublie le résultat et les résultats partiels d'un job terminé
+        
+        Seuls l'état et les événements de cycle de vie (sans le résultat)
+        sont conservés.
+        """
+        with self._cond:
+            if self.compacted or not self.done:
+                return
+            self.result = None
+            self.events = deque(
+                {key: value for key, value in event.items() if key != 'result'}
+                for event in self.events if event['event'] != 'item'
+            )
+            self.compacted = True
+    
+    def summary(self, with_result=False):
+        """
+        État du job
+        
+        Args:
+            with_result (bool): Inclut le résultat complet
+        
+        Returns:
+            dict: Identifiant, état, dates, nombre d'événements (et résultat)
+        """
+        summary = {
+            'id': self.id,
+            'status': self.status,
+            'argv': self.argv,
+            'priority': self.priority,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'events': self._next_seq,
+            'compacted': self.compacted,
+            'error': self.error
+        }
+        if with_result:
+            summary['result'] = self.result
+        return summary
+
+class JobServer:
+    """
+    File et exécution des jobs
+    
+    Les jobs sont exécutés par max_jobs workers, par priorité puis par
+    ordre d'arrivée. Tous partagent les budgets du processus (profil de
+    timing et son limiteur de débit, budget de sockets, périmètre) et les
+    caches (résolveur DNS, WHOIS, PTR), qui restent chauds d'un job à
+    l'autre. Seuls les keep_results derniers jobs terminés gardent leur
+    résultat et leur journal complet : la mémoire du serveur reste bornée.
+    
+    Args:
+        parser (argparse.ArgumentParser): Parseur de la ligne de commande (validation des jobs)
+        runners (dict): Fonction d'exécution par commande (run_passive_recon...)
+        max_jobs (int): Nombre de jobs exécutés simultanément
+        formats (list): Formats des exports demandés par les jobs
+        keep_jobs (int): Nombre de jobs terminés conservés
+        keep_results (int): Nombre de jobs terminés dont le résultat est conservé
+    """
+    
+    def __init__(self, parser, runners, max_jobs=2, formats=('json',), keep_jobs=KEEP_FINISHED_JOBS,
+                 keep_results=KEEP_FINISHED_RESULTS):
+        self.parser = parser
+        self.runners = runners
+        self.max_jobs = max_jobs
+        self.formats = list(formats)
+        self.keep_jobs = keep_jobs
+        self.keep_results = keep_results
+        self.jobs = OrderedDict()
+        self.counters = Counter()
+        self.started = time.time()
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._parse_lock = threading.Lock()
+        self._workers = []
+    
+    def start(self):
+        """Démarre les workers"""
+        for number in range(self.max_jobs):
+            worker = threading.Thread(target=self._worker, name=f"job-worker-{number}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+    
+    def _argv(self, spec):
+        """Ligne de commande d'un job : argv explicite ou commande + options"""
+        if 'argv' in spec:
+            argv = spec['argv']
+            if not isinstance(argv, list) or not all(isinstance(item, str) for item in argv):
+                raise ValueError("argv doit être une liste de chaînes")
+            return list(argv)
+        
+        argv = [str(spec.get('command', ''))]
+        for option, value in (spec.get('options') or {}).items():
+            flag = '--' + option.replace('_', '-')
+            if value is True:
+                argv.append(flag)
+            elif value is False or value is None:
+                continue
+            elif isinstance(value, list):
+                argv.extend([flag] + [str(item) for item in value])
+            else:
+                argv.extend([flag, str(value)])
+        return argv
+    
+    def parse_job(self, spec):
+        """
+        Valide un job et analyse ses arguments avec le parseur de la ligne de commande
+        
+        Args:
+            spec (dict): {"command": ..., "options": {...}} ou {"argv": [...]}
+        
+        Returns:
+            tuple: (argv, argparse.Namespace)
+        
+        Raises:
+            ValueError: Job invalide (message de argparse)
+        """
+        if not isinstance(spec, dict):
+            raise ValueError("Le job doit être un objet JSON")
+        
+        argv = self._argv(spec)
+        if not argv or argv[0] not in JOB_COMMANDS:
+            raise ValueError(f"Commande de job invalide: {argv[0] if argv else ''} (acceptées: {', '.join(JOB_COMMANDS)})")
+        
+        # argparse écrit l'erreur sur stderr puis appelle sys.exit
+        stderr = io.StringIO()
+        with self._parse_lock, contextlib.redirect_stderr(stderr):
+            try:
+                args = self.parser.parse_args(argv)
+            except SystemExit:
+                message = stderr.getvalue().strip().splitlines()
+                raise ValueError(message[-1] if message else "Arguments invalides")
+        
+        if not 0 < getattr(args, 'bloom_error', 0.5) < 1:
+            raise ValueError("--bloom-error doit être compris entre 0 et 1")
+        return argv, args
+    
+    def submit(self, spec):
+        """
+        Met un job en file
+        
+        Args:
+            spec (dict): Description du job (voir parse_job), plus priority et export optionnels
+        
+        Returns:
+            Job: Job créé
+        
+        Raises:
+            ValueError: Job invalide
+        """
+        argv, args = self.parse_job(spec)
+        try:
+            priority = int(spec.get('priority', 0))
+        except (TypeError, ValueError):
+            raise ValueError("priority doit être un entier")
+        
+        with self._lock:
+            job_id = f"{next(self._order):06d}"
+            job = Job(job_id, argv, args, priority, bool(spec.get('export')))
+            self.jobs[job_id] = job
+            self.counters['submitted'] += 1
+            self._forget_finished()
+        
+        job.publish('queued', argv=argv)
+        self._queue.put((priority, job_id, job))
+        log(f"Job {job_id} en file: {' '.join(argv)}", "info")
+        return job
+    
+    def _forget_finished(self):
+        finished = [job for job in self.jobs.values() if job.done]
+        for job in finished[:max(0, len(finished) - self.keep_jobs)]:
+            del self.jobs[job.id]
+        for job in finished[:max(0, len(finished) - self.keep_results)]:
+            job.compact()
+    
+    def get(self, job_id):
+        """Retourne un job par identifiant (None s'il est inconnu)"""
+        with self._lock:
+            return self.jobs.get(job_id)
+    
+    def cancel(self, job_id):
+        """
+        Annule un job encore en file
+        
+        Args:
+            job_id (str): Identifiant du job
+        
+        Returns:
+            bool: True si le job a été annulé
+        """
+        job = self.get(job_id)
+        with self._lock:
+            if not job or job.status != 'queued':
+                return False
+            job.finish('cancelled')
+            self.counters['cancelled'] += 1
+            self._forget_finished()
+        log(f"Job {job_id} annulé", "info")
+        return True
+    
+    def _worker(self):
+        while True:
+            _, _, job = self._queue.get()
+            with self._lock:
+                if job.status != 'queued':
+                    continue
+                job.status = 'running'
+                job.started = time.time()
+            self._run(job)
+    
+    def _run(self, job):
+        job.publish('started')
+        args = job.args
+        export = None
+        
+        def observer(phase, item):
+            job.publish('item', phase=phase, data=item)
+            if export:
+                export.observer(phase, item)
+        
+        args.observer = observer
+        
+        try:
+            # Export demandé : fichiers ouverts avant l'exécution, remplis au fil des phases
+            if job.export:
+                target = getattr(args, 'domain', None) or getattr(args, 'target', None)
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                export = ExportStream(f"results/{args.command}_{target}_{timestamp}", target, self.formats,
+                                      defer=('port_scan', 'hosts') if getattr(args, 'banner', False) else ())
+            result = self.runners[args.command](args)
+        except Exception as e:
+            if export:
+                export.abort()
+            log(f"Job {job.id} en échec: {str(e)}", "error")
+            job.error = str(e)
+            job.finish('failed', error=job.error)
+            with self._lock:
+                self.counters['failed'] += 1
+                self._forget_finished()
+            return
+        
+        job.result = result
+        if export and result:
+            job.publish('exported', files=export.finish(result))
+        elif export:
+            export.abort()
+        
+        job.finish('done', result=result)
+        with self._lock:
+            self.counters['done'] += 1
+            self._forget_finished()
+        log(f"Job {job.id} terminé en {job.finished - job.started:.1f}s", "info")
+    
+    def health(self):
+        """
+        État du serveur
+        
+        Returns:
+            dict: Compteurs, jobs par état, profil de timing, santé des résolveurs, retransmissions et runtime
+        """
+        from modules.timing import get_timing
+        from modules.passive import get_resolver
+        from modules.retry import get_retry_stats
+        from modules.runtime import get_runtime
+        
+        with self._lock:
+            states = Counter(job.status for job in self.jobs.values())
+        
+        return {
+            'uptime': round(time.time() - self.started, 1),
+            'max_jobs': self.max_jobs,
+            'queued': states.get('queued', 0),
+            'running': states.get('running', 0),
+            'counters': dict(self.counters),
+            'timing': get_timing().to_dict(),
+            'resolvers': get_resolver().report(),
+            'retries': get_retry_stats().report(),
+            'runtime': get_runtime().report()
+        }
+
+class _Handler(BaseHTTPRequestHandler):
+    """Requêtes de l'API (voir serve() pour les routes)"""
+    
+    protocol_version = 'HTTP/1.1'
+    server_version = 'Gaeksong'
+    
+    def log_message(self, format, *args):
+        log(f"API {self.command} {self.path}: " + format % args, "debug")
+    
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _route(self):
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        return parts, parse_qs(url.query)
+    
+    def _job_or_404(self, job_id):
+        job = self.server.jobs.get(job_id)
+        if not job:
+            self._send_json(404, {'error': f"Job inconnu: {job_id}"})
+        return job
+    
+    def do_GET(self):
+        parts, query = self._route()
+        jobs = self.server.jobs
+        
+        if parts == ['health']:
+            self._send_json(200, jobs.health())
+        elif parts == ['jobs']:
+            with jobs._lock:
+                listing = [job.summary() for job in jobs.jobs.values()]
+            self._send_json(200, listing)
+        elif len(parts) == 2 and parts[0] == 'jobs':
+            job = self._job_or_404(parts[1])
+            if job:
+                self._send_json(200, job.summary(with_result=True))
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+            job = self._job_or_404(parts[1])
+            if job:
+                try:
+                    start = int(query.get('from', ['0'])[0])
+                except ValueError:
+                    start = 0
+                self._stream(job, max(0, start))
+        else:
+            self._send_json(404, {'error': f"Route inconnue: {self.path}"})
+    
+    def do_POST(self):
+        parts, _ = self._route()
+        if parts != ['jobs']:
+            self._send_json(404, {'error': f"Route inconnue: {self.path}"})
+            return
+        
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_REQUEST_SIZE:
+            self._send_json(413, {'error': "Requête trop volumineuse"})
+            return
+        
+        try:
+            spec = json.loads(self.rfile.read(length) or b'{}')
+            job = self.server.jobs.submit(spec)
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        
+        self._send_json(202, job.summary())
+    
+    def do_DELETE(self):
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != 'jobs':
+            self._send_json(404, {'error': f"Route inconnue: {self.path}"})
+            return
+        
+        job = self._job_or_404(parts[1])
+        if not job:
+            return
+        if self.server.jobs.cancel(job.id):
+            self._send_json(200, job.summary())
+        else:
+            self._send_json(409, {'error': f"Job {job.id} déjà {job.status}"})
+    
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+    
+    def _stream(self, job, index):
+        """Envoie le journal du job en NDJSON (chunked) jusqu'à sa fin"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        
+        try:
+            while True:
+                events, done = job.wait_events(index, STREAM_HEARTBEAT)
+                if events:
+                    index = events[-1]['seq'] + 1
+                    lines = ''.join(json.dumps(event, ensure_ascii=False, default=_json_default) + '\n'
+                                    for event in events)
+                    self._write_chunk(lines.encode('utf-8'))
+                elif done:
+                    break
+                else:
+                    self._write_chunk(b'\n')
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            log(f"Client du flux du job {job.id} déconnecté", "debug")
+            self.close_connection = True
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler attend une adresse (hôte, port)
+        return request, ('unix', 0)
+
+def _is_loopback(host):
+    try:
+        return all(info[4][0].startswith('127.') or info[4][0] == '::1'
+                   for info in socket.getaddrinfo(host, None))
+    except socket.gaierror:
+        return False
+
+def serve(parser, runners, socket_path=None, host='127.0.0.1', port=DEFAULT_PORT, max_jobs=2, formats=('json',)):
+    """
+    Lance le serveur de jobs jusqu'à interruption (Ctrl+C ou SIGTERM)
+    
+    Routes :
+        POST   /jobs             Soumet un job : {"command": "passive", "options": {"domain": "example.com",
+                                 "dns": true}} ou {"argv": [...]}, avec "priority" et "export" optionnels
+        GET    /jobs             Liste les jobs
+        GET    /jobs/<id>        État et résultat d'un job
+        GET    /jobs/<id>/events Journal du job en NDJSON, en flux jusqu'à sa fin (?from=N pour reprendre)
+        DELETE /jobs/<id>        Annule un job encore en file
+        GET    /health           Compteurs, profil de timing et santé des résolveurs
+    
+    Args:
+        parser (argparse.ArgumentParser): Parseur de la ligne de commande
+        runners (dict): Fonction d'exécution par commande
+        socket_path (str): Socket Unix (sinon HTTP sur host:port)
+        host (str): Adresse d'écoute HTTP
+        port (int): Port d'écoute HTTP
+        max_jobs (int): Nombre de jobs exécutés simultanément
+        formats (list): Formats des exports demandés par les jobs
+    """
+    jobs = JobServer(parser, runners, max_jobs, formats)
+    
+    if socket_path:
+        # Socket restée d'une exécution précédente
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            os.unlink(socket_path)
+        server = _UnixServer(socket_path, _Handler)
+        os.chmod(socket_path, 0o600)
+        address = socket_path
+    else:
+        if not _is_loopback(host):
+            log(f"Serveur de jobs exposé sur {host}: l'API n'a pas d'authentification", "warning")
+            print_colored(f"[!] Écoute sur {host}: l'API n'a pas d'authentification", "yellow")
+        server = _TCPServer((host, port), _Handler)
+        address = f"http://{host}:{server.server_address[1]}"
+    
+    server.jobs = jobs
+    jobs.start()
+    
+    def on_sigterm(signum, frame):
+        raise KeyboardInterrupt
+    
+    # signal n'est utilisable que depuis le thread principal (serveur embarqué dans un thread sinon)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, on_sigterm)
+    
+    print_colored(f"[+] Serveur de jobs en écoute sur {address} ({max_jobs} jobs simultanés)", "green")
+    log(f"Serveur de jobs démarré sur {address}", "info")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print_colored("[*] Arrêt du serveur de jobs", "blue")
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+        log(f"Serveur de jobs arrêté: {dict(jobs.counters)}", "info")
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module des profils de timing
+Timeouts, retransmissions, concurrence et débit regroupés en profils nommés (paranoid à insane)
+"""
+
+import threading
+from modules.utils import log, get_config, RateLimiter
+
+# Profils prédéfinis, du plus discret au plus rapide (index = niveau -T0 à -T5)
+TIMING_TEMPLATES = ('paranoid', 'sneaky', 'polite', 'normal', 'aggressive', 'insane')
+
+# Profil utilisé si ni la ligne de commande ni [TIMING] n'en désignent un
+DEFAULT_TEMPLATE = 'normal'
+
+# Champs d'un profil et leur type
+TIMING_FIELDS = {
+    'connect_timeout': float,    # Timeout de connexion TCP et d'attente d'une réponse UDP
+    'banner_timeout': float,     # Timeout du banner grabbing
+    'ping_timeout': float,       # Attente d'une réponse au ping
+    'dns_timeout': float,        # Timeout d'une requête DNS
+    'retries': int,              # Retransmissions d'une sonde restée sans réponse
+    'retry_delay': float,        # Délai avant la première retransmission (doublé ensuite)
+    'max_threads': int,          # Threads simultanés du ping sweep et du scan de ports
+    'dns_threads': int,          # Threads simultanés du bruteforce DNS
+    'async_concurrency': int,    # Sondes UDP et requêtes PTR simultanées
+    'rate': float,               # Sondes par seconde (0 : illimité)
+    'burst': int,                # Sondes pouvant partir d'un coup
+    'dns_rate': float,           # Requêtes DNS du bruteforce et du sweep PTR par seconde (0 : illimité)
+    'scan_delay': float          # Délai entre deux hôtes du ping sweep
+}
+
+# Valeurs de repli quand config.ini ne définit pas le profil (mêmes valeurs
+# que les sections [TIMING:...] livrées)
+BUILTIN_TEMPLATES = {
+    'paranoid': {'connect_timeout': 5, 'banner_timeout': 10, 'ping_timeout': 5, 'dns_timeout': 10, 'retries': 3,
+                 'retry_delay': 10, 'max_threads': 1, 'dns_threads': 1, 'async_concurrency': 1, 'rate': 0.0033,
+                 'burst': 1, 'dns_rate': 1, 'scan_delay': 300},
+    'sneaky': {'connect_timeout': 5, 'banner_timeout': 10, 'ping_timeout': 5, 'dns_timeout': 10, 'retries': 3,
+               'retry_delay': 5, 'max_threads': 1, 'dns_threads': 1, 'async_concurrency': 1, 'rate': 0.067,
+               'burst': 1, 'dns_rate': 5, 'scan_delay': 15},
+    'polite': {'connect_timeout': 3, 'banner_timeout': 5, 'ping_timeout': 3, 'dns_timeout': 8, 'retries': 2,
+               'retry_delay': 1, 'max_threads': 10, 'dns_threads': 10, 'async_concurrency': 10, 'rate': 2.5,
+               'burst': 1, 'dns_rate': 20, 'scan_delay': 0.4},
+    'normal': {'connect_timeout': 1, 'banner_timeout': 3, 'ping_timeout': 1, 'dns_timeout': 5, 'retries': 1,
+               'retry_delay': 0.25, 'max_threads': 50, 'dns_threads': 50, 'async_concurrency': 256, 'rate': 1000,
+               'burst': 100, 'dns_rate': 0, 'scan_delay': 0.01},
+    'aggressive': {'connect_timeout': 0.75, 'banner_timeout': 2, 'ping_timeout': 1, 'dns_timeout': 3, 'retries': 1,
+                   'retry_delay': 0.1, 'max_threads': 200, 'dns_threads': 100, 'async_concurrency': 512, 'rate': 5000,
+                   'burst': 500, 'dns_rate': 0, 'scan_delay': 0.002},
+    'insane': {'connect_timeout': 0.3, 'banner_timeout': 1, 'ping_timeout': 1, 'dns_timeout': 1.5, 'retries': 0,
+               'retry_delay': 0.05, 'max_threads': 500, 'dns_threads': 200, 'async_concurrency': 1024, 'rate': 0,
+               'burst': 1000, 'dns_rate': 0, 'scan_delay': 0}
+}
+
+class TimingTemplate:
+    """
+    Profil de timing appliqué par tous les moteurs de sondes
+    
+    Les moteurs (ping_sweep, port_scan, banner_grab, udp_scan,
+    brute_force_subdomains, résolveur DNS) lisent leurs valeurs par défaut
+    dans le profil actif : un seul réglage adapte toute la reconnaissance
+    au réseau (VPN client fragile ou laboratoire).
+    
+    Args:
+        name (str): Nom du profil
+        **values: Valeur de chaque champ de TIMING_FIELDS
+    """
+    
+    __slots__ = ('name', 'rate_limiter', 'dns_rate_limiter') + tuple(TIMING_FIELDS)
+    
+    def __init__(self, name, **values):
+        missing = set(TIMING_FIELDS) - set(values)
+        if missing:
+            raise ValueError(f"Profil de timing {name}: champs manquants {sorted(missing)}")
+        
+        self.name = name
+        for field, cast in TIMING_FIELDS.items():
+            value = cast(values[field])
+            if value < 0 or (field in ('max_threads', 'dns_threads', 'async_concurrency', 'burst') and value < 1):
+                raise ValueError(f"Profil de timing {name}: valeur invalide pour {field} ({value})")
+            setattr(self, field, value)
+        
+        # Limiteur partagé par les moteurs TCP et UDP ; le bruteforce DNS a le sien
+        self.rate_limiter = RateLimiter(self.rate, burst=self.burst)
+        self.dns_rate_limiter = RateLimiter(self.dns_rate)
+    
+    @classmethod
+    def from_config(cls, name=None):
+        """
+        Construit un profil depuis config.ini
+        
+        Le profil est lu dans la section [TIMING:<nom>] ; les champs absents
+        reprennent la valeur du profil prédéfini de même nom. Un nom peut
+        aussi être un niveau de 0 (paranoid) à 5 (insane).
+        
+        Args:
+            name (str): Nom ou niveau du profil (sinon template de [TIMING])
+        
+        Returns:
+            TimingTemplate: Profil configuré
+        
+        Raises:
+            ValueError: Profil inconnu ou valeur invalide
+        """
+        config = get_config()
+        name = (name or config.get('TIMING', 'template', fallback=DEFAULT_TEMPLATE)).strip().lower()
+        if name.isdigit() and int(name) < len(TIMING_TEMPLATES):
+            name = TIMING_TEMPLATES[int(name)]
+        
+        section = f"TIMING:{name}"
+        if name not in BUILTIN_TEMPLATES and not config.has_section(section):
+            raise ValueError(f"Profil de timing inconnu: {name} (disponibles: {', '.join(available_templates())})")
+        
+        values = dict(BUILTIN_TEMPLATES.get(name, {}))
+        if config.has_section(section):
+            for field in TIMING_FIELDS:
+                if config.has_option(section, field):
+                    values[field] = config.get(section, field)
+        
+        return cls(name, **values)
+    
+    def to_dict(self):
+        """
+        Valeurs du profil
+        
+        Returns:
+            dict: Nom et champs du profil
+        """
+        return {'name': self.name, **{field: getattr(self, field) for field in TIMING_FIELDS}}
+
+def available_templates():
+    """
+    Liste les profils disponibles (prédéfinis et sections [TIMING:...] de config.ini)
+    
+    Returns:
+        list: Noms des profils
+    """
+    names = list(TIMING_TEMPLATES)
+    for section in get_config().sections():
+        if section.startswith('TIMING:') and section[7:] not in names:
+            names.append(section[7:])
+    return names
+
+_timing = None
+_timing_lock = threading.Lock()
+
+def get_timing():
+    """
+    Retourne le profil de timing actif (template de [TIMING] au premier appel)
+    
+    Returns:
+        TimingTemplate: Profil actif
+    """
+    global _timing
+    
+    with _timing_lock:
+        if _timing is None:
+            try:
+                _timing = TimingTemplate.from_config()
+            except ValueError as e:
+                log(f"{str(e)}: profil {DEFAULT_TEMPLATE} utilisé", "warning")
+                _timing = TimingTemplate(DEFAULT_TEMPLATE, **BUILTIN_TEMPLATES[DEFAULT_TEMPLATE])
+    
+    return _timing
+
+def set_timing(template):
+    """
+    Remplace le profil de timing actif (ex: --timing en ligne de commande)
+    
+    Args:
+        template (TimingTemplate): Nouveau profil
+    """
+    global _timing
+    
+    with _timing_lock:
+        _timing = template
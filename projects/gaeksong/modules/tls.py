@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module de récupération des certificats TLS
+Poignée de main avec SNI, extraction du sujet, de l'émetteur et des SAN
+"""
+
+import ssl
+import asyncio
+from modules.utils import log, print_colored, print_finding, get_fd_budget
+from modules.records import CertificateRecord
+from modules.scope import get_scope
+from modules.timing import get_timing
+
+# Types d'attributs des noms distinctifs (OID -> nom de getpeercert())
+NAME_ATTRIBUTES = {
+    '2.5.4.3': 'commonName',
+    '2.5.4.5': 'serialNumber',
+    '2.5.4.6': 'countryName',
+    '2.5.4.7': 'localityName',
+    '2.5.4.8': 'stateOrProvinceName',
+    '2.5.4.10': 'organizationName',
+    '2.5.4.11': 'organizationalUnitName',
+    '2.5.4.9': 'streetAddress',
+    '2.5.4.15': 'businessCategory',
+    '2.5.4.17': 'postalCode',
+    '2.5.4.97': 'organizationIdentifier',
+    '0.9.2342.19200300.100.1.25': 'domainComponent',
+    '1.2.840.113549.1.9.1': 'emailAddress'
+}
+
+# Extension subjectAltName
+SAN_OID = '2.5.29.17'
+
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+def _der_items(data, offset=0, end=None):
+    """
+    Parcourt des éléments DER consécutifs
+    
+    Args:
+        data (bytes): Données DER
+        offset (int): Début du premier élément
+        end (int): Fin des éléments (défaut: fin des données)
+    
+    Yields:
+        tuple: (tag, début du contenu, fin du contenu)
+    
+    Raises:
+        ValueError: Élément tronqué
+    """
+    end = len(data) if end is None else end
+    while offset < end:
+        if offset + 2 > end:
+            raise ValueError("élément DER tronqué")
+        tag, length = data[offset], data[offset + 1]
+        offset += 2
+        if length & 0x80:
+            size = length & 0x7f
+            length = int.from_bytes(data[offset:offset + size], 'big')
+            offset += size
+        if offset + length > end:
+            raise ValueError("élément DER tronqué")
+        yield tag, offset, offset + length
+        offset += length
+
+def _decode_oid(data):
+    """Décode un OBJECT IDENTIFIER en notation pointée"""
+    values = []
+    value = 0
+    for byte in data:
+        value = (value << 7) | (byte & 0x7f)
+        if not byte & 0x80:
+            values.append(value)
+            value = 0
+    first = min(values[0] // 40, 2)
+    return '.'.join(str(part) for part in [first, values[0] - 40 * first] + values[1:])
+
+def _decode_string(tag, data):
+    """Décode une chaîne ASN.1 (UTF8String, PrintableString, BMPString...)"""
+    if tag == 0x1e:
+        return data.decode('utf-16-be', errors='replace')
+    if tag == 0x1c:
+        return data.decode('utf-32-be', errors='replace')
+    if tag == 0x14:
+        return data.decode('latin-1')
+    return data.decode('utf-8', errors='replace')
+
+def _decode_name(der, start, end):
+    """Décode un nom distinctif au format de getpeercert() : tuple de RDN ((type, valeur), ...)"""
+    rdns = []
+    for _, set_start, set_end in _der_items(der, start, end):
+        rdn = []
+        for _, attr_start, attr_end in _der_items(der, set_start, set_end):
+            (_, oid_start, oid_end), (tag, value_start, value_end) = list(_der_items(der, attr_start, attr_end))[:2]
+            oid = _decode_oid(der[oid_start:oid_end])
+            rdn.append((NAME_ATTRIBUTES.get(oid, oid), _decode_string(tag, der[value_start:value_end])))
+        rdns.append(tuple(rdn))
+    return tuple(rdns)
+
+def _decode_time(tag, data):
+    """Décode un UTCTime ou GeneralizedTime au format de getpeercert() ('Jan  5 09:34:43 2018 GMT')"""
+    text = data.decode('ascii')
+    if tag == 0x17:
+        year = int(text[:2])
+        text = f"{1900 + year if year >= 50 else 2000 + year}{text[2:]}"
+    year, month, day = text[:4], int(text[4:6]), int(text[6:8])
+    return f"{MONTHS[month - 1]} {day:2d} {text[8:10]}:{text[10:12]}:{text[12:14]} {year} GMT"
+
+def _decode_certificate(der):
+    """
+    Décode un certificat DER sans le valider
+    
+    getpeercert() ne renvoie les champs décodés que pour un certificat
+    validé ; en reconnaissance on veut aussi les certificats auto-signés ou
+    expirés. Seuls les champs utiles sont lus directement dans le DER
+    (sujet, émetteur, validité, SAN), sans dépendance ni fichier temporaire.
+    
+    Args:
+        der (bytes): Certificat au format DER
+    
+    Returns:
+        dict: Champs du certificat (format de getpeercert())
+    
+    Raises:
+        ValueError: Certificat mal formé
+    """
+    _, cert_start, cert_end = next(_der_items(der))
+    _, tbs_start, tbs_end = next(_der_items(der, cert_start, cert_end))
+    fields = list(_der_items(der, tbs_start, tbs_end))
+    
+    # Version explicite [0] optionnelle
+    if fields and fields[0][0] == 0xa0:
+        fields = fields[1:]
+    if len(fields) < 6:
+        raise ValueError("TBSCertificate incomplet")
+    
+    _, _, (_, issuer_start, issuer_end), (_, validity_start, validity_end), (_, subject_start, subject_end) = fields[:5]
+    not_before, not_after = list(_der_items(der, validity_start, validity_end))[:2]
+    
+    san = []
+    for tag, ext_start, ext_end in fields[6:]:
+        # Extensions : [3] EXPLICIT SEQUENCE OF Extension
+        if tag != 0xa3:
+            continue
+        _, seq_start, seq_end = next(_der_items(der, ext_start, ext_end))
+        for _, item_start, item_end in _der_items(der, seq_start, seq_end):
+            parts = list(_der_items(der, item_start, item_end))
+            if _decode_oid(der[parts[0][1]:parts[0][2]]) != SAN_OID:
+                continue
+            # extnValue : OCTET STRING contenant la SEQUENCE OF GeneralName
+            _, value_start, value_end = parts[-1]
+            _, names_start, names_end = next(_der_items(der, value_start, value_end))
+            for name_tag, name_start, name_end in _der_items(der, names_start, names_end):
+                # dNSName : [2] IMPLICIT IA5String
+                if name_tag == 0x82:
+                    san.append(('DNS', der[name_start:name_end].decode('ascii', errors='replace')))
+    
+    return {
+        'subject': _decode_name(der, subject_start, subject_end),
+        'issuer': _decode_name(der, issuer_start, issuer_end),
+        'notBefore': _decode_time(not_before[0], der[not_before[1]:not_before[2]]),
+        'notAfter': _decode_time(not_after[0], der[not_after[1]:not_after[2]]),
+        'subjectAltName': tuple(san)
+    }
+
+def _format_name(name):
+    """
+    Formate un nom distinctif (sujet ou émetteur)
+    
+    Args:
+        name (tuple): Nom au format de getpeercert()
+    
+    Returns:
+        str: Nom sous la forme "CN=..., O=..."
+    """
+    short = {'commonName': 'CN', 'organizationName': 'O', 'organizationalUnitName': 'OU',
+             'countryName': 'C', 'localityName': 'L', 'stateOrProvinceName': 'ST'}
+    parts = []
+    for rdn in name or ():
+        for key, value in rdn:
+            parts.append(f"{short.get(key, key)}={value}")
+    return ', '.join(parts)
+
+async def fetch_certificate_async(ip, port=443, sni=None, timeout=None):
+    """
+    Récupère le certificat présenté par un serveur TLS (coroutine du runtime)
+    
+    Args:
+        ip (str): Adresse IP du serveur
+        port (int): Port TLS
+        sni (str): Nom envoyé en SNI (sélectionne le bon certificat)
+        timeout (float): Timeout de connexion et de poignée de main (défaut: banner_timeout du profil de timing)
+    
+    Returns:
+        CertificateRecord: Certificat ou None en cas d'échec
+    """
+    timeout = timeout or get_timing().banner_timeout
+    
+    if not get_scope().allows(ip):
+        log(f"Poignée de main TLS {ip}:{port} refusée par le périmètre", "warning")
+        return None
+    
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    
+    budget = get_fd_budget()
+    await budget.acquire_async()
+    writer = None
+    
+    try:
+        # server_hostname vide : pas de SNI, comme wrap_socket(server_hostname=None)
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(ip, port, ssl=context, server_hostname=sni or ''), timeout)
+        der = writer.get_extra_info('ssl_object').getpeercert(binary_form=True)
+    except asyncio.TimeoutError:
+        log(f"Poignée de main TLS expirée {ip}:{port} ({sni})", "debug")
+        return None
+    except (OSError, ssl.SSLError) as e:
+        log(f"Poignée de main TLS échouée {ip}:{port} ({sni}): {str(e)}", "debug")
+        return None
+    finally:
+        # Fermeture systématique : une socket perdue consomme le budget
+        if writer:
+            writer.close()
+        budget.release()
+    
+    if not der:
+        return None
+    
+    try:
+        cert = _decode_certificate(der)
+    except Exception as e:
+        log(f"Certificat illisible {ip}:{port}: {str(e)}", "error")
+        return None
+    
+    san = [value for kind, value in cert.get('subjectAltName', ()) if kind == 'DNS']
+    record = CertificateRecord(
+        ip, port, sni,
+        _format_name(cert.get('subject')),
+        _format_name(cert.get('issuer')),
+        cert.get('notBefore'),
+        cert.get('notAfter'),
+        san
+    )
+    
+    print_finding(f"[+] Certificat {ip}:{port} -> {record.subject} ({len(san)} SAN)")
+    return record
+
+def fetch_certificate(ip, port=443, sni=None, timeout=None):
+    """
+    Récupère le certificat présenté par un serveur TLS
+    
+    Args:
+        ip (str): Adresse IP du serveur
+        port (int): Port TLS
+        sni (str): Nom envoyé en SNI (sélectionne le bon certificat)
+        timeout (float): Timeout de connexion et de poignée de main (défaut: banner_timeout du profil de timing)
+    
+    Returns:
+        CertificateRecord: Certificat ou None en cas d'échec
+    """
+    from modules.runtime import get_runtime
+    
+    return get_runtime().run(fetch_certificate_async(ip, port, sni, timeout))
+
+def harvest_certificates(entries, frontier=None, port=443, max_concurrency=None, timeout=None, rate_limiter=None):
+    """
+    Récupère les certificats des IPs découvertes et réinjecte les SAN
+    
+    Une seule poignée de main est faite par IP (avec le premier nom vu
+    pour cette IP en SNI). Les SAN du périmètre sont injectés dans la
+    frontière de découverte, qui les déduplique.
+    
+    Args:
+        entries (iterable): Sous-domaines découverts (SubdomainRecord), éventuellement un flux
+        frontier (SubdomainFrontier): Frontière du bruteforce ; chaque entrée doit
+            avoir été réservée par frontier.hold() et est libérée après traitement
+            (l'appelant ferme la frontière quand la phase se termine, même sur erreur)
+        port (int): Port TLS
+        max_concurrency (int): Nombre maximum de poignées de main simultanées (défaut: max_threads du profil de timing)
+        timeout (float): Timeout par poignée de main (défaut: banner_timeout du profil de timing)
+        rate_limiter (RateLimiter): Limiteur de débit (défaut: celui du profil de timing, partagé avec les scans)
+    
+    Returns:
+        list: Certificats récupérés (CertificateRecord)
+    """
+    from modules.runtime import get_runtime
+    
+    timing = get_timing()
+    max_concurrency = max_concurrency or timing.max_threads
+    timeout = timeout or timing.banner_timeout
+    rate_limiter = rate_limiter or timing.rate_limiter
+    runtime = get_runtime()
+    results = []
+    seen_ips = set()
+    
+    # Les handlers tournent tous sur la boucle du runtime : pas de verrou
+    async def harvest(entry):
+        try:
+            for ip in entry.ips:
+                if ip in seen_ips:
+                    continue
+                seen_ips.add(ip)
+                
+                record = await fetch_certificate_async(ip, port, sni=entry.subdomain, timeout=timeout)
+                if not record:
+                    continue
+                
+                results.append(record)
+                
+                if frontier:
+                    new_names = [name for name in record.san if frontier.add(name)]
+                    if new_names:
+                        print_finding(f"[+] {len(new_names)} nouveaux noms via le certificat de {ip}")
+        finally:
+            if frontier:
+                frontier.release_hold()
+    
+    runtime.run(runtime.map(harvest, entries, min(max_concurrency, get_fd_budget().size),
+                            rate_limiter=rate_limiter, stream=True))
+    
+    print_colored(f"[+] Récupération TLS terminée: {len(results)} certificats", "green")
+    log(f"Récupération TLS: {len(results)} certificats sur {len(seen_ips)} IPs", "info")
+    
+    return results
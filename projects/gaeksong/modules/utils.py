@@ -7,25 +7,109 @@ Fonctions de support pour logging, validation et affichage
 
 import re
 import os
+import time
+import errno
 import logging
+import threading
+import configparser
+from collections import deque
 from datetime import datetime
 
+try:
+    import resource
+except ImportError:  # Windows : pas de RLIMIT_NOFILE
+    resource = None
+
 # Configuration du logging
 LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 LOG_FILE = 'gaeksong.log'
 
-# Configuration du logger
-logging.basicConfig(
-    level=logging.INFO,
-    format=LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
-
 logger = logging.getLogger('gaeksong')
 
+# Fichier de configuration, à la racine du projet
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.ini')
+
+# Fichier de surcharge optionnel, lu après config.ini (ses options remplacent celles de config.ini)
+CONFIG_OVERRIDE_ENV = 'GAEKSONG_CONFIG'
+
+_config = None
+_config_lock = threading.Lock()
+
+def get_config():
+    """
+    Retourne la configuration (config.ini), lue au premier appel
+    
+    Un fichier absent ou illisible donne une configuration vide : chaque
+    appelant fournit sa valeur par défaut (fallback=...). Le fichier
+    désigné par la variable d'environnement GAEKSONG_CONFIG est lu ensuite
+    et remplace les options qu'il redéfinit.
+    
+    Returns:
+        configparser.ConfigParser: Configuration partagée
+    """
+    global _config
+    
+    with _config_lock:
+        if _config is None:
+            _config = configparser.ConfigParser(inline_comment_prefixes=('#',))
+            paths = [CONFIG_FILE]
+            if os.environ.get(CONFIG_OVERRIDE_ENV):
+                paths.append(os.environ[CONFIG_OVERRIDE_ENV])
+            for path in paths:
+                try:
+                    _config.read(path, encoding='utf-8')
+                except configparser.Error as e:
+                    logger.warning(f"Configuration illisible {path}: {str(e)}")
+    
+    return _config
+
+def config_list(section, option, fallback=()):
+    """
+    Lit une option de configuration sous forme de liste (valeurs séparées par des virgules)
+    
+    Args:
+        section (str): Section du fichier
+        option (str): Nom de l'option
+        fallback (iterable): Valeur si l'option est absente
+    
+    Returns:
+        list: Valeurs non vides
+    """
+    value = get_config().get(section, option, fallback=None)
+    if value is None:
+        return list(fallback)
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+def setup_logging(log_file=LOG_FILE, level=logging.INFO):
+    """
+    Configure le logging (fichier + console)
+    
+    Appelée explicitement par le point d'entrée : l'import des modules ne
+    fait aucune I/O. Le fichier de log n'est ouvert qu'au premier message.
+    Section [OUTPUT] de config.ini : verbose ajoute les messages de debug
+    de Gaeksong, quiet limite la console aux avertissements et erreurs.
+    
+    Args:
+        log_file (str): Fichier de log
+        level (int): Niveau de log
+    """
+    config = get_config()
+    console = logging.StreamHandler()
+    if config.getboolean('OUTPUT', 'quiet', fallback=False):
+        console.setLevel(logging.WARNING)
+    
+    logging.basicConfig(
+        level=level,
+        format=LOG_FORMAT,
+        handlers=[
+            logging.FileHandler(log_file, delay=True),
+            console
+        ]
+    )
+    
+    if config.getboolean('OUTPUT', 'verbose', fallback=False):
+        logger.setLevel(logging.DEBUG)
+
 def log(message, level="info"):
     """
     Fonction de logging avec différents niveaux
@@ -53,7 +137,7 @@ def validate_domain(domain):
     
     Args:
         domain (str): Domaine à valider
-        
+    
     Returns:
         bool: True si valide, False sinon
     """
@@ -73,7 +157,7 @@ def validate_ip(ip):
     
     Args:
         ip (str): Adresse IP à valider
-        
+    
     Returns:
         bool: True si valide, False sinon
     """
@@ -96,7 +180,7 @@ def load_wordlist(wordlist_path):
     
     Args:
         wordlist_path (str): Chemin vers le fichier wordlist
-        
+    
     Returns:
         list: Liste des mots ou None en cas d'erreur
     """
@@ -110,33 +194,396 @@ def load_wordlist(wordlist_path):
         
         log(f"Wordlist chargée: {len(wordlist)} entrées depuis {wordlist_path}", "info")
         return wordlist
-        
+    
     except Exception as e:
         log(f"Erreur lors du chargement de la wordlist {wordlist_path}: {str(e)}", "error")
         return None
 
+def expand_targets(target):
+    """
+    Développe une cible (IP unique ou plage CIDR) en liste d'adresses
+    
+    Args:
+        target (str): IP ou plage CIDR (ex: 192.168.1.0/24)
+    
+    Returns:
+        list: Liste des adresses IP (str) ou None si la cible est invalide
+    """
+    import ipaddress
+    
+    try:
+        if '/' not in target:
+            return [str(ipaddress.ip_address(target))]
+        
+        network = ipaddress.ip_network(target, strict=False)
+        return [str(ip) for ip in network.hosts()]
+    
+    except ValueError as e:
+        log(f"Cible invalide '{target}': {str(e)}", "error")
+        return None
+
+class RateLimiter:
+    """
+    Limiteur de débit (token bucket) partagé entre threads et coroutines
+    
+    Args:
+        rate (float): Nombre de sondes par seconde (0 ou None = illimité)
+        burst (int): Nombre de sondes pouvant partir d'un coup
+    """
+    
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate or 0)
+        self.burst = burst or max(1, int(self.rate))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self):
+        """
+        Réserve un jeton sans bloquer
+        
+        Returns:
+            float: Délai (en secondes) à attendre avant d'envoyer la sonde
+        """
+        if self.rate <= 0:
+            return 0.0
+        
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def acquire(self):
+        """Bloque le thread appelant jusqu'à ce qu'un jeton soit disponible"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+# Descripteurs gardés en réserve (logs, fichiers de sortie, stdio...)
+FD_RESERVE = 64
+
+# Erreurs indiquant un manque de ressources locales, pas un port fermé
+FD_EXHAUSTION_ERRORS = (errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EADDRNOTAVAIL)
+
+def raise_fd_limit(target=None):
+    """
+    Tente d'augmenter la limite de descripteurs de fichiers (RLIMIT_NOFILE)
+    
+    Args:
+        target (int): Limite souhaitée (par défaut : la limite hard)
+    
+    Returns:
+        int: Limite soft effective ou None si non supporté
+    """
+    if resource is None:
+        return None
+    
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = hard if hard != resource.RLIM_INFINITY else max(soft, 65536)
+    if target:
+        wanted = min(wanted, target)
+    
+    if wanted > soft:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+            log(f"RLIMIT_NOFILE augmentée: {soft} -> {wanted}", "info")
+            soft = wanted
+        except (ValueError, OSError) as e:
+            log(f"Impossible d'augmenter RLIMIT_NOFILE ({soft}): {str(e)}", "warning")
+    
+    return soft
+
+def is_fd_exhaustion(error):
+    """
+    Indique si une erreur socket vient d'un épuisement des ressources locales
+    
+    Args:
+        error (OSError): Erreur levée par la socket
+    
+    Returns:
+        bool: True pour EMFILE/ENFILE et assimilés
+    """
+    return isinstance(error, OSError) and error.errno in FD_EXHAUSTION_ERRORS
+
+def fd_backoff(attempt):
+    """
+    Délai d'attente avant de retenter après un épuisement de descripteurs
+    
+    Args:
+        attempt (int): Numéro de la tentative (0 pour la première)
+    
+    Returns:
+        float: Délai en secondes
+    """
+    return min(2.0, 0.05 * (2 ** attempt))
+
+class FdBudget:
+    """
+    Budget global de sockets en vol, partagé par tous les moteurs
+    
+    S'utilise comme context manager dans les threads, ou via
+    acquire_async()/release() dans les coroutines. Les threads et les
+    coroutines en attente forment une seule file : chaque release() réveille
+    le premier d'entre eux, qui retente la réservation (aucune attente
+    active, même budget épuisé).
+    
+    Args:
+        size (int): Nombre maximum de sockets ouvertes simultanément
+    """
+    
+    def __init__(self, size):
+        self.size = size
+        self._available = size
+        self._waiters = deque()
+        self._lock = threading.Lock()
+    
+    def _take(self):
+        """Réserve un descripteur si possible (verrou tenu)"""
+        if self._available > 0:
+            self._available -= 1
+            return True
+        return False
+    
+    def _wake_next(self):
+        """Réveille le premier thread ou la première coroutine en attente"""
+        with self._lock:
+            wake = self._waiters.popleft() if self._waiters else None
+        if wake:
+            wake()
+    
+    def acquire(self):
+        """Bloque jusqu'à ce qu'un descripteur soit disponible"""
+        while True:
+            with self._lock:
+                if self._take():
+                    return
+                event = threading.Event()
+                self._waiters.append(event.set)
+            event.wait()
+    
+    def try_acquire(self):
+        """
+        Réserve un descripteur sans bloquer
+        
+        Returns:
+            bool: True si la réservation a réussi
+        """
+        with self._lock:
+            return self._take()
+    
+    async def acquire_async(self):
+        """Attend un descripteur sans bloquer la boucle asyncio"""
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        while True:
+            future = loop.create_future()
+            
+            def wake(future=future):
+                try:
+                    loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+                except RuntimeError:
+                    # Boucle fermée : le réveil passe à l'attente suivante
+                    self._wake_next()
+            
+            with self._lock:
+                if self._take():
+                    return
+                self._waiters.append(wake)
+            
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._lock:
+                    woken = wake not in self._waiters
+                    if not woken:
+                        self._waiters.remove(wake)
+                # Réveil reçu mais non utilisé : il passe à l'attente suivante
+                if woken:
+                    self._wake_next()
+                raise
+    
+    def release(self):
+        """Libère un descripteur"""
+        with self._lock:
+            if self._available >= self.size:
+                raise ValueError("Descripteur libéré plus de fois qu'il n'a été réservé")
+            self._available += 1
+        self._wake_next()
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+_fd_budget = None
+_fd_budget_lock = threading.Lock()
+
+def get_fd_budget():
+    """
+    Retourne le budget de descripteurs partagé (créé au premier appel)
+    
+    Au premier appel, la limite RLIMIT_NOFILE est augmentée si possible,
+    puis le budget est fixé à cette limite moins FD_RESERVE.
+    
+    Returns:
+        FdBudget: Budget partagé
+    """
+    global _fd_budget
+    
+    with _fd_budget_lock:
+        if _fd_budget is None:
+            limit = raise_fd_limit() or 1024
+            _fd_budget = FdBudget(max(16, limit - FD_RESERVE))
+            log(f"Budget de sockets simultanées: {_fd_budget.size}", "info")
+    
+    return _fd_budget
+
+# Délai laissé aux sondes en vol pour se terminer après une annulation, en secondes
+CANCEL_GRACE = 2.0
+
+class CancelToken:
+    """
+    Jeton d'annulation partagé par tous les moteurs
+    
+    Annulé par Ctrl-C ou à l'échéance de --max-time : les moteurs cessent
+    alors de lancer de nouvelles sondes et de retransmettre, laissent
+    `grace` secondes aux sondes en vol puis rendent leurs résultats
+    partiels, exportés comme ceux d'une exécution complète.
+    
+    Args:
+        grace (float): Délai laissé aux sondes en vol après l'annulation
+    """
+    
+    def __init__(self, grace=CANCEL_GRACE):
+        self.grace = grace
+        self.reason = None
+        self.deadline = None
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+    
+    @property
+    def cancelled(self):
+        """True une fois l'exécution annulée"""
+        return self._event.is_set()
+    
+    def cancel(self, reason='interrupted'):
+        """
+        Annule l'exécution (sans effet si elle l'est déjà)
+        
+        Args:
+            reason (str): Motif reporté dans les résultats (interrupted, deadline...)
+        
+        Returns:
+            bool: True si cet appel a annulé l'exécution
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+        
+        log(f"Exécution annulée ({reason}): plus de nouvelles sondes, {self.grace:g}s pour celles en vol", "warning")
+        for callback in callbacks:
+            callback()
+        return True
+    
+    def add_callback(self, callback):
+        """
+        Enregistre une fonction appelée à l'annulation (immédiatement si déjà annulé)
+        
+        Args:
+            callback (callable): Fonction sans argument
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+    
+    def set_deadline(self, seconds):
+        """
+        Fixe une échéance : l'exécution est annulée (motif deadline) après `seconds` secondes
+        
+        Args:
+            seconds (float): Durée maximale de l'exécution
+        """
+        self.deadline = time.monotonic() + seconds
+        timer = threading.Timer(seconds, self.cancel, args=('deadline',))
+        timer.daemon = True
+        timer.start()
+    
+    def remaining(self):
+        """
+        Temps restant avant l'échéance
+        
+        Returns:
+            float: Secondes restantes, ou None sans échéance
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+    
+    def wait(self, timeout=None):
+        """
+        Attend l'annulation au plus `timeout` secondes
+        
+        Returns:
+            bool: True si l'exécution a été annulée
+        """
+        return self._event.wait(timeout)
+
+_cancel_token = CancelToken()
+
+def get_cancel_token():
+    """
+    Retourne le jeton d'annulation du processus
+    
+    Returns:
+        CancelToken: Jeton partagé par tous les moteurs
+    """
+    return _cancel_token
+
 def print_colored(message, color="white"):
     """
     Affiche un message coloré dans le terminal
     
+    Le message est écrit par le thread de rendu (modules.output), dans
+    l'ordre de dépôt ; l'appelant n'attend pas le terminal.
+    
     Args:
         message (str): Message à afficher
         color (str): Couleur (red, green, blue, yellow, white)
     """
-    colors = {
-        'red': '\033[91m',
-        'green': '\033[92m',
-        'blue': '\033[94m',
-        'yellow': '\033[93m',
-        'white': '\033[0m',
-        'cyan': '\033[96m',
-        'magenta': '\033[95m'
-    }
+    from modules.output import get_renderer
+    
+    get_renderer().write(message, color)
+
+def print_finding(message, color="green"):
+    """
+    Affiche un résultat unitaire (port ouvert, sous-domaine trouvé...)
     
-    reset = '\033[0m'
-    color_code = colors.get(color.lower(), colors['white'])
+    Contrairement aux messages de print_colored(), les résultats sont
+    remplacés par un résumé périodique quand ils arrivent trop vite et
+    masqués en mode quiet (section [OUTPUT] de config.ini).
     
-    print(f"{color_code}{message}{reset}")
+    Args:
+        message (str): Message à afficher
+        color (str): Couleur (red, green, blue, yellow, white)
+    """
+    from modules.output import get_renderer
+    
+    get_renderer().write(message, color, finding=True)
 
 def create_banner():
     """
@@ -165,7 +612,7 @@ def format_file_size(size_bytes):
     
     Args:
         size_bytes (int): Taille en bytes
-        
+    
     Returns:
         str: Taille formatée
     """
@@ -188,7 +635,7 @@ def sanitize_filename(filename):
     
     Args:
         filename (str): Nom de fichier à nettoyer
-        
+    
     Returns:
         str: Nom de fichier nettoyé
     """
@@ -240,7 +687,7 @@ def ensure_directory(directory_path):
     
     Args:
         directory_path (str): Chemin du répertoire
-        
+    
     Returns:
         bool: True si le répertoire existe ou a été créé, False sinon
     """
@@ -257,7 +704,7 @@ def is_port_valid(port):
     
     Args:
         port (int): Numéro de port à vérifier
-        
+    
     Returns:
         bool: True si valide, False sinon
     """
@@ -274,8 +721,8 @@ def parse_port_range(port_string):
     Args:
         port_string (str): Chaîne de ports à parser
         Peux tu me faire l'ensemble des fichiers?
-
-
+    
+    
     Returns:
         list: Liste des ports ou None en cas d'erreur
     """
@@ -304,7 +751,28 @@ def parse_port_range(port_string):
                     ports.append(port)
         
         return sorted(list(set(ports)))  # Suppression des doublons et tri
-        
+    
     except Exception as e:
         log(f"Erreur lors du parsing des ports '{port_string}': {str(e)}", "error")
-        return None
\ No newline at end of file
+        return None
+
+def parse_duration(value):
+    """
+    Parse une durée (ex: "90", "30s", "10m", "2h")
+    
+    Args:
+        value (str): Nombre de secondes, éventuellement suivi de s, m ou h
+    
+    Returns:
+        float: Durée en secondes
+    
+    Raises:
+        ValueError: Durée invalide ou non positive
+    """
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    value = value.strip().lower()
+    factor = units.get(value[-1:])
+    seconds = float(value[:-1] if factor else value) * (factor or 1)
+    if not 0 < seconds < float('inf'):
+        raise ValueError(f"Durée invalide: {value}")
+    return seconds
\ No newline at end of file
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module de sondage HTTP(S)
+Statut, titre, serveur et redirections des hôtes découverts
+"""
+
+import io
+import re
+import ssl
+import asyncio
+import http.client
+from collections import OrderedDict
+from urllib.parse import urljoin, urlsplit
+from modules.utils import log, print_colored, print_finding, get_fd_budget
+from modules.records import HttpRecord
+from modules.scope import get_scope, ScopeError
+from modules.timing import get_timing
+
+# Taille maximale lue dans le corps d'une réponse
+MAX_BODY_SIZE = 65536
+
+TITLE_PATTERN = re.compile(rb'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+
+class _StaleConnection(Exception):
+    """Connexion réutilisée fermée par le serveur avant tout octet de réponse"""
+
+class _Connection:
+    """
+    Connexion HTTP(S) ouverte sur la boucle du runtime
+    
+    Args:
+        reader (asyncio.StreamReader): Flux de lecture
+        writer (asyncio.StreamWriter): Flux d'écriture
+    """
+    
+    __slots__ = ('reader', 'writer')
+    
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+    
+    def close(self):
+        self.writer.close()
+
+class HttpConnectionPool:
+    """
+    Pool de connexions HTTP(S) keep-alive, par hôte
+    
+    Une connexion rendue au pool est réutilisée pour la requête suivante
+    vers le même (schéma, hôte, port) : redirections et ports multiples
+    d'un même hôte ne repaient pas la poignée de main TCP/TLS.
+    
+    Les hôtes les moins récemment utilisés sont évincés au-delà de
+    max_idle_total connexions inactives, pour ne pas accumuler un
+    descripteur par hôte sur un run de plusieurs milliers d'hôtes. Chaque
+    connexion inactive occupe une place du budget de sockets, et le pool
+    n'en garde jamais plus du quart du budget : les sondes en vol ne
+    manquent pas de descripteurs à cause des connexions en attente.
+    
+    Les connexions sont des flux asyncio : le pool ne s'utilise que depuis
+    la boucle du runtime (close() excepté, qui y est planifié).
+    
+    Args:
+        timeout (float): Timeout des connexions (défaut: banner_timeout du profil de timing)
+        max_idle_per_host (int): Connexions inactives conservées par hôte
+        max_idle_total (int): Connexions inactives conservées au total
+    """
+    
+    def __init__(self, timeout=None, max_idle_per_host=2, max_idle_total=256):
+        self.timeout = timeout or get_timing().banner_timeout
+        self.max_idle_per_host = max_idle_per_host
+        self._budget = get_fd_budget()
+        self.max_idle_total = min(max_idle_total, max(1, self._budget.size // 4))
+        self._idle = OrderedDict()
+        self._idle_count = 0
+        self._addresses = {}
+        
+        # Reconnaissance : on veut la réponse même avec un certificat invalide
+        self._ssl_context = ssl.create_default_context()
+        self._ssl_context.check_hostname = False
+        self._ssl_context.verify_mode = ssl.CERT_NONE
+    
+    async def resolve(self, host):
+        """
+        Adresse vérifiée d'un hôte (voir Scope.resolve()), conservée pour
+        les autres ports et redirections du même hôte
+        
+        Args:
+            host (str): Nom ou IP de l'hôte
+        
+        Returns:
+            str: Adresse à laquelle se connecter, ou None (hôte hors périmètre ou non résolu)
+        """
+        if host in self._addresses:
+            return self._addresses[host]
+        
+        # Résolution système bloquante : déportée sur le pool du runtime
+        try:
+            address = await asyncio.get_running_loop().run_in_executor(None, get_scope().resolve, host)
+        except ScopeError as e:
+            log(f"Sonde HTTP de {host} refusée: {str(e)}", "warning")
+            address = None
+        
+        self._addresses[host] = address
+        return address
+    
+    async def get(self, scheme, host, port, address, fresh=False):
+        """
+        Retourne une connexion vers l'hôte (réutilisée si possible)
+        
+        La place du budget de sockets d'une connexion inactive est rendue :
+        l'appelant tient déjà la sienne pour la requête.
+        
+        Args:
+            scheme (str): http ou https
+            host (str): Nom ou IP de l'hôte (envoyé en SNI)
+            port (int): Port
+            address (str): Adresse vérifiée par resolve(), à laquelle se connecter
+            fresh (bool): Ouvre une nouvelle connexion sans consulter le pool
+        
+        Returns:
+            tuple: (_Connection, True si la connexion vient du pool)
+        """
+        key = (scheme, host, port)
+        if not fresh:
+            idle = self._idle.get(key)
+            if idle:
+                self._idle_count -= 1
+                self._budget.release()
+                return idle.pop(), True
+        
+        # Connexion à l'adresse vérifiée, le nom n'étant envoyé qu'en SNI
+        if scheme == 'https':
+            opening = asyncio.open_connection(address, port, ssl=self._ssl_context, server_hostname=host)
+        else:
+            opening = asyncio.open_connection(address, port)
+        reader, writer = await asyncio.wait_for(opening, self.timeout)
+        return _Connection(reader, writer), False
+    
+    def put(self, scheme, host, port, conn):
+        """
+        Rend une connexion au pool (fermée si le pool de l'hôte est plein)
+        
+        Args:
+            scheme (str): http ou https
+            host (str): Nom ou IP de l'hôte
+            port (int): Port
+            conn (_Connection): Connexion à rendre
+        """
+        key = (scheme, host, port)
+        evicted = []
+        
+        # Place du budget de sockets de la connexion tant qu'elle reste inactive
+        if not self._budget.try_acquire():
+            conn.close()
+            return
+        
+        idle = self._idle.setdefault(key, [])
+        self._idle.move_to_end(key)
+        if len(idle) >= self.max_idle_per_host:
+            evicted.append(conn)
+        else:
+            idle.append(conn)
+            self._idle_count += 1
+        
+        # Éviction LRU des hôtes les plus anciens
+        while self._idle_count > self.max_idle_total:
+            old_key, old_idle = next(iter(self._idle.items()))
+            if old_idle:
+                evicted.append(old_idle.pop())
+                self._idle_count -= 1
+            if not old_idle:
+                del self._idle[old_key]
+        
+        for old_conn in evicted:
+            old_conn.close()
+            self._budget.release()
+    
+    async def aclose(self):
+        """Ferme toutes les connexions inactives"""
+        for connections in self._idle.values():
+            for conn in connections:
+                conn.close()
+                self._budget.release()
+        self._idle.clear()
+        self._idle_count = 0
+    
+    def close(self):
+        """Ferme toutes les connexions inactives (depuis le code synchrone)"""
+        from modules.runtime import get_runtime
+        
+        get_runtime().run(self.aclose())
+
+async def _read_chunked(reader):
+    """
+    Lit un corps en transfert chunked, tronqué à MAX_BODY_SIZE
+    
+    Returns:
+        tuple: (corps, True si le corps a été lu entièrement)
+    """
+    body = bytearray()
+    while True:
+        line = await reader.readline()
+        try:
+            size = int(line.split(b';', 1)[0].strip(), 16)
+        except ValueError:
+            raise http.client.HTTPException(f"Taille de bloc invalide: {line[:20]!r}")
+        
+        if size == 0:
+            # En-têtes de fin éventuels, jusqu'à la ligne vide
+            while (await reader.readline()).strip():
+                pass
+            return bytes(body), True
+        
+        if len(body) + size > MAX_BODY_SIZE:
+            body += await reader.readexactly(MAX_BODY_SIZE - len(body))
+            return bytes(body), False
+        
+        body += await reader.readexactly(size)
+        await reader.readline()
+
+async def _exchange(conn, request, reused):
+    """
+    Envoie une requête sur une connexion et lit la réponse
+    
+    Args:
+        conn (_Connection): Connexion
+        request (bytes): Requête GET
+        reused (bool): La connexion vient du pool
+    
+    Returns:
+        tuple: (statut, en-têtes, corps tronqué, longueur du contenu, True si la connexion est réutilisable)
+    
+    Raises:
+        _StaleConnection: Connexion réutilisée fermée avant tout octet de réponse
+    """
+    try:
+        conn.writer.write(request)
+        await conn.writer.drain()
+        head = await conn.reader.readuntil(b'\r\n\r\n')
+    except (asyncio.IncompleteReadError, ConnectionError) as e:
+        if reused and not getattr(e, 'partial', b''):
+            raise _StaleConnection(str(e) or type(e).__name__)
+        raise
+    
+    status_line, _, header_block = head.partition(b'\r\n')
+    try:
+        version, status = status_line.decode('iso-8859-1').split(None, 2)[:2]
+        status = int(status)
+    except ValueError:
+        raise http.client.BadStatusLine(status_line[:100].decode('iso-8859-1'))
+    headers = http.client.parse_headers(io.BytesIO(header_block))
+    
+    if status in (204, 304) or 100 <= status < 200:
+        body, complete = b'', True
+    elif 'chunked' in headers.get('Transfer-Encoding', '').lower():
+        body, complete = await _read_chunked(conn.reader)
+    elif headers.get('Content-Length', '').isdigit():
+        length = int(headers['Content-Length'])
+        try:
+            body = await conn.reader.readexactly(min(length, MAX_BODY_SIZE))
+        except asyncio.IncompleteReadError as e:
+            body = e.partial
+        complete = len(body) == length
+    else:
+        # Ni longueur ni chunked : le corps s'arrête à la fermeture
+        body, complete = await conn.reader.read(MAX_BODY_SIZE), False
+    
+    content_length = headers.get('Content-Length')
+    content_length = int(content_length) if content_length and content_length.isdigit() else len(body)
+    
+    # Réutilisation seulement si la réponse a été lue entièrement
+    connection = headers.get('Connection', '').lower()
+    keep_alive = 'keep-alive' in connection if version == 'HTTP/1.0' else 'close' not in connection
+    
+    return status, headers, body, content_length, complete and keep_alive
+
+async def _request(pool, url, address, user_agent):
+    """
+    Envoie un GET via le pool
+    
+    Args:
+        pool (HttpConnectionPool): Pool de connexions
+        url (str): URL absolue (le nom n'est envoyé qu'en Host et en SNI)
+        address (str): Adresse vérifiée par pool.resolve()
+        user_agent (str): User-Agent envoyé
+    
+    Returns:
+        tuple: (statut, en-têtes, corps tronqué, longueur du contenu)
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme
+    port = parts.port or (443 if scheme == 'https' else 80)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    
+    request = (f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nUser-Agent: {user_agent}\r\n"
+               f"Accept-Encoding: identity\r\nConnection: keep-alive\r\n\r\n").encode('latin-1', errors='replace')
+    
+    for attempt in range(2):
+        conn, reused = await pool.get(scheme, parts.hostname, port, address, fresh=attempt > 0)
+        try:
+            try:
+                status, headers, body, content_length, reusable = await asyncio.wait_for(
+                    _exchange(conn, request, reused), pool.timeout)
+            except _StaleConnection as e:
+                # Connexion inactive déjà fermée par le serveur : une seule
+                # nouvelle tentative, sur une connexion neuve
+                log(f"Connexion réutilisée fermée par {parts.netloc} ({str(e)}): nouvelle connexion", "debug")
+                continue
+            
+            if reusable:
+                pool.put(scheme, parts.hostname, port, conn)
+                conn = None
+            
+            return status, headers, body, content_length
+        finally:
+            if conn is not None:
+                conn.close()
+
+async def http_probe_async(host, port=80, scheme='http', pool=None, max_redirects=5, user_agent='Gaeksong/1.0'):
+    """
+    Sonde un hôte en HTTP(S) en suivant les redirections (coroutine du runtime)
+    
+    Args:
+        host (str): Nom ou IP de l'hôte
+        port (int): Port
+        scheme (str): http ou https
+        pool (HttpConnectionPool): Pool de connexions (un pool local sinon)
+        max_redirects (int): Nombre maximum de redirections suivies
+        user_agent (str): User-Agent envoyé
+    
+    Returns:
+        HttpRecord: Résultat de la sonde ou None si l'hôte ne répond pas
+    """
+    own_pool = pool is None
+    pool = pool or HttpConnectionPool()
+    budget = get_fd_budget()
+    
+    default_port = 443 if scheme == 'https' else 80
+    url = f"{scheme}://{host}/" if port == default_port else f"{scheme}://{host}:{port}/"
+    start_url = url
+    redirects = []
+    
+    try:
+        address = await pool.resolve(host)
+        if not address:
+            log(f"Sonde HTTP de {host}:{port} refusée (hors périmètre ou non résolu)", "debug")
+            return None
+        
+        for _ in range(max_redirects + 1):
+            await budget.acquire_async()
+            try:
+                status, headers, body, content_length = await _request(pool, url, address, user_agent)
+            finally:
+                budget.release()
+            
+            location = headers.get('Location')
+            if status in (301, 302, 303, 307, 308) and location:
+                next_url = urljoin(url, location)
+                redirects.append({'status': status, 'location': next_url})
+                if urlsplit(next_url).scheme not in ('http', 'https'):
+                    break
+                address = await pool.resolve(urlsplit(next_url).hostname or '')
+                if not address:
+                    log(f"Redirection hors périmètre non suivie: {next_url}", "warning")
+                    break
+                url = next_url
+                continue
+            break
+        
+        match = TITLE_PATTERN.search(body)
+        title = match.group(1).decode('utf-8', errors='ignore').strip()[:200] if match else None
+        
+        record = HttpRecord(start_url, status, title, headers.get('Server'), redirects, content_length)
+        print_finding(f"[+] {start_url} -> {status} {title or ''}".rstrip())
+        return record
+    
+    except asyncio.TimeoutError:
+        log(f"Timeout sonde HTTP {url}", "debug")
+    except (OSError, EOFError, asyncio.LimitOverrunError, http.client.HTTPException) as e:
+        log(f"Sonde HTTP échouée {url}: {str(e)}", "debug")
+    except Exception as e:
+        log(f"Erreur sonde HTTP {url}: {str(e)}", "error")
+    finally:
+        if own_pool:
+            await pool.aclose()
+    
+    return None
+
+def http_probe(host, port=80, scheme='http', pool=None, max_redirects=5, user_agent='Gaeksong/1.0'):
+    """
+    Sonde un hôte en HTTP(S) en suivant les redirections
+    
+    Args:
+        host (str): Nom ou IP de l'hôte
+        port (int): Port
+        scheme (str): http ou https
+        pool (HttpConnectionPool): Pool de connexions (un pool local sinon)
+        max_redirects (int): Nombre maximum de redirections suivies
+        user_agent (str): User-Agent envoyé
+    
+    Returns:
+        HttpRecord: Résultat de la sonde ou None si l'hôte ne répond pas
+    """
+    from modules.runtime import get_runtime
+    
+    return get_runtime().run(http_probe_async(host, port, scheme, pool, max_redirects, user_agent))
+
+def http_probe_hosts(targets, max_concurrency=None, timeout=None, rate_limiter=None):
+    """
+    Sonde un ensemble de cibles HTTP(S) avec une concurrence globale bornée
+    
+    Args:
+        targets (iterable): Tuples (hôte, port, schéma), éventuellement un flux
+        max_concurrency (int): Nombre maximum de sondes simultanées (défaut: max_threads du profil de timing)
+        timeout (float): Timeout des connexions (défaut: banner_timeout du profil de timing)
+        rate_limiter (RateLimiter): Limiteur de débit (défaut: celui du profil de timing, partagé avec les scans)
+    
+    Returns:
+        list: Réponses obtenues (HttpRecord)
+    """
+    from modules.runtime import get_runtime
+    
+    timing = get_timing()
+    max_concurrency = max_concurrency or timing.max_threads
+    rate_limiter = rate_limiter or timing.rate_limiter
+    runtime = get_runtime()
+    pool = HttpConnectionPool(timeout=timeout)
+    results = []
+    
+    async def probe(target):
+        host, port, scheme = target
+        record = await http_probe_async(host, port, scheme, pool=pool)
+        if record:
+            results.append(record)
+    
+    # Les cibles peuvent être un flux (sous-domaines découverts au fil de l'eau)
+    try:
+        runtime.run(runtime.map(probe, targets, min(max_concurrency, get_fd_budget().size),
+                                rate_limiter=rate_limiter, stream=True))
+    finally:
+        pool.close()
+    
+    print_colored(f"[+] Sondage HTTP terminé: {len(results)} réponses", "green")
+    log(f"Sondage HTTP: {len(results)} réponses", "info")
+    
+    return results
+
+def web_targets(hosts, ports=(80, 443)):
+    """
+    Génère les cibles HTTP(S) pour une liste (ou un flux) d'hôtes
+    
+    Args:
+        hosts (iterable): Noms ou IPs des hôtes
+        ports (tuple): Ports à sonder (443 et 8443 en HTTPS)
+    
+    Yields:
+        tuple: (hôte, port, schéma)
+    """
+    for host in hosts:
+        for port in ports:
+            yield host, port, 'https' if port in (443, 8443) else 'http'
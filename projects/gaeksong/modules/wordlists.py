@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module de gestion des wordlists
+Lecture en flux de plusieurs wordlists et déduplication exacte ou probabiliste (filtre de Bloom)
+"""
+
+import os
+import math
+import hashlib
+from modules.utils import log
+
+# Modes de déduplication disponibles
+DEDUP_MODES = ('exact', 'bloom')
+
+# Taux de faux positifs par défaut du filtre de Bloom
+DEFAULT_ERROR_RATE = 0.001
+
+class ExactFilter(set):
+    """
+    Déduplication exacte (un ensemble Python)
+    
+    Coûte plusieurs dizaines d'octets par candidat, sans faux positif.
+    """
+    
+    def add(self, item):
+        """
+        Ajoute un élément
+        
+        Args:
+            item (str): Élément à ajouter
+        
+        Returns:
+            bool: True si l'élément était absent
+        """
+        if item in self:
+            return False
+        super().add(item)
+        return True
+
+class BloomFilter:
+    """
+    Déduplication probabiliste (filtre de Bloom)
+    
+    Quelques bits par candidat quelle que soit sa longueur. Un faux positif
+    fait sauter un candidat jamais testé, avec une probabilité error_rate ;
+    aucun doublon n'est jamais testé deux fois.
+    
+    Args:
+        capacity (int): Nombre de candidats attendus
+        error_rate (float): Taux de faux positifs visé à pleine capacité
+    """
+    
+    def __init__(self, capacity, error_rate=DEFAULT_ERROR_RATE):
+        if not 0 < error_rate < 1:
+            raise ValueError(f"Taux de faux positifs invalide: {error_rate}")
+        
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, item):
+        # Double hachage (Kirsch-Mitzenmacher) : k positions depuis un seul digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+    
+    def __contains__(self, item):
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+    
+    def add(self, item):
+        """
+        Ajoute un élément
+        
+        Args:
+            item (str): Élément à ajouter
+        
+        Returns:
+            bool: True si l'élément était (probablement) absent
+        """
+        bits = self._bits
+        new = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                bits[pos >> 3] |= mask
+                new = True
+        
+        if new:
+            self.count += 1
+        return new
+    
+    def __len__(self):
+        return self.count
+    
+    @property
+    def size_bytes(self):
+        """Mémoire occupée par le tableau de bits"""
+        return len(self._bits)
+
+def make_filter(mode='exact', capacity=0, error_rate=DEFAULT_ERROR_RATE):
+    """
+    Crée le filtre de déduplication demandé
+    
+    Args:
+        mode (str): exact ou bloom
+        capacity (int): Nombre de candidats attendus (mode bloom)
+        error_rate (float): Taux de faux positifs (mode bloom)
+    
+    Returns:
+        ExactFilter ou BloomFilter: Filtre vide
+    """
+    if mode == 'bloom':
+        bloom = BloomFilter(capacity, error_rate)
+        log(f"Filtre de Bloom: {capacity} candidats, {bloom.size_bytes} octets, {bloom.hashes} hachages", "info")
+        return bloom
+    if mode == 'exact':
+        return ExactFilter()
+    raise ValueError(f"Mode de déduplication inconnu: {mode}")
+
+def count_candidates(paths):
+    """
+    Compte les lignes de plusieurs wordlists (majorant du nombre de candidats)
+    
+    Args:
+        paths (list): Chemins des wordlists
+    
+    Returns:
+        int: Nombre total de lignes
+    """
+    total = 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            last = b'\n'
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                total += chunk.count(b'\n')
+                last = chunk[-1:]
+            if last != b'\n':
+                total += 1
+    return total
+
+def iter_wordlists(paths):
+    """
+    Lit plusieurs wordlists à la suite, ligne par ligne
+    
+    Args:
+        paths (list): Chemins des wordlists
+    
+    Yields:
+        str: Mots non vides, en minuscules
+    """
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                word = line.strip().lower()
+                if word:
+                    yield word
+
+def open_wordlists(paths, total=None):
+    """
+    Vérifie et ouvre plusieurs wordlists en flux
+    
+    Args:
+        paths (list or str): Chemin(s) des wordlists
+        total (int): Nombre de lignes déjà compté (évite une relecture complète des fichiers)
+    
+    Returns:
+        tuple: (flux de mots, nombre de lignes) ou None si une wordlist est illisible
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    
+    for path in paths:
+        if not os.path.isfile(path):
+            log(f"Fichier wordlist introuvable: {path}", "error")
+            return None
+    
+    if total is None:
+        try:
+            total = count_candidates(paths)
+        except OSError as e:
+            log(f"Erreur lors de la lecture des wordlists: {str(e)}", "error")
+            return None
+        
+        log(f"Wordlists: {total} lignes depuis {', '.join(paths)}", "info")
+    
+    return iter_wordlists(paths), total
+
+def unique_words(words, seen):
+    """
+    Filtre les doublons d'un flux de mots
+    
+    Args:
+        words (iterable): Mots à filtrer
+        seen (ExactFilter or BloomFilter): Filtre de déduplication
+    
+    Yields:
+        str: Mots jamais vus
+    """
+    for word in words:
+        if seen.add(word):
+            yield word
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Configuration commune des tests
+Les modules du projet sont importés depuis la racine ; les sondes restent sur la boucle locale
+"""
+
+import os
+import sys
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+@pytest.fixture
+def loopback_scope(monkeypatch):
+    """Périmètre limité à la boucle locale (blocked_ranges la refuse par défaut)"""
+    import modules.scope
+    
+    scope = modules.scope.Scope(allowed=['127.0.0.0/8'], allowed_private=['127.0.0.0/8'])
+    monkeypatch.setattr(modules.scope, '_scope', scope)
+    return scope
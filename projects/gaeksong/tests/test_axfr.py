@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du transfert de zone (AXFR)
+Serveur faisant autorité minimal sur 127.0.0.1, qui sert une zone en un message TCP
+"""
+
+import socket
+import struct
+import threading
+from functools import partial
+
+import dns.exception
+import dns.message
+import dns.rdatatype
+import dns.rrset
+import dns.zone
+import pytest
+
+import modules.batch as batch
+from modules.passive import zone_transfer
+
+ZONE = """$ORIGIN example.test.
+@    300 IN SOA ns1 admin 1 3600 600 86400 300
+@    300 IN NS  ns1
+ns1  300 IN A   127.0.0.1
+www  300 IN A   127.0.0.2
+mail 300 IN A   192.0.2.10
+"""
+
+def _read_exact(connection, size):
+    data = b''
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("connexion fermée")
+        data += chunk
+    return data
+
+def _serve_axfr(listener, zone):
+    """Répond à chaque requête par la zone complète (SOA, enregistrements, SOA)"""
+    soa = zone.find_rrset('@', 'SOA')
+    while True:
+        try:
+            connection, _ = listener.accept()
+        except OSError:
+            return
+        with connection:
+            try:
+                length = struct.unpack('!H', _read_exact(connection, 2))[0]
+                query = dns.message.from_wire(_read_exact(connection, length))
+            except (ConnectionError, dns.exception.DNSException):
+                continue
+            
+            response = dns.message.make_response(query)
+            response.answer.append(soa)
+            for name, node in zone.nodes.items():
+                for rdataset in node.rdatasets:
+                    if rdataset.rdtype == dns.rdatatype.SOA:
+                        continue
+                    rrset = dns.rrset.RRset(name.derelativize(zone.origin), rdataset.rdclass, rdataset.rdtype)
+                    rrset.update(rdataset)
+                    response.answer.append(rrset)
+            response.answer.append(soa)
+            
+            wire = response.to_wire(origin=zone.origin)
+            connection.sendall(struct.pack('!H', len(wire)) + wire)
+
+@pytest.fixture
+def axfr_port():
+    """Port d'un serveur AXFR local servant ZONE"""
+    zone = dns.zone.from_text(ZONE, origin='example.test.')
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen()
+    thread = threading.Thread(target=_serve_axfr, args=(listener, zone), daemon=True)
+    thread.start()
+    yield listener.getsockname()[1]
+    listener.close()
+
+@pytest.fixture
+def closed_port():
+    """Port local sur lequel rien n'écoute"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+def test_zone_transfer_lists_subdomains(axfr_port, loopback_scope):
+    axfr = zone_transfer('example.test', ['127.0.0.1'], timeout=2, port=axfr_port)
+    
+    assert axfr['nameserver'] == '127.0.0.1'
+    records = {entry.subdomain: entry for entry in axfr['subdomains']}
+    assert set(records) == {'ns1.example.test', 'www.example.test', 'mail.example.test'}
+    assert records['www.example.test'].ips == ['127.0.0.2']
+    assert records['www.example.test'].status == 'found'
+    # Hors du périmètre de boucle locale : conservé mais jamais sondé
+    assert records['mail.example.test'].status == 'out_of_scope'
+
+def test_zone_transfer_refused(closed_port, loopback_scope):
+    assert zone_transfer('example.test', ['127.0.0.1'], timeout=1, port=closed_port) is None
+
+def _recon(monkeypatch, port, **kwargs):
+    """recon_domain avec le serveur local comme unique NS ; retourne (résultats, appels du bruteforce)"""
+    brute_calls = []
+    
+    def brute_force(domain, wordlist_paths, **options):
+        brute_calls.append(domain)
+        return []
+    
+    monkeypatch.setattr(batch, 'get_nameservers', lambda domain: ['127.0.0.1'])
+    monkeypatch.setattr(batch, 'zone_transfer', partial(zone_transfer, timeout=1, port=port))
+    monkeypatch.setattr(batch, 'brute_force_subdomains', brute_force)
+    
+    results = batch.recon_domain('example.test', wordlist_paths=['unused.txt'], **kwargs)
+    return results, brute_calls
+
+def test_successful_axfr_skips_brute_force(monkeypatch, axfr_port, loopback_scope):
+    results, brute_calls = _recon(monkeypatch, axfr_port)
+    
+    assert brute_calls == []
+    assert results['data']['axfr'] == {'nameserver': '127.0.0.1', 'records': 3}
+    assert len(results['data']['subdomains']) == 3
+
+def test_refused_axfr_falls_back_to_brute_force(monkeypatch, closed_port, loopback_scope):
+    results, brute_calls = _recon(monkeypatch, closed_port)
+    
+    assert brute_calls == ['example.test']
+    assert 'axfr' not in results['data']
+
+def test_no_axfr_runs_brute_force(monkeypatch, axfr_port, loopback_scope):
+    results, brute_calls = _recon(monkeypatch, axfr_port, axfr_enabled=False)
+    
+    assert brute_calls == ['example.test']
+    assert 'axfr' not in results['data']
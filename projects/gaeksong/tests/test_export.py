@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests des exports en flux
+Lignes écrites au fil des phases, complétées sans doublon à la fin
+"""
+
+import csv
+import json
+
+from modules.export import ExportStream, iter_rows
+from modules.records import SubdomainRecord, PortRecord, BannerRecord
+
+def _ndjson(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+def test_streamed_rows_are_written_during_the_run(tmp_path):
+    found = SubdomainRecord('www.example.com', ['10.0.0.1'])
+    export = ExportStream(str(tmp_path / 'scan'), 'example.com', ['ndjson', 'csv'])
+    export.observer('subdomains', found)
+    export.observer('ips', '10.0.0.1')
+    
+    # Écrite avant la fin de l'exécution
+    export._sinks['ndjson'][1].flush()
+    assert [row['name'] for row in _ndjson(tmp_path / 'scan.ndjson')] == ['www.example.com']
+    
+    # Le résultat final ajoute des noms non émis (PTR, AXFR hors périmètre)
+    results = {'type': 'passive', 'target': 'example.com', 'data': {
+        'subdomains': [found, SubdomainRecord('mail.example.com', ['192.0.2.1'])],
+        'whois': {'registrar': 'Example'},
+    }}
+    written = export.finish(results)
+    
+    assert written == [str(tmp_path / 'scan.ndjson'), str(tmp_path / 'scan.csv')]
+    expected = sorted(json.dumps(row, sort_keys=True) for row in iter_rows(results))
+    assert sorted(json.dumps(row, sort_keys=True) for row in _ndjson(tmp_path / 'scan.ndjson')) == expected
+    with open(tmp_path / 'scan.csv', encoding='utf-8') as f:
+        assert len(list(csv.DictReader(f))) == len(expected)
+
+def test_deferred_ports_carry_their_banner(tmp_path):
+    port = PortRecord(22, 'open', 'SSH')
+    export = ExportStream(str(tmp_path / 'scan'), '10.0.0.1', ['ndjson', 'json'], defer=('port_scan',))
+    export.observer('port_scan', port)
+    export.finish({'type': 'active', 'target': '10.0.0.1', 'data': {
+        'port_scan': [port],
+        'banners': {22: BannerRecord(22, 'SSH-2.0-test', 'SSH')},
+    }})
+    
+    assert [row['detail'] for row in _ndjson(tmp_path / 'scan.ndjson')] == ['SSH-2.0-test']
+    with open(tmp_path / 'scan.json', encoding='utf-8') as f:
+        assert json.load(f)['data']['port_scan'][0]['port'] == 22
+
+def test_abort_removes_the_output_files(tmp_path):
+    export = ExportStream(str(tmp_path / 'scan'), 'example.com', ['json', 'csv'])
+    export.abort()
+    
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du budget de démarrage
+Les imports lourds (dns, whois, asyncio) doivent rester paresseux
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_SCRIPT = os.path.join(PROJECT_DIR, 'gaeksong.py')
+
+# Budget cumulé des imports, en microsecondes (surchargeable depuis le Makefile)
+STARTUP_BUDGET_US = int(os.environ.get('GAEKSONG_STARTUP_BUDGET_US', 80000))
+
+# Modules qui ne doivent être importés que par les commandes qui s'en servent
+HEAVY_MODULES = ('dns', 'whois', 'asyncio')
+
+def import_times(*args):
+    """
+    Lance gaeksong.py sous python -X importtime
+    
+    Args:
+        *args (str): Arguments de la ligne de commande
+    
+    Returns:
+        dict: Temps d'import propre (us) de chaque module importé
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', MAIN_SCRIPT] + list(args),
+        cwd=PROJECT_DIR, capture_output=True, text=True, timeout=60
+    )
+    assert process.returncode == 0, process.stderr
+    
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, _, module = line[len('import time:'):].split('|')
+        if self_us.strip().isdigit():
+            times[module.strip()] = int(self_us)
+    return times
+
+@pytest.mark.parametrize('args', [['--help'], ['active', '--help']])
+def test_startup_budget(args):
+    times = import_times(*args)
+    assert times, "Aucune mesure python -X importtime"
+    
+    total = sum(times.values())
+    assert total <= STARTUP_BUDGET_US, f"Imports: {total} us (budget: {STARTUP_BUDGET_US} us)"
+
+@pytest.mark.parametrize('args', [['--help'], ['active', '--help']])
+def test_no_heavy_imports(args):
+    heavy = sorted(module for module in import_times(*args) if module.split('.')[0] in HEAVY_MODULES)
+    assert not heavy, f"Imports lourds au démarrage: {', '.join(heavy)}"
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la sonde HTTP(S)
+Serveur http.server local : redirections, titre, en-têtes et connexions keep-alive
+"""
+
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from modules.web import HttpConnectionPool, http_probe, http_probe_hosts
+
+PAGE = b'<html><head><title> Page de test </title></head><body>ok</body></html>'
+
+class _Handler(BaseHTTPRequestHandler):
+    """Chaîne / -> /step (301) -> /final (302) -> 200"""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def version_string(self):
+        return 'TestServer/1.0'
+    
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections.append(self.connection)
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        redirects = {'/': (301, '/step'), '/step': (302, '/final')}
+        if self.path in redirects:
+            status, location = redirects[self.path]
+            self.send_response(status)
+            self.send_header('Location', location)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+@pytest.fixture
+def http_server(loopback_scope):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = []
+    server.paths = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_probe_follows_redirects(http_server):
+    port = http_server.server_address[1]
+    record = http_probe('127.0.0.1', port)
+    
+    assert record.url == f"http://127.0.0.1:{port}/"
+    assert record.status == 200
+    assert record.title == 'Page de test'
+    assert record.server == 'TestServer/1.0'
+    assert record.content_length == len(PAGE)
+    assert record.redirects == [
+        {'status': 301, 'location': f"http://127.0.0.1:{port}/step"},
+        {'status': 302, 'location': f"http://127.0.0.1:{port}/final"},
+    ]
+
+def test_redirect_chain_reuses_one_connection(http_server):
+    port = http_server.server_address[1]
+    pool = HttpConnectionPool(timeout=2)
+    try:
+        assert http_probe('127.0.0.1', port, pool=pool).status == 200
+        assert http_probe('127.0.0.1', port, pool=pool).status == 200
+    finally:
+        pool.close()
+    
+    # Deux sondes, trois requêtes chacune, une seule connexion TCP
+    assert http_server.paths == ['/', '/step', '/final'] * 2
+    assert len(http_server.connections) == 1
+
+def test_stale_pooled_connection_is_retried(http_server):
+    port = http_server.server_address[1]
+    pool = HttpConnectionPool(timeout=2)
+    try:
+        assert http_probe('127.0.0.1', port, pool=pool).status == 200
+        
+        # Le serveur ferme la connexion inactive gardée par le pool
+        for connection in list(http_server.connections):
+            connection.shutdown(socket.SHUT_RDWR)
+        
+        record = http_probe('127.0.0.1', port, pool=pool)
+    finally:
+        pool.close()
+    
+    assert record is not None and record.status == 200
+    assert len(http_server.connections) == 2
+
+def test_out_of_scope_host_is_not_probed(http_server):
+    assert http_probe('192.0.2.1', 80) is None
+    assert http_server.paths == []
+
+def test_probe_hosts(http_server):
+    port = http_server.server_address[1]
+    records = http_probe_hosts([('127.0.0.1', port, 'http'), ('127.0.0.1', 1, 'http')], timeout=2)
+    
+    assert [record.status for record in records] == [200]
+    assert len(http_server.connections) == 1